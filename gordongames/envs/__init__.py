@@ -1,2 +1,5 @@
 import gordongames.envs.ggames
 from gordongames.envs.gym_envs import *
+from gordongames.envs.vector_envs import *
+from gordongames.envs.tensor_envs import *
+from gordongames.envs.async_envs import *
@@ -0,0 +1,312 @@
+from gordongames.envs.vector_envs import SubprocVectorGordonGame
+from multiprocessing.connection import wait
+from collections import deque
+import asyncio
+import inspect
+import gym
+import numpy as np
+
+class GordonEnvPool(SubprocVectorGordonGame):
+    """
+    An asynchronous pool of games in the style of EnvPool. send
+    dispatches the actions of any subset of the games to the worker
+    processes and returns immediately. recv waits for the first
+    batch_size games that are ready and returns their outputs along
+    with their env ids. Every game is answered as soon as it has
+    stepped, so slow games (i.e. resets with many targets) do not
+    stall the rest of the pool.
+
+    Games that finish are reset within their step as in
+    VectorGordonGame. The last observation of a finished game can be
+    read from final_obs[env_id] until the game is sent again.
+
+        pool = GordonEnvPool("gordongames-v1", 64, batch_size=16)
+        pool.async_reset()
+        while training:
+            obs, rews, dones, infos, env_ids = pool.recv()
+            pool.send(policy(obs), env_ids)
+
+    The synchronous interface of SubprocVectorGordonGame (reset and
+    step) can be used while no games are in flight.
+    """
+    def __init__(self, env_id, num_envs, batch_size=None,
+                                         num_workers=None,
+                                         seed=None,
+                                         start_method=None,
+                                         **kwargs):
+        """
+        Args:
+            env_id: str
+                the registered id of the games, i.e. "gordongames-v1"
+            num_envs: int
+                the number of games
+            batch_size: int or None
+                the number of games returned by each recv. None
+                returns all of the games, i.e. lockstep stepping.
+            num_workers: int or None
+                see SubprocVectorGordonGame
+            seed: None or int or SeedSequence
+                see VectorGordonGame.seed
+            start_method: str or None
+                see SubprocVectorGordonGame
+            kwargs: the env kwargs shared by all of the games
+        """
+        if batch_size is None: batch_size = num_envs
+        assert 0 < batch_size <= num_envs
+        self.batch_size = batch_size
+        self.in_flight = np.zeros(num_envs, dtype=bool)
+        self.ready = deque()
+        super().__init__(
+            env_id,
+            num_envs,
+            num_workers=num_workers,
+            seed=seed,
+            auto_reset=True,
+            start_method=start_method,
+            **kwargs
+        )
+        self.worker_idxs = np.zeros(num_envs, dtype=np.int64)
+        for w,idxs in enumerate(self.idxs):
+            self.worker_idxs[idxs] = w
+
+    def send_each(self, msgs, pipes=None):
+        """
+        See SubprocVectorGordonGame.send_each. Only valid while no
+        games are in flight, otherwise the answers of the games in
+        flight would be taken as the answers of the command. This
+        guards all of the synchronous commands, i.e. reset, step,
+        seed and reset_at.
+        """
+        assert not self.in_flight.any() and len(self.ready) == 0,\
+            "Synchronous commands require that all games are received"
+        super().send_each(msgs, pipes)
+
+    def dispatch(self, cmd, env_ids, actions=None):
+        """
+        Sends a per game command to the workers of the argued games.
+        The games are validated before any shared buffer is written,
+        so a rejected dispatch leaves the games in flight untouched.
+
+        Args:
+            cmd: str
+                "step_each" or "reset_each"
+            env_ids: ndarray (K,) int64
+            actions: None or ndarray (K,)
+                if not None, the actions are written to the shared
+                action buffer of the games before they are sent
+        """
+        assert not self.in_flight[env_ids].any(),\
+            "Games cannot be sent again before they are received"
+        assert len(np.unique(env_ids)) == len(env_ids)
+        if actions is not None: self.actions[env_ids] = actions
+        self.in_flight[env_ids] = True
+        workers = self.worker_idxs[env_ids]
+        for w in np.unique(workers):
+            self.pipes[w].send((cmd, env_ids[workers==w].tolist()))
+
+    def async_reset(self):
+        """
+        Resets all of the games. Their first observations are
+        returned by recv.
+        """
+        self.dispatch("reset_each", np.arange(self.num_envs))
+
+    def send(self, actions, env_ids=None):
+        """
+        Dispatches the actions of the argued games and returns without
+        waiting for the games to step.
+
+        Args:
+            actions: ndarray or sequence of ints (K,)
+                the action of each game. See GordonGame.step
+            env_ids: None or ndarray or sequence of ints (K,)
+                the games of the actions. None sends all games.
+        """
+        if env_ids is None: env_ids = np.arange(self.num_envs)
+        env_ids = np.asarray(env_ids, dtype=np.int64).reshape(-1)
+        actions = np.asarray(actions).reshape(-1)
+        assert len(actions) == len(env_ids)
+        self.dispatch("step_each", env_ids, actions)
+
+    def recv(self):
+        """
+        Waits for the first batch_size games that are ready. The
+        outputs are copies, so they remain valid after the games are
+        sent again.
+
+        Returns:
+            obs: ndarray (B, H, W) float
+            rews: ndarray (B,) float32
+            dones: ndarray (B,) bool
+            infos: ndarray (B,) INFO_DTYPE
+            env_ids: ndarray (B,) int64
+                the games of the outputs in the order they were ready
+        """
+        batch_size = self.batch_size
+        n_pending = len(self.ready) + self.in_flight.sum()
+        assert n_pending >= batch_size,\
+            "Only {} games are in flight".format(n_pending)
+        while len(self.ready) < batch_size:
+            for pipe in wait(self.pipes):
+                ok, data = pipe.recv()
+                if not ok:
+                    raise RuntimeError("Worker failed:\n{}".format(data))
+                self.in_flight[data] = False
+                self.ready.append(data)
+        env_ids = np.asarray(
+            [self.ready.popleft() for _ in range(batch_size)],
+            dtype=np.int64
+        )
+        return (
+            self.obs[env_ids],
+            self.rews[env_ids],
+            self.dones[env_ids],
+            self.infos[env_ids],
+            env_ids,
+        )
+
+    def close(self):
+        """
+        Waits for the games in flight, then stops the workers and frees
+        the shared memory.
+        """
+        if self.closed: return
+        failed = False
+        try:
+            while self.in_flight.any() and not failed:
+                for pipe in wait(self.pipes):
+                    ok, data = pipe.recv()
+                    if ok: self.in_flight[data] = False
+                    else: failed = True
+        except (EOFError, ConnectionResetError):
+            pass
+        self.ready.clear()
+        super().close()
+
+class AsyncGordonGame:
+    """
+    An asyncio interface to a single GordonGame. reset and step are
+    coroutines that run the blocking calls of the game in an executor,
+    so an event loop can drive many games next to other I/O without
+    being blocked by them. Calls to the same game are serialized, and
+    calls to different games run concurrently in the executor.
+
+        async with AsyncGordonGame("gordongames-v1", seed=0) as game:
+            async for obs, action, rew, done, info in game.episode(policy):
+                ...
+
+    The observations are copies, so they remain valid across steps.
+    """
+    def __init__(self, env_id, seed=None, executor=None, **kwargs):
+        """
+        Args:
+            env_id: str
+                the registered id of the game, i.e. "gordongames-v1"
+            seed: None or int or SeedSequence
+                see GordonGame.seed
+            executor: None or concurrent.futures.Executor
+                the executor that runs the blocking calls. None uses
+                the default executor of the running event loop. The
+                game lives in this process, so the executor must run
+                its calls in this process (i.e. a ThreadPoolExecutor).
+            kwargs: the env kwargs
+        """
+        self.env_id = env_id
+        self.env = gym.make(env_id, **kwargs).unwrapped
+        self.observation_space = self.env.observation_space
+        self.action_space = self.env.action_space
+        self.executor = executor
+        self.lock = asyncio.Lock()
+        if seed is not None: self.seed(seed)
+
+    def seed(self, x=None):
+        """
+        See GordonGame.seed
+        """
+        return self.env.seed(x)
+
+    async def run(self, fxn, *args, **kwargs):
+        """
+        Runs a blocking call in the executor. Only one call runs at a
+        time for each game.
+
+        Args:
+            fxn: callable
+            args: the arguments of fxn
+            kwargs: the keyword arguments of fxn
+        Returns:
+            the return value of fxn
+        """
+        loop = asyncio.get_running_loop()
+        async with self.lock:
+            return await loop.run_in_executor(
+                self.executor, lambda: fxn(*args, **kwargs)
+            )
+
+    def _reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+        return obs.copy(), info
+
+    def _step(self, action):
+        obs, rew, done, info = self.env.step(action)
+        return obs.copy(), rew, done, info
+
+    async def reset(self, **kwargs):
+        """
+        Args:
+            kwargs: the kwargs of GordonGame.reset
+        Returns:
+            obs: ndarray (H, W) float
+            info: dict
+        """
+        return await self.run(self._reset, **kwargs)
+
+    async def step(self, action):
+        """
+        Args:
+            action: int
+                see GordonGame.step
+        Returns:
+            obs: ndarray (H, W) float
+            rew: float
+            done: bool
+            info: dict
+        """
+        return await self.run(self._step, int(action))
+
+    async def episode(self, policy, **kwargs):
+        """
+        Plays a single episode. This is an asynchronous generator that
+        yields every step of the episode.
+
+        Args:
+            policy: callable
+                maps an observation to an action. If it returns an
+                awaitable, the action is awaited, so coroutine
+                functions (i.e. remote inference) can be used.
+            kwargs: the kwargs of GordonGame.reset
+        Yields:
+            obs: ndarray (H, W) float
+                the observation that the action was chosen from
+            action: int
+            rew: float
+            done: bool
+            info: dict
+        """
+        obs, _ = await self.reset(**kwargs)
+        done = False
+        while not done:
+            action = policy(obs)
+            if inspect.isawaitable(action): action = await action
+            next_obs, rew, done, info = await self.step(action)
+            yield obs, action, rew, done, info
+            obs = next_obs
+
+    def close(self):
+        self.env.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
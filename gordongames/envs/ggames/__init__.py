@@ -1,5 +1,6 @@
 from gordongames.envs.ggames.grid import Grid
 from gordongames.envs.ggames.registry import Register, GameObject
+from gordongames.envs.ggames.layouts import LayoutBuffer, LayoutLibrary
 from gordongames.envs.ggames.controllers import *
 from gordongames.envs.ggames.constants import PLAYER, TARG, PILE, ITEM, DIVIDER, BUTTON, BUTTON_PRESS, OBJECT_TYPES, STAY, UP, RIGHT, DOWN, LEFT, DIRECTIONS, COLORS, EVENTS, STEP, FULL, DEFAULT
 from gordongames.envs.ggames.discrete import Discrete
@@ -101,7 +101,7 @@ def navigation_task(contr):
     direction = get_direction(
         player.coord,
         goal_coord,
-        register.rand
+        register.oracle_rand
     )
     return direction, grab
 
@@ -173,7 +173,7 @@ def even_line_match(contr):
     direction = get_direction(
         player.coord,
         goal_coord,
-        register.rand
+        register.oracle_rand
     )
     return direction, grab
 
@@ -241,7 +241,7 @@ def cluster_match(contr):
     direction = get_direction(
         player.coord,
         goal_coord,
-        register.rand
+        register.oracle_rand
     )
     return direction, grab
 
@@ -278,10 +278,10 @@ def nuts_in_can(contr):
         return STAY, 0
 
     if reg.n_items < n_targs:
-        direction = get_direction(player.coord,reg.pile.coord,reg.rand)
+        direction = get_direction(player.coord,reg.pile.coord,reg.oracle_rand)
         grab = player.coord == reg.pile.coord
     else:
-        direction=get_direction(player.coord,reg.button.coord,reg.rand)
+        direction=get_direction(player.coord,reg.button.coord,reg.oracle_rand)
         grab = player.coord==reg.button.coord
     return direction, grab
 
@@ -314,7 +314,7 @@ def nonnumeric_nuts_in_can(contr):
                 return STAY, 1
         return STAY, 0
 
-    direction=get_direction(player.coord,reg.button.coord,reg.rand)
+    direction=get_direction(player.coord,reg.button.coord,reg.oracle_rand)
     grab = player.coord==reg.button.coord
     return direction, grab
 
@@ -371,6 +371,6 @@ def rev_cluster_match(contr):
     # empty space centered on the pile.
     else:
         goal_coord = register.find_space(register.pile.coord)
-    direction = get_direction(player.coord, goal_coord, register.rand)
+    direction = get_direction(player.coord, goal_coord, register.oracle_rand)
     return direction, grab
 
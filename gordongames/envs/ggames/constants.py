@@ -98,3 +98,94 @@ TYPE2PRIORITY = {
     SIGNAL:6,
 }
 
+
+"""
+The order of the object types in bitboard state keys.
+"""
+BITBOARD_TYPES = (PLAYER, PILE, BUTTON, TARG, ITEM, SIGNAL)
+
+
+"""
+The version of the byte encoding produced by encode_state. Bump this
+whenever the layout of the encoding changes so that stored encodings
+and hashes from different layouts never collide.
+"""
+STATE_ENCODING_VERSION = 1
+NULL_INDEX = 0xFFFF
+
+
+"""
+The held out coordinates must be the same for every env, seed and
+process, so they are drawn from their own fixed SeedSequence rather
+than from the env's generators.
+"""
+HELD_OUT_SEED = 12345
+
+
+"""
+The event codes recorded by the Register's optional event log. Each
+record in the log is a row of LOG_FIELDS.
+
+    LOG_RESET: the register was reset
+    LOG_MOVE: the player moved from src to dst
+    LOG_PILE_GRAB: a new item was created from the pile at src and
+        placed at dst
+    LOG_CARRY: the player carried an item or targ from src to dst
+    LOG_DROP: the player stopped carrying an object at src
+    LOG_PILE_DELETE: an item or targ was deleted on the pile at src
+    LOG_RELOCATE: an overlapping item or targ was moved from src to
+        the free space dst found by find_space
+    LOG_BUTTON: the button at src was pressed
+    LOG_FULL: find_space found no free space around src
+"""
+LOG_RESET = 0
+LOG_MOVE = 1
+LOG_PILE_GRAB = 2
+LOG_CARRY = 3
+LOG_DROP = 4
+LOG_PILE_DELETE = 5
+LOG_RELOCATE = 6
+LOG_BUTTON = 7
+LOG_FULL = 8
+
+LOG_EVENTS = {
+    LOG_RESET: "RESET",
+    LOG_MOVE: "MOVE",
+    LOG_PILE_GRAB: "PILE_GRAB",
+    LOG_CARRY: "CARRY",
+    LOG_DROP: "DROP",
+    LOG_PILE_DELETE: "PILE_DELETE",
+    LOG_RELOCATE: "RELOCATE",
+    LOG_BUTTON: "BUTTON",
+    LOG_FULL: "FULL",
+}
+
+"""
+The columns of each event log record. obj_type is the TYPE2PRIORITY
+value of the object involved in the event. src and dst are flat
+indices (row*n_cols+col) or -1 if not applicable.
+"""
+LOG_FIELDS = ("step", "event", "obj_type", "src", "dst")
+
+
+"""
+The documented info keys. See the Info dict section of the README.
+CONTROLLER_INFO_KEYS are produced by the controllers and the remaining
+keys are added by the gym environments.
+"""
+CONTROLLER_INFO_KEYS = (
+    "is_harsh",
+    "n_targs",
+    "n_items",
+    "n_aligned",
+    "disp_targs",
+    "is_animating",
+    "is_pop",
+    "skipped",
+)
+INFO_KEYS = CONTROLLER_INFO_KEYS + (
+    "grab",
+    "player_loc",
+    "count_loc",
+    "end_loc",
+)
@@ -1,8 +1,11 @@
 from gordongames.envs.ggames.grid import Grid
 from gordongames.envs.ggames.registry import Register
 from gordongames.envs.ggames.constants import *
-from gordongames.envs.ggames.utils import get_rows_and_cols, get_aligned_items, get_max_row, zipfian
+from gordongames.envs.ggames.utils import get_rows_and_cols, get_aligned_items, get_max_row, get_zipf_sampler, popcount, get_col_mask, get_row_span, get_max_row_bits, count_aligned_bits, hash_state, count_aligned_coords, sample_timing_schedule
+from gordongames.envs.ggames.info import LazyInfo, get_info_keys, make_info_records, write_info_record
+from gordongames.envs.ggames.layouts import LayoutBuffer
 import numpy as np
+import struct
 import time
 
 """
@@ -16,6 +19,10 @@ class Controller:
     abstract and as such should not be implemented directly. It should
     handle all game logic by manipulating the register.
     """
+    # the Register target placement function that is mirrored by the
+    # LayoutBuffer of the game. None if layouts are not pre-generated
+    layout_kind = None
+
     def __init__(self,
                  targ_range: tuple=(1,10),
                  grid_size: tuple=(31,31),
@@ -31,6 +38,8 @@ class Controller:
                  min_play_area=False,
                  n_held_outs=0,
                  center_signal=True,
+                 info_keys=None,
+                 n_layouts=0,
                  *args, **kwargs):
         """
         targ_range: tuple (Low, High) (inclusive)
@@ -66,7 +75,9 @@ class Controller:
             Only applies when rand_pdb is false.
         rand_timing: bool
             if true, the number of frames for a pixel to be displayed
-            at the beginning is uniformly sampled from 1-2
+            at the beginning is uniformly sampled from 1-2. The skips
+            for the whole animation are sampled from self.rand at
+            reset and stored in self.timing_schedule
         timing_p: float between 0 and 1
             the probability of displaying the next target item. the
             animation phase continues until all targets are displayed
@@ -91,6 +102,17 @@ class Controller:
             if true, signal coord will be centered in demonstration
             area. Otherwise a signal pixel will appear on both
             edges of the grid one row down from the top.
+        info_keys: sequence of str or None
+            the info keys to compute on each step. See INFO_KEYS for
+            options. Keys that are not selected are never computed. If
+            empty, step returns a shared, empty dict that must not be
+            written to. None selects all keys.
+        n_layouts: int
+            if greater than 0, the initial layouts of this many
+            episodes are generated at once and used by the following
+            resets. See LayoutBuffer. Only applies to controllers with
+            a layout_kind and to resets that do not argue n_targs or
+            held_out. The distribution of the layouts is unchanged.
         """
         if type(targ_range) == int:
             targ_range = (targ_range, targ_range)
@@ -111,12 +133,25 @@ class Controller:
         trgs = set(range(targ_range[0],targ_range[1]+1))
         assert len(trgs-hold_outs)>0
         self.is_animating = False
-        self.rand = np.random.default_rng(int(time.time()))
+        # replaced by the env's generator. see GordonGame.seed
+        self.rand = np.random.default_rng()
         self.n_steps = 0
         self.skipped = 0
         self.prev_skipped = 0
         self.n_held_outs = n_held_outs
         self.center_signal = center_signal
+        self.info_keys = get_info_keys(info_keys)
+        self.n_layouts = n_layouts
+        self.layouts = None # made on the first reset that uses it
+        self.layout = None
+        self.next_layout = None
+        # animation state used by the flashing controllers
+        self.targ = None
+        self.invis_targs = []
+        self.flashed_targs = []
+        self.timing_schedule = np.zeros(1, dtype=np.int8)
+        self.anim_step = 0
+        self.flash_masks = None
 
     @property
     def targ_range(self):
@@ -158,6 +193,44 @@ class Controller:
             return 1
         return 0
 
+    def make_info(self):
+        """
+        Creates the info dict for the current state of the game. This
+        should be called before the register is stepped so that the
+        info reflects the previous observation.
+
+        The returned dict is a LazyInfo that only contains the keys in
+        info_keys. n_aligned is only computed if it is read, from a
+        frozen snapshot of the item and target coordinates. If no keys
+        are selected, a new empty dict is returned.
+
+        Returns:
+            info: LazyInfo or dict
+        """
+        keys = self.info_keys
+        if not keys: return dict()
+        reg = self.register
+        info = LazyInfo()
+        if "is_harsh" in keys: info["is_harsh"] = self.harsh
+        if "n_targs" in keys: info["n_targs"] = self.n_targs
+        if "n_items" in keys: info["n_items"] = reg.n_items
+        if "disp_targs" in keys:
+            info["disp_targs"] = int(reg.display_targs)
+        if "is_animating" in keys:
+            info["is_animating"] = int(self.is_animating)
+        if "is_pop" in keys:
+            info["is_pop"] = int(reg.player.coord == reg.pile.coord)
+        if "skipped" in keys: info["skipped"] = self.prev_skipped
+        if "n_aligned" in keys:
+            info.set_lazy(
+                "n_aligned",
+                count_aligned_coords,
+                [item.coord for item in reg._items],
+                [targ.coord for targ in reg._targs],
+                0
+            )
+        return info
+
     def step(self, direction: int, grab: int):
         """
         Step takes a movement and a grabbing action. The function
@@ -175,6 +248,10 @@ class Controller:
         is performed spiraling outward from the center. i.e. up 2, up 2
         right 1, up 2 right 2, up 1 right 2, right 2, etc.
 
+        This step is shared by all games. The initial animation of each
+        game is implemented in animate and end_animation, and the
+        reward of a button press in calculate_reward.
+
         Args:
           direction: int [0, 1, 2, 3, 4]
             Check DIRECTIONS to ensure these values haven't changed
@@ -195,44 +272,319 @@ class Controller:
               they move to.
         """
         self.n_steps += 1
-        info = {
-            "is_harsh": self.harsh,
-            "n_targs": self.n_targs,
-            "n_items": self.register.n_items,
-            "n_aligned": len(get_aligned_items(
-                items=self.register.items,
-                targs=self.register.targs,
-                min_row=0
-            )),
-            "disp_targs":int(self.register.display_targs),
-            "is_animating":int(self.is_animating),
-            "is_pop": int(self.is_pop()),
-            "skipped": self.prev_skipped,
-        }
+        info = self.make_info()
         self.prev_skipped = self.skipped
-        if self.n_steps > self.n_targs and self.is_animating:
-            self.register.make_signal(center_signal=self.center_signal)
-            self.is_animating = False
+        if self.is_animating: grab = self.animate(info, grab)
+        event = self.register.step(direction, grab)
+        if event == STEP: return self.grid.grid, 0, False, info
+        if event == BUTTON_PRESS:
+            rew = self.calculate_reward(harsh=self.harsh)
+            return self.grid.grid, rew, True, info
+        # FULL
+        return self.grid.grid, -1, True, info
+
+    def animate(self, info, grab: int):
+        """
+        Advances the initial animation by one step. This is called by
+        step while is_animating is true, after the info is made and
+        before the register is stepped. Override this member (and
+        end_animation) rather than step to create the animation of a
+        game.
+
+        The default animation displays the targets for n_targs steps
+        during which the player cannot grab.
+
+        Args:
+            info: dict
+                the info of the current step. the animation can
+                overwrite its values
+            grab: int [0,1]
+                the grab action of the current step
+        Returns:
+            grab: int [0,1]
+                the grab action that is passed to the register
+        """
+        if self.n_steps > len(self.register._targs):
+            self.end_animation()
             self.prev_skipped = 0
             self.skipped = 0
-        if self.n_steps <= self.n_targs+1:
-            grab = 0
-            info["n_items"] = self.n_steps-1
+        if "n_items" in info: info["n_items"] = self.n_steps-1
+        return 0
 
-        event = self.register.step(direction, grab)
+    def end_animation(self):
+        """
+        This is called to clean up the initial animation and to display
+        an object that indicates the player should begin.
+        """
+        self.register.make_signal(center_signal=self.center_signal)
+        self.is_animating = False
 
-        done = False
-        rew = 0
-        if event == BUTTON_PRESS:
-            rew = self.calculate_reward(harsh=self.harsh)
-            done = True
-        elif event == FULL:
-            done = True
-            rew = -1
-        elif event == STEP:
-            done = False
-            rew = 0
-        return self.grid.grid, rew, done, info
+    def fast_forward(self, n_lead: int=0, max_frames: int=None):
+        """
+        Runs the remainder of the animation phase in a single call. The
+        player stays still and does not grab during the animation,
+        which is the same as stepping with direction STAY and grab 0
+        until is_animating is false. Afterwards, the next call to step
+        is the first interactive step of the game. If max_frames is
+        reached first, the animation is left unfinished.
+
+        The steps of the default animation (see animate) before its
+        final step only count n_steps and leave the grid unchanged, so
+        they are written in a single broadcast. Other animations are
+        stepped into preallocated outputs.
+
+        Args:
+            n_lead: int
+                the number of leading frames and records that are
+                allocated in front of the animation steps. They are
+                left for the caller to fill (i.e. with the reset
+                observation) so that the outputs are not copied again.
+            max_frames: int or None
+                the maximum number of animation steps. None runs the
+                animation to its end.
+        Returns:
+            frames: ndarray (n_lead+T, H, W)
+                the observation produced by each animation step
+            records: ndarray (n_lead+T,) INFO_DTYPE
+                the info produced by each animation step. See
+                INFO_DTYPE. The leading records are empty.
+        """
+        n_frames = self.get_anim_length()
+        if max_frames is not None:
+            assert max_frames >= 0
+            n_frames = min(n_frames, max_frames)
+        frames = np.empty((n_lead+n_frames, *self.grid.pixel_shape))
+        records = make_info_records(n_lead+n_frames)
+        t = n_lead
+        if n_frames > 1 and type(self).animate is Controller.animate\
+                        and self.register.event_log is None:
+            t += n_frames-1
+            frames[n_lead:t] = self.grid.grid
+            write_info_record(records, n_lead, self.make_info())
+            records[n_lead+1:t] = records[n_lead:n_lead+1]
+            keys = self.info_keys
+            if "n_items" in keys:
+                records["n_items"][n_lead:t] = np.arange(n_frames-1)\
+                                               + self.n_steps
+            if "skipped" in keys:
+                records["skipped"][n_lead+1:t] = self.skipped
+            self.n_steps += n_frames-1
+            self.prev_skipped = self.skipped
+        while self.is_animating and\
+                (max_frames is None or t-n_lead < max_frames):
+            # only grows if an animation outlasts get_anim_length
+            if t == len(frames):
+                frames = np.concatenate([frames, frames[-1:]])
+                records = np.concatenate([records, records[-1:]])
+            obs, _, _, info = self.step(STAY, 0)
+            frames[t] = obs
+            write_info_record(records, t, info)
+            t += 1
+        return frames[:t], records[:t]
+
+    def get_anim_length(self):
+        """
+        Returns the number of steps that remain in the animation phase
+        if the player stays still. The default animation (see animate)
+        ends on the step after n_targs steps.
+
+        Returns:
+            n_steps: int
+        """
+        if not self.is_animating: return 0
+        return max(len(self.register._targs)+1-self.n_steps, 1)
+
+    def render_flash_frames(self, targs, lit):
+        """
+        Renders a sequence of animation frames in a single broadcast
+        over the current grid. Each frame is the current grid with
+        each of the argued targets drawn with the target color if it
+        is lit in that frame and left blank otherwise. The targets
+        must be the only objects at their coordinates.
+
+        Args:
+            targs: sequence of GameObjects (N,)
+                the targets that are animated
+            lit: bool ndarray (T, N)
+                lit[t,i] indicates that targs[i] is displayed in frame t
+        Returns:
+            frames: ndarray (T, H, W)
+        """
+        grid = self.grid
+        background = grid.grid
+        n_targs = len(targs)
+        # pixels that do not belong to a target index the last column
+        # which is never lit
+        targ_img = np.full(grid.pixel_shape, n_targs)
+        space = max(1,grid.density-1)
+        for i,targ in enumerate(targs):
+            row,col = grid.units2pixels(targ.coord)
+            targ_img[row:row+space, col:col+space] = i
+            background[row:row+space, col:col+space] = COLORS[DEFAULT]
+        lit = np.concatenate(
+            [lit, np.zeros((len(lit),1), dtype=bool)], axis=1
+        )
+        return np.where(
+            lit[:, targ_img],
+            COLORS[DEFAULT]+COLORS[TARG],
+            background
+        )
+
+    def flash_records(self, n_frames, n_lead: int=0):
+        """
+        Creates the info records of the first n_frames steps of the
+        flashing animation (see timing_schedule) when the player
+        stays still and does not grab. Used with render_flash_frames.
+
+        Args:
+            n_frames: int
+                the number of steps
+            n_lead: int
+                the number of empty leading records. See fast_forward
+        Returns:
+            records: ndarray (n_lead+n_frames+1,) INFO_DTYPE
+                the final record is left empty for the step that ends
+                the animation
+        """
+        all_records = make_info_records(n_lead+n_frames+1)
+        records = all_records[n_lead:]
+        if n_frames > 0:
+            write_info_record(records, 0, self.make_info())
+            records[1:n_frames] = records[:1]
+        skips = self.timing_schedule[:n_frames]
+        if "n_items" in self.info_keys:
+            # the number of targets displayed before each step
+            shown = np.cumsum(skips==0)
+            records["n_items"][:n_frames] = shown - (skips==0)
+        if "skipped" in self.info_keys:
+            records["skipped"][0] = self.prev_skipped
+            records["skipped"][1:n_frames] = skips[:-1]
+        return all_records
+
+    def make_layout_buffer(self, n_layouts: int=256):
+        """
+        Creates a LayoutBuffer that generates layouts with the same
+        distribution as the resets of this game.
+
+        Args:
+            n_layouts: int
+                the number of layouts generated at once
+        Returns:
+            buffer: LayoutBuffer
+        """
+        assert self.layout_kind is not None,\
+            "{} does not support layouts".format(type(self).__name__)
+        return LayoutBuffer(
+            self.register,
+            kind=self.layout_kind,
+            targ_range=self.targ_range,
+            hold_outs=self.hold_outs,
+            zipf_exponent=self.zipf_exponent,
+            rand_pdb=self.rand_pdb,
+            player_on_pile=self.player_on_pile,
+            spacing_limit=self.spacing_limit,
+            sym_distr=self.sym_distr,
+            n_layouts=n_layouts
+        )
+
+    def get_state(self):
+        """
+        Captures the minimal state of the game so that it can later be
+        restored with set_state. This includes the register, the step
+        and animation counters, the state of the random number
+        generator and the read position of the layout buffer. Targets
+        are referred to by their index in the recorded register state.
+
+        Returns:
+            state: dict
+        """
+        targs = tuple(self.register._targs)
+        idxs = {targ: i for i,targ in enumerate(targs)}
+        return {
+            "register": self.register.get_state(targs),
+            "n_steps": self.n_steps,
+            "skipped": self.skipped,
+            "prev_skipped": self.prev_skipped,
+            "is_animating": self.is_animating,
+            "targ": idxs.get(self.targ, -1),
+            "invis_targs": tuple(idxs[t] for t in self.invis_targs),
+            "flashed_targs": tuple(idxs[t] for t in self.flashed_targs),
+            "timing_schedule": self.timing_schedule,
+            "anim_step": self.anim_step,
+            "flash_masks": self.flash_masks,
+            "rand": self.rand.bit_generator.state,
+            "layouts": None if self.layouts is None else\
+                       self.layouts.get_state(self.rand),
+        }
+
+    def set_state(self, state):
+        """
+        Restores the game to a state produced by get_state. The
+        restored game produces the same future as the game from which
+        the state was captured.
+
+        Args:
+            state: dict
+                a state returned by get_state
+        """
+        targs = self.register.set_state(state["register"])
+        self.n_steps = state["n_steps"]
+        self.skipped = state["skipped"]
+        self.prev_skipped = state["prev_skipped"]
+        self.is_animating = state["is_animating"]
+        self.targ = None
+        if state["targ"] >= 0: self.targ = targs[state["targ"]]
+        self.invis_targs = [targs[i] for i in state["invis_targs"]]
+        self.flashed_targs = [targs[i] for i in state["flashed_targs"]]
+        self.timing_schedule = state["timing_schedule"]
+        self.anim_step = state["anim_step"]
+        self.flash_masks = state["flash_masks"]
+        self.rand.bit_generator.state = state["rand"]
+        self.register.rand = self.rand
+        if self.layouts is not None:
+            if state["layouts"] is None: self.layouts.clear()
+            else: self.layouts.set_state(state["layouts"], self.rand)
+
+    def encode_state(self):
+        """
+        Creates a canonical byte encoding of the game. This is the
+        register encoding (see Register.encode_state) with the targets
+        that remain to be flashed recorded in flashing order, followed
+        by the phase fields of the controller.
+
+        The phase fields are little-endian (n_steps, skipped,
+        prev_skipped, is_animating, n_flashed, targ) as (uint32, uint8,
+        uint8, uint8, uint16, uint16) where targ is the flat index of
+        the currently flashing target or 0xFFFF if there is none. The
+        random number generator is not included.
+
+        Returns:
+            encoding: bytes
+        """
+        n_cols = self.grid.shape[1]
+        targ = NULL_INDEX
+        if self.targ is not None:
+            targ = int(self.targ.coord[0]*n_cols + self.targ.coord[1])
+        return self.register.encode_state(self.invis_targs) + struct.pack(
+            "<IBBBHH",
+            self.n_steps,
+            int(self.skipped),
+            int(self.prev_skipped),
+            int(self.is_animating),
+            len(self.flashed_targs),
+            targ
+        )
+
+    def state_hash(self):
+        """
+        Returns a hash of the encoded state that is stable across
+        processes and library versions. See encode_state.
+
+        Returns:
+            hash: int
+                an unsigned 64 bit int
+        """
+        return hash_state(self.encode_state())
 
     def reset(self, n_targs=None):
         """
@@ -319,74 +671,6 @@ class NavigationTaskController(Controller):
         else:
             return -n_items
 
-    def step(self, direction: int, grab: int):
-        """
-        Step takes a movement and a grabbing action. The function
-        moves the player and any items in the following way.
-
-        If the player was carrying an object and stepped onto another
-        object, the game is handled as follows. While the player
-        continues to grab, all objects and the player remain overlayn.
-        If the player releases the grab button while an object is on
-        top of another object, one of 2 things can happen. If the 
-        underlying object is a pile, the item is returned to the pile.
-        If the underlying object is an item, the previously carried
-        item is placed in the nearest empty location in this order.
-        Up, right, down, left. If none are available a search algorithm
-        is performed spiraling outward from the center. i.e. up 2, up 2
-        right 1, up 2 right 2, up 1 right 2, right 2, etc.
-
-        Args:
-          direction: int [0, 1, 2, 3, 4]
-            Check DIRECTIONS to ensure these values haven't changed
-                0: no movement
-                1: move up (lower row unit)
-                2: move right (higher column unit)
-                3: move down (higher row unit)
-                4: move left (lower column unit)
-          grab: int [0,1]
-            grab is an action to enable the agent to carry items around
-            the grid. when a player is on top of an item, they can grab
-            the item and carry it with them as they move. If the player
-            is on top of a pile, a new item is created and carried with
-            them to the next square.
-        
-            0: quit grabbing item
-            1: grab item. item will follow player to whichever square
-              they move to.
-        """
-        self.n_steps += 1
-        info = {
-            "is_harsh": self.harsh,
-            "n_targs": self.n_targs,
-            "n_items": self.register.n_items,
-            "n_aligned": len(get_aligned_items(
-                items=self.register.items,
-                targs=self.register.targs,
-                min_row=0
-            )),
-            "disp_targs":int(self.register.display_targs),
-            "is_animating":int(self.is_animating),
-            "is_pop": int(self.is_pop()),
-            "skipped": self.prev_skipped,
-        }
-        self.prev_skipped = self.skipped
-
-        event = self.register.step(direction, grab)
-
-        done = False
-        rew = 0
-        if event == BUTTON_PRESS:
-            rew = self.calculate_reward(harsh=self.harsh)
-            done = True
-        elif event == FULL:
-            done = True
-            rew = -1
-        elif event == STEP:
-            done = False
-            rew = 0
-        return self.grid.grid, rew, done, info
-
 class EvenLineMatchController(Controller):
     """
     This class creates an instance of an Even Line Match game.
@@ -394,6 +678,8 @@ class EvenLineMatchController(Controller):
     The agent must align a single item along the column of each of the
     target objects.
     """
+    layout_kind = "even_targ_spacing"
+
     def __init__(self, harsh: bool=False, *args, **kwargs):
         """
         See base Controller class for details into arguments.
@@ -420,27 +706,51 @@ class EvenLineMatchController(Controller):
             min_play_area=self.min_play_area
         )
         self.register = Register(
-            self.grid, n_targs=1, n_held_outs=self.n_held_outs
+            self.grid,
+            n_targs=1,
+            n_held_outs=self.n_held_outs,
+            max_targs=self.targ_range[1]
         )
         self.harsh = harsh
 
-    def init_variables(self, n_targs=None):
+    def init_variables(self, n_targs=None, held_out=False):
         """
         This function should be called everytime the environment starts
         a new episode. The animation simply allows a number of frames
         for the agent to count the targets on the grid.
+
+        Args:
+            n_targs: int or None
+                if int is argued, this will dictate the number of
+                target items for the episode
+            held_out: bool
+                if true, the episode will be sampled from the held out
+                episodes so no pre-generated layout is used
         """
         self.register.rand = self.rand
         self.n_steps = 0
-        if n_targs is None:
+        # a layout that was loaded from a LayoutLibrary takes priority
+        self.layout = self.next_layout
+        self.next_layout = None
+        use_layouts = self.n_layouts>0 and self.layout_kind is not None
+        if self.layout is not None:
+            n_targs = len(self.layout[1])
+        elif n_targs is None and use_layouts and not held_out:
+            if self.layouts is None:
+                self.layouts = self.make_layout_buffer(self.n_layouts)
+            n_targs, ppb_cols, targ_coords = self.layouts.pop(self.rand)
+            self.layout = (ppb_cols, targ_coords)
+        elif n_targs is None:
             low, high = self.targ_range
-            sampler = lambda: self.rand.integers(low,high+1)
             if self.zipf_exponent is not None:
-                sampler = lambda: zipfian(
-                    low, high, self.zipf_exponent, rand=self.rand
-                )
-            n_targs = sampler()
-            while n_targs in self.hold_outs: n_targs = sampler()
+                # the hold outs are folded into the distribution
+                n_targs = get_zipf_sampler(
+                    low, high, self.zipf_exponent, self.hold_outs
+                ).sample(rand=self.rand)
+            else:
+                n_targs = self.rand.integers(low,high+1)
+                while n_targs in self.hold_outs:
+                    n_targs = self.rand.integers(low,high+1)
         elif n_targs in self.hold_outs:
             print("Overriding holds outs using", n_targs, "targs")
         # wipes items from grid and makes/deletes targs
@@ -457,7 +767,8 @@ class EvenLineMatchController(Controller):
             rand_pdb=self.rand_pdb,
             player_on_pile=self.player_on_pile,
             spacing_limit=self.spacing_limit,
-            sym_distr=self.sym_distr
+            sym_distr=self.sym_distr,
+            layout=self.layout
         )
         self.skipped = 0
         self.prev_skipped = 0
@@ -491,22 +802,25 @@ class EvenLineMatchController(Controller):
             rew: float
                 the calculated reward
         """
-        targs = self.register.targs
-        items = self.register.items
-        if harsh and len(targs) != len(items): return -1
+        n_targs = self.register.n_targs
+        n_items = self.register.n_items
+        if harsh and n_targs != n_items: return -1
 
-        item_rows, item_cols = get_rows_and_cols(items)
-        _, targ_cols = get_rows_and_cols(targs)
+        n_cols = self.grid.shape[1]
+        bitboards = self.register.get_bitboards()
+        min_row, max_row = get_row_span(bitboards[ITEM], n_cols)
+        item_cols = get_col_mask(bitboards[ITEM], n_cols)
+        targ_cols = get_col_mask(bitboards[TARG], n_cols)
 
-        if len(item_rows) > 1: return -1
+        if min_row != max_row: return -1
         if harsh:
             if targ_cols == item_cols: return 1
             return -1
         else:
-            intersection = targ_cols.intersection(item_cols)
-            rew = len(intersection)
-            rew -= (len(item_cols)-len(intersection))
-            rew -= max(0, np.abs(len(items)-len(targs)))
+            n_intersection = popcount(targ_cols & item_cols)
+            rew = n_intersection
+            rew -= (popcount(item_cols)-n_intersection)
+            rew -= max(0, np.abs(n_items-n_targs))
             return rew
 
 class ClusterMatchController(EvenLineMatchController):
@@ -516,6 +830,8 @@ class ClusterMatchController(EvenLineMatchController):
     The agent must place the same number of items as targets along a
     single row. The targets are randomly distributed about the grid.
     """
+    layout_kind = "rand_targ_placement"
+
     def reset(self, n_targs=None, held_out=False):
         """
         This function should be called everytime the environment starts
@@ -530,13 +846,14 @@ class ClusterMatchController(EvenLineMatchController):
                 if true, will sample an episode that was held out from
                 the non-held out episodes
         """
-        self.init_variables(n_targs)
+        self.init_variables(n_targs, held_out=held_out)
         self.register.cluster_match(
             rand_pdb=self.rand_pdb,
             player_on_pile=self.player_on_pile,
             spacing_limit=self.spacing_limit,
             sym_distr=self.sym_distr,
-            held_out=held_out
+            held_out=held_out,
+            layout=self.layout
         )
         self.skipped = 0
         self.prev_skipped = 0
@@ -572,11 +889,13 @@ class ClusterMatchController(EvenLineMatchController):
             rew: float
                 the calculated reward
         """
-        targs = self.register.targs
-        items = self.register.items
-        max_row, n_aligned = get_max_row(items,min_row=1,ret_count=True)
-        n_targs = len(targs)
-        n_items = len(items)
+        n_targs = self.register.n_targs
+        n_items = self.register.n_items
+        max_row, n_aligned = get_max_row_bits(
+            self.register.get_bitboard(ITEM),
+            self.grid.shape[1],
+            min_row=1
+        )
         if harsh:
             if n_items == n_targs: return int(n_aligned == n_targs)
             else: return -1
@@ -636,15 +955,15 @@ class ReverseClusterMatchController(EvenLineMatchController):
             rew: float
                 the calculated reward
         """
-        targs = self.register.targs
-        items = self.register.items
-        n_targs = len(targs)
-        n_items = len(items)
-        n_aligned = len(get_aligned_items(
-            items=items,
-            targs=targs,
+        n_targs = self.register.n_targs
+        n_items = self.register.n_items
+        bitboards = self.register.get_bitboards()
+        n_aligned = count_aligned_bits(
+            bitboards[ITEM],
+            bitboards[TARG],
+            self.grid.shape[1],
             min_row=0
-        ))
+        )
         if n_aligned == n_targs:
             return int(n_aligned == 1)
         if harsh:
@@ -697,6 +1016,8 @@ class UnevenLineMatchController(EvenLineMatchController):
     The agent must align a single item along the column of each of the
     target objects. The target objects are unevenly spaced.
     """
+    layout_kind = "uneven_targ_spacing"
+
     def reset(self, n_targs=None, *args, **kwargs):
         """
         This function should be called everytime the environment starts
@@ -716,7 +1037,8 @@ class UnevenLineMatchController(EvenLineMatchController):
             rand_pdb=self.rand_pdb,
             player_on_pile=self.player_on_pile,
             spacing_limit=self.spacing_limit,
-            sym_distr=self.sym_distr
+            sym_distr=self.sym_distr,
+            layout=self.layout
         )
         self.skipped = 0
         self.prev_skipped = 0
@@ -730,6 +1052,8 @@ class OrthogonalLineMatchController(ClusterMatchController):
     must be aligned vertically and evenly spaced by 0 if the targs are
     spaced by 0 or items must be spaced by 1 otherwise.
     """
+    layout_kind = "vertical_targ_spacing"
+
     def reset(self, n_targs=None, *args, **kwargs):
         """
         This function should be called everytime the environment starts
@@ -741,7 +1065,8 @@ class OrthogonalLineMatchController(ClusterMatchController):
             rand_pdb=self.rand_pdb,
             player_on_pile=self.player_on_pile,
             spacing_limit=self.spacing_limit,
-            sym_distr=self.sym_distr
+            sym_distr=self.sym_distr,
+            layout=self.layout
         )
         self.skipped = 0
         self.prev_skipped = 0
@@ -757,73 +1082,14 @@ class BriefPresentationController(ClusterMatchController):
     targets that were originally displayed along a single row. The
     targets are randomly distributed about the grid.
     """
-    def step(self, direction: int, grab: int):
+    def end_animation(self):
         """
-        Step takes a movement and a grabbing action. The function
-        moves the player and any items in the following way.
-
-        This function determines if the targets should be displayed
-        anymore based on the total number of steps taken so far.
-
-        Args:
-          direction: int [0, 1, 2, 3, 4]
-            Check DIRECTIONS to ensure these values haven't changed
-                0: no movement
-                1: move up (lower row unit)
-                2: move right (higher column unit)
-                3: move down (higher row unit)
-                4: move left (lower column unit)
-          grab: int [0,1]
-            grab is an action to enable the agent to carry items around
-            the grid. when a player is on top of an item, they can grab
-            the item and carry it with them as they move. If the player
-            is on top of a pile, a new item is created and carried with
-            them to the next square.
-        
-            0: quit grabbing item
-            1: grab item. item will follow player to whichever square
-              they move to.
+        Displays the signal and hides the targets at the end of the
+        presentation.
         """
-        self.n_steps += 1
-        info = {
-            "is_harsh": self.harsh,
-            "n_targs": self.n_targs,
-            "n_items": self.register.n_items,
-            "n_aligned": len(get_aligned_items(
-                items=self.register.items,
-                targs=self.register.targs,
-                min_row=0
-            )),
-            "disp_targs":int(self.register.display_targs),
-            "is_animating":int(self.is_animating),
-            "is_pop": int(self.is_pop()),
-            "skipped": self.prev_skipped,
-        }
-        self.prev_skipped = self.skipped
-        if self.n_steps > self.n_targs and self.is_animating:
-            self.register.make_signal(center_signal=self.center_signal)
-            self.register.hide_targs()
-            self.is_animating = False
-            self.prev_skipped = 0
-            self.skipped = 0
-        if self.n_steps <= self.n_targs+1:
-            grab = 0
-            info["n_items"] = self.n_steps-1
-
-        event = self.register.step(direction, grab)
-
-        done = False
-        rew = 0
-        if event == BUTTON_PRESS:
-            rew = self.calculate_reward(harsh=self.harsh)
-            done = True
-        elif event == FULL:
-            done = True
-            rew = -1
-        elif event == STEP:
-            done = False
-            rew = 0
-        return self.grid.grid, rew, done, info
+        self.register.make_signal(center_signal=self.center_signal)
+        self.register.hide_targs()
+        self.is_animating = False
 
 class NutsInCanController(EvenLineMatchController):
     """
@@ -843,6 +1109,8 @@ class NutsInCanController(EvenLineMatchController):
     to display until the total quantity of items doubles that of the
     targets.
     """
+    layout_kind = "rand_targ_placement"
+
     def reset(self, n_targs=None, held_out=False):
         """
         This function should be called everytime the environment starts
@@ -856,18 +1124,19 @@ class NutsInCanController(EvenLineMatchController):
                 if true, will sample an episode that was held out from
                 the non-held out episodes
         """
-        self.init_variables(n_targs)
+        self.init_variables(n_targs, held_out=held_out)
 
         # randomize object placement on grid, only display one target
-        # for first frame. invis_targs is a set
+        # for first frame. invis_targs is a list
         self.register.cluster_match(
             rand_pdb=self.rand_pdb,
             player_on_pile=self.player_on_pile,
             spacing_limit=self.spacing_limit,
             sym_distr=self.sym_distr,
-            held_out=held_out
+            held_out=held_out,
+            layout=self.layout
         )
-        self.invis_targs = self.register.targs
+        self.invis_targs = list(self.register.targs)
         self.targ = None
         for targ in self.invis_targs:
             targ.color = COLORS[DEFAULT]
@@ -875,51 +1144,36 @@ class NutsInCanController(EvenLineMatchController):
         self.register.draw_register()
         self.skipped = 0
         self.prev_skipped = 0
+        # the targets are flashed in reverse order of invis_targs. only
+        # the most recent target is displayed and nothing is displayed
+        # on skipped steps
+        self.timing_schedule = sample_timing_schedule(
+            len(self.invis_targs),
+            self.timing_p if self.rand_timing else 1,
+            rand=self.rand
+        )
+        self.anim_step = 0
+        skips = self.timing_schedule[:-1]
+        shown = np.cumsum(skips==0)
+        order = np.arange(len(self.invis_targs))
+        self.flash_masks = (order==shown[:,None]-1)&(skips[:,None]==0)
         return self.grid.grid
 
-    def step(self, direction: int, grab: int):
+    def animate(self, info, grab: int):
         """
-        Step takes a movement and a grabbing action. The function
-        moves the player and any items in the following way.
-
-        This function determines if the targets should be displayed
-        anymore based on the total number of steps taken so far.
+        Flashes the next target in the timing schedule. Each flashed
+        target is hidden again when the next target is flashed. See
+        Controller.animate.
 
         Args:
-          direction: int [0, 1, 2, 3, 4]
-            Check DIRECTIONS to ensure these values haven't changed
-                0: no movement
-                1: move up (lower row unit)
-                2: move right (higher column unit)
-                3: move down (higher row unit)
-                4: move left (lower column unit)
-          grab: int [0,1]
-            grab is an action to enable the agent to carry items around
-            the grid. when a player is on top of an item, they can grab
-            the item and carry it with them as they move. If the player
-            is on top of a pile, a new item is created and carried with
-            them to the next square.
-        
-            0: quit grabbing item
-            1: grab item. item will follow player to whichever square
-              they move to.
+            info: dict
+                the info of the current step
+            grab: int [0,1]
+                the grab action of the current step
+        Returns:
+            grab: int [0,1]
         """
-        self.n_steps += 1
-        info = {
-            "is_harsh": self.harsh,
-            "n_targs": self.n_targs,
-            "n_items": self.register.n_items,
-            "n_aligned": len(get_aligned_items(
-                items=self.register.items,
-                targs=self.register.targs,
-                min_row=0
-            )),
-            "disp_targs":int(self.register.display_targs),
-            "is_animating":int(self.is_animating),
-            "is_pop": int(self.is_pop()),
-            "skipped": self.prev_skipped,
-        }
-        self.prev_skipped = self.skipped
+        n_targs = len(self.register._targs)
         if self.targ is None:
             if self.skipped:
                 self.n_steps -= 1
@@ -934,32 +1188,78 @@ class NutsInCanController(EvenLineMatchController):
                 self.flashed_targs.append(self.targ)
                 self.targ = self.invis_targs.pop()
                 self.targ.color = COLORS[TARG]
-        elif len(self.invis_targs)==0 and self.is_animating:
+        else:
             self.end_animation()
             self.prev_skipped = 0
             self.skipped = 0
-        event = self.register.step(direction, grab)
-        if self.n_steps <= self.n_targs:
-            info["n_items"] = self.n_steps-int(not self.skipped)
-        elif self.n_steps == self.n_targs+1:
-            info["n_items"] = self.n_targs
-        done = False
-        rew = 0
-        if event == BUTTON_PRESS:
-            rew = self.calculate_reward(harsh=self.harsh)
-            done = True
-        elif event == FULL:
-            done = True
-            rew = -1
-        elif event == STEP:
-            done = False
-            rew = 0
+        if "n_items" in info:
+            if self.n_steps <= n_targs:
+                info["n_items"] = self.n_steps-int(not self.skipped)
+            elif self.n_steps == n_targs+1:
+                info["n_items"] = n_targs
         # Perform for next frame
-        if self.is_animating and self.rand_timing and\
-                    np.random.random()>=self.timing_p:
-            self.skipped = 1
+        if self.is_animating:
+            self.anim_step += 1
+            self.skipped = int(self.timing_schedule[self.anim_step])
         else: self.skipped = 0
-        return self.grid.grid, rew, done, info
+        return grab
+
+    def fast_forward(self, n_lead: int=0, max_frames: int=None):
+        """
+        Runs the remainder of the animation phase in a single call. See
+        Controller.fast_forward. If the animation has not started, the
+        flashing frames are rendered from flash_masks in a single
+        broadcast rather than by stepping the game.
+
+        Args:
+            n_lead: int
+                see Controller.fast_forward
+            max_frames: int or None
+                see Controller.fast_forward. The animation is stepped
+                if it is cut short.
+        Returns:
+            frames: ndarray (n_lead+T, H, W)
+                the observation produced by each animation step
+            records: ndarray (n_lead+T,) INFO_DTYPE
+                the info produced by each animation step. See
+                INFO_DTYPE
+        """
+        if self.flash_masks is None or self.anim_step > 0 or\
+                not self.is_animating or\
+                self.register.event_log is not None or\
+                (max_frames is not None and\
+                    max_frames < self.get_anim_length()):
+            return super().fast_forward(n_lead, max_frames)
+        targs = self.invis_targs[::-1]
+        n_frames = len(self.flash_masks)
+        frames = self.render_flash_frames(targs, self.flash_masks)
+        records = self.flash_records(n_frames, n_lead)
+
+        # jump to the state before the final step of the animation
+        for targ in targs: targ.color = COLORS[DEFAULT]
+        self.targ = targs[-1]
+        self.targ.color = COLORS[TARG]
+        self.flashed_targs = targs[:-1]
+        self.invis_targs = []
+        self.n_steps = len(targs)
+        self.prev_skipped = int(self.timing_schedule[n_frames-1])
+        self.skipped = int(self.timing_schedule[n_frames])
+        self.anim_step = n_frames
+        obs, _, _, info = self.step(STAY, 0)
+        write_info_record(records, n_lead+n_frames, info)
+        lead = np.empty((n_lead, *obs.shape))
+        return np.concatenate([lead, frames, obs[None]]), records
+
+    def get_anim_length(self):
+        """
+        See Controller.get_anim_length. The animation lasts for the
+        remainder of the timing schedule.
+
+        Returns:
+            n_steps: int
+        """
+        if not self.is_animating: return 0
+        return max(len(self.timing_schedule)-self.anim_step, 1)
 
     def calculate_reward(self, harsh=False):
         """
@@ -1002,6 +1302,8 @@ class VisNutsController(EvenLineMatchController):
     to display until the total quantity of items doubles that of the
     targets.
     """
+    layout_kind = "rand_targ_placement"
+
     def reset(self, n_targs=None, held_out=False):
         """
         This function should be called everytime the environment starts
@@ -1015,18 +1317,19 @@ class VisNutsController(EvenLineMatchController):
                 if true, will sample an episode that was held out from
                 the non-held out episodes
         """
-        self.init_variables(n_targs)
+        self.init_variables(n_targs, held_out=held_out)
         # randomize object placement on grid, only display one target
-        # for first frame. invis_targs is a set
+        # for first frame. invis_targs is a list
         self.register.cluster_match(
             {self.register.get_signal_coord()},
             rand_pdb=self.rand_pdb,
             player_on_pile=self.player_on_pile,
             spacing_limit=self.spacing_limit,
             sym_distr=self.sym_distr,
-            held_out=held_out
+            held_out=held_out,
+            layout=self.layout
         )
-        self.invis_targs = self.register.targs
+        self.invis_targs = list(self.register.targs)
         self.targ = None
         for targ in self.invis_targs:
             targ.color = COLORS[DEFAULT]
@@ -1034,51 +1337,32 @@ class VisNutsController(EvenLineMatchController):
         self.register.draw_register()
         self.skipped = 0
         self.prev_skipped = 0
+        # the targets are flashed in reverse order of invis_targs and
+        # remain displayed once flashed
+        self.timing_schedule = sample_timing_schedule(
+            len(self.invis_targs),
+            self.timing_p if self.rand_timing else 1,
+            rand=self.rand
+        )
+        self.anim_step = 0
+        shown = np.cumsum(self.timing_schedule[:-1]==0)
+        order = np.arange(len(self.invis_targs))
+        self.flash_masks = order < shown[:,None]
         return self.grid.grid
 
-    def step(self, direction: int, grab: int):
+    def animate(self, info, grab: int):
         """
-        Step takes a movement and a grabbing action. The function
-        moves the player and any items in the following way.
-
-        This function determines if the targets should be displayed
-        anymore based on the total number of steps taken so far.
+        Flashes the next target in the timing schedule. Flashed targets
+        remain displayed. See Controller.animate.
 
         Args:
-          direction: int [0, 1, 2, 3, 4]
-            Check DIRECTIONS to ensure these values haven't changed
-                0: no movement
-                1: move up (lower row unit)
-                2: move right (higher column unit)
-                3: move down (higher row unit)
-                4: move left (lower column unit)
-          grab: int [0,1]
-            grab is an action to enable the agent to carry items around
-            the grid. when a player is on top of an item, they can grab
-            the item and carry it with them as they move. If the player
-            is on top of a pile, a new item is created and carried with
-            them to the next square.
-        
-            0: quit grabbing item
-            1: grab item. item will follow player to whichever square
-              they move to.
+            info: dict
+                the info of the current step
+            grab: int [0,1]
+                the grab action of the current step
+        Returns:
+            grab: int [0,1]
         """
-        self.n_steps += 1
-        info = {
-            "is_harsh": self.harsh,
-            "n_targs": self.n_targs,
-            "n_items": self.register.n_items,
-            "n_aligned": len(get_aligned_items(
-                items=self.register.items,
-                targs=self.register.targs,
-                min_row=0
-            )),
-            "disp_targs":int(self.register.display_targs),
-            "is_animating":int(self.is_animating),
-            "is_pop": int(self.is_pop()),
-            "skipped": self.prev_skipped,
-        }
-        self.prev_skipped = self.skipped
         if self.targ is None:
             if self.skipped:
                 self.n_steps -= 1
@@ -1092,30 +1376,76 @@ class VisNutsController(EvenLineMatchController):
                 self.flashed_targs.append(self.targ)
                 self.targ = self.invis_targs.pop()
                 self.targ.color = COLORS[TARG]
-        elif len(self.invis_targs)==0 and self.is_animating:
+        else:
             self.end_animation()
             self.prev_skipped = 0
             self.skipped = 0
-        event = self.register.step(direction, grab)
-        if self.n_steps <= self.n_targs + 1:
-            info["n_items"] = self.n_steps-int(not self.skipped)
-        done = False
-        rew = 0
-        if event == BUTTON_PRESS:
-            rew = self.calculate_reward(harsh=self.harsh)
-            done = True
-        elif event == FULL:
-            done = True
-            rew = -1
-        elif event == STEP:
-            done = False
-            rew = 0
+        if "n_items" in info:
+            if self.n_steps <= len(self.register._targs) + 1:
+                info["n_items"] = self.n_steps-int(not self.skipped)
         # Perform for next frame
-        if self.is_animating and self.rand_timing and\
-                    np.random.random()>=self.timing_p:
-            self.skipped = 1
+        if self.is_animating:
+            self.anim_step += 1
+            self.skipped = int(self.timing_schedule[self.anim_step])
         else: self.skipped = 0
-        return self.grid.grid, rew, done, info
+        return grab
+
+    def fast_forward(self, n_lead: int=0, max_frames: int=None):
+        """
+        Runs the remainder of the animation phase in a single call. See
+        Controller.fast_forward. If the animation has not started, the
+        flashing frames are rendered from flash_masks in a single
+        broadcast rather than by stepping the game.
+
+        Args:
+            n_lead: int
+                see Controller.fast_forward
+            max_frames: int or None
+                see Controller.fast_forward. The animation is stepped
+                if it is cut short.
+        Returns:
+            frames: ndarray (n_lead+T, H, W)
+                the observation produced by each animation step
+            records: ndarray (n_lead+T,) INFO_DTYPE
+                the info produced by each animation step. See
+                INFO_DTYPE
+        """
+        if self.flash_masks is None or self.anim_step > 0 or\
+                not self.is_animating or\
+                self.register.event_log is not None or\
+                (max_frames is not None and\
+                    max_frames < self.get_anim_length()):
+            return super().fast_forward(n_lead, max_frames)
+        targs = self.invis_targs[::-1]
+        n_frames = len(self.flash_masks)
+        frames = self.render_flash_frames(targs, self.flash_masks)
+        records = self.flash_records(n_frames, n_lead)
+
+        # jump to the state before the final step of the animation
+        for targ in targs: targ.color = COLORS[TARG]
+        self.targ = targs[-1]
+        self.targ.color = COLORS[TARG]
+        self.flashed_targs = targs[:-1]
+        self.invis_targs = []
+        self.n_steps = len(targs)
+        self.prev_skipped = int(self.timing_schedule[n_frames-1])
+        self.skipped = int(self.timing_schedule[n_frames])
+        self.anim_step = n_frames
+        obs, _, _, info = self.step(STAY, 0)
+        write_info_record(records, n_lead+n_frames, info)
+        lead = np.empty((n_lead, *obs.shape))
+        return np.concatenate([lead, frames, obs[None]]), records
+
+    def get_anim_length(self):
+        """
+        See Controller.get_anim_length. The animation lasts for the
+        remainder of the timing schedule.
+
+        Returns:
+            n_steps: int
+        """
+        if not self.is_animating: return 0
+        return max(len(self.timing_schedule)-self.anim_step, 1)
 
     def calculate_reward(self, harsh=False):
         """
@@ -1172,18 +1502,19 @@ class StaticVisNutsController(VisNutsController):
                 if true, will sample an episode that was held out from
                 the non-held out episodes
         """
-        self.init_variables(n_targs)
+        self.init_variables(n_targs, held_out=held_out)
         # randomize object placement on grid, only display one target
-        # for first frame. invis_targs is a set
+        # for first frame. invis_targs is a list
         self.register.cluster_match(
             {self.register.get_signal_coord()},
             rand_pdb=self.rand_pdb,
             player_on_pile=self.player_on_pile,
             spacing_limit=self.spacing_limit,
             sym_distr=self.sym_distr,
-            held_out=held_out
+            held_out=held_out,
+            layout=self.layout
         )
-        self.invis_targs = self.register.targs
+        self.invis_targs = list(self.register.targs)
         #for targ in self.invis_targs:
         #    targ.color = COLORS[TARG]
         self.targ = None
@@ -1191,6 +1522,17 @@ class StaticVisNutsController(VisNutsController):
         self.register.draw_register()
         self.skipped = 0
         self.prev_skipped = 0
+        # all targets are displayed for the whole animation
+        self.timing_schedule = sample_timing_schedule(
+            len(self.invis_targs),
+            self.timing_p if self.rand_timing else 1,
+            rand=self.rand
+        )
+        self.anim_step = 0
+        self.flash_masks = np.ones(
+            (len(self.timing_schedule)-1, len(self.invis_targs)),
+            dtype=bool
+        )
         return self.grid.grid
 
 class InvisNController(NutsInCanController):
@@ -1214,82 +1556,32 @@ class InvisNController(NutsInCanController):
                 if true, will sample an episode that was held out from
                 the non-held out episodes
         """
-        super.reset(n_targs=n_targs, held_out=held_out)
+        super().reset(n_targs=n_targs, held_out=held_out)
         self.n_steps = self.n_targs
+        # the animation is a single step
+        self.timing_schedule = sample_timing_schedule(0)
+        self.flash_masks = None
         return self.grid.grid
 
-    def step(self, direction: int, grab: int):
+    def animate(self, info, grab: int):
         """
         Initial reset frame is blank with n_items equal to n_targs
         Subsequent frame has signal, player cannot play still. n_items
         is equal to 0.
 
-        Next frame, player can play.
-        Step takes a movement and a grabbing action. The function
-        moves the player and any items in the following way.
-
-        This function determines if the targets should be displayed
-        anymore based on the total number of steps taken so far.
+        Next frame, player can play. See Controller.animate.
 
         Args:
-          direction: int [0, 1, 2, 3, 4]
-            Check DIRECTIONS to ensure these values haven't changed
-                0: no movement
-                1: move up (lower row unit)
-                2: move right (higher column unit)
-                3: move down (higher row unit)
-                4: move left (lower column unit)
-          grab: int [0,1]
-            grab is an action to enable the agent to carry items around
-            the grid. when a player is on top of an item, they can grab
-            the item and carry it with them as they move. If the player
-            is on top of a pile, a new item is created and carried with
-            them to the next square.
-        
-            0: quit grabbing item
-            1: grab item. item will follow player to whichever square
-              they move to.
+            info: dict
+                the info of the current step
+            grab: int [0,1]
+                the grab action of the current step
+        Returns:
+            grab: int [0,1]
         """
-        self.n_steps += 1
-        info = {
-            "is_harsh": self.harsh,
-            "n_targs": self.n_targs,
-            "n_items": self.register.n_items,
-            "n_aligned": len(get_aligned_items(
-                items=self.register.items,
-                targs=self.register.targs,
-                min_row=0
-            )),
-            "disp_targs":int(self.register.display_targs),
-            "is_animating":int(self.is_animating),
-            "is_pop": int(self.is_pop()),
-            "skipped": self.prev_skipped,
-        }
-        self.prev_skipped = self.skipped
-
-        # Initial reset frame is blank with n_items equal to n_targs
-        # Subsequent frame has signal, player cannot play still. n_items
-        # is equal to 0.
-        # Next frame, player can play.
-        if self.is_animating:
-            info["n_items"] = self.n_targs
-            self.register.make_signal(center_signal=self.center_signal)
-            self.register.hide_targs()
-            self.is_animating = False
-
-        event = self.register.step(direction, grab)
-        done = False
-        rew = 0
-        if event == BUTTON_PRESS:
-            rew = self.calculate_reward(harsh=self.harsh)
-            done = True
-        elif event == FULL:
-            done = True
-            rew = -1
-        elif event == STEP:
-            done = False
-            rew = 0
-        return self.grid.grid, rew, done, info
+        if "n_items" in info: info["n_items"] = len(self.register._targs)
+        self.end_animation()
+        return grab
 
 class VisNController(StaticVisNutsController):
     """
@@ -1312,86 +1604,38 @@ class VisNController(StaticVisNutsController):
                 if true, will sample an episode that was held out from
                 the non-held out episodes
         """
-        super.reset(n_targs=n_targs, held_out=held_out)
+        super().reset(n_targs=n_targs, held_out=held_out)
         self.n_steps = self.n_targs
+        # the animation is a single step
+        self.timing_schedule = sample_timing_schedule(0)
+        self.flash_masks = None
         return self.grid.grid
 
-    def step(self, direction: int, grab: int):
+    def animate(self, info, grab: int):
         """
         Initial reset frame is blank with n_items equal to n_targs
-        Subsequent frame has signal, player cannot play still. n_items
-        is equal to 0.
-
-        Next frame, player can play.
-        Step takes a movement and a grabbing action. The function
-        moves the player and any items in the following way.
+        Subsequent frame displays all targs and phase signal,
+        player cannot play still. n_items is equal to 0.
 
-        This function determines if the targets should be displayed
-        anymore based on the total number of steps taken so far.
+        Next frame, player can play. See Controller.animate.
 
         Args:
-          direction: int [0, 1, 2, 3, 4]
-            Check DIRECTIONS to ensure these values haven't changed
-                0: no movement
-                1: move up (lower row unit)
-                2: move right (higher column unit)
-                3: move down (higher row unit)
-                4: move left (lower column unit)
-          grab: int [0,1]
-            grab is an action to enable the agent to carry items around
-            the grid. when a player is on top of an item, they can grab
-            the item and carry it with them as they move. If the player
-            is on top of a pile, a new item is created and carried with
-            them to the next square.
-        
-            0: quit grabbing item
-            1: grab item. item will follow player to whichever square
-              they move to.
+            info: dict
+                the info of the current step
+            grab: int [0,1]
+                the grab action of the current step
+        Returns:
+            grab: int [0,1]
         """
-        self.n_steps += 1
-        info = {
-            "is_harsh": self.harsh,
-            "n_targs": self.n_targs,
-            "n_items": self.register.n_items,
-            "n_aligned": len(get_aligned_items(
-                items=self.register.items,
-                targs=self.register.targs,
-                min_row=0
-            )),
-            "disp_targs":int(self.register.display_targs),
-            "is_animating":int(self.is_animating),
-            "is_pop": int(self.is_pop()),
-            "skipped": self.prev_skipped,
-        }
-        self.prev_skipped = self.skipped
-
-        # Initial reset frame is blank with n_items equal to n_targs
-        # Subsequent frame displays all targs and phase signal,
-        # player cannot play still. n_items is equal to 0.
-        # Next frame, player can play.
-        if self.is_animating:
-            info["n_items"] = self.n_targs
-            if not self.skipped:
-                self.end_animation()
-                self.prev_skipped = 0
-                self.skipped = 0
-
-        event = self.register.step(direction, grab)
-        done = False
-        rew = 0
-        if event == BUTTON_PRESS:
-            rew = self.calculate_reward(harsh=self.harsh)
-            done = True
-        elif event == FULL:
-            done = True
-            rew = -1
-        elif event == STEP:
-            done = False
-            rew = 0
+        if "n_items" in info: info["n_items"] = len(self.register._targs)
+        if not self.skipped:
+            self.end_animation()
+            self.prev_skipped = 0
+            self.skipped = 0
         # Perform skip for next frame
-        if self.is_animating and self.rand_timing and\
-                    np.random.random()>=self.timing_p:
-            self.skipped = 1
+        if self.is_animating:
+            self.anim_step += 1
+            self.skipped = int(self.timing_schedule[self.anim_step])
         else: self.skipped = 0
-        return self.grid.grid, rew, done, info
+        return grab
 
@@ -0,0 +1,88 @@
+import numpy as np
+from gordongames.envs.ggames.constants import LOG_FIELDS
+
+class EventLog:
+    """
+    A fixed size ring buffer of integer event records. Each record is
+    a row of LOG_FIELDS (step, event, obj_type, src, dst). Once the
+    buffer is full, the oldest records are overwritten.
+
+    The log is written to by the Register when it is enabled. See
+    Register.enable_event_log.
+    """
+    def __init__(self, capacity: int=4096):
+        """
+        Args:
+            capacity: int
+                the maximum number of records held before the oldest
+                records are overwritten
+        """
+        assert capacity > 0
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, len(LOG_FIELDS)), dtype=np.int32)
+        self.step = 0
+        self.n_recorded = 0 # total number of records ever written
+        self.start = 0 # the oldest record that has not been drained
+        self.n_overwritten = 0
+
+    def __len__(self):
+        return self.n_recorded - self.start
+
+    def record(self,
+               event: int,
+               obj_type: int=-1,
+               src: int=-1,
+               dst: int=-1):
+        """
+        Writes a record to the buffer at the current step.
+
+        Args:
+            event: int
+                the event code. See LOG_EVENTS
+            obj_type: int
+                the TYPE2PRIORITY value of the object involved in the
+                event or -1
+            src: int
+                the flat index of the source coordinate or -1
+            dst: int
+                the flat index of the destination coordinate or -1
+        """
+        if self.n_recorded - self.start == self.capacity:
+            self.start += 1
+            self.n_overwritten += 1
+        row = self.buffer[self.n_recorded % self.capacity]
+        row[0] = self.step
+        row[1] = event
+        row[2] = obj_type
+        row[3] = src
+        row[4] = dst
+        self.n_recorded += 1
+
+    def drain(self):
+        """
+        Removes and returns all records in the buffer in the order that
+        they were recorded.
+
+        Returns:
+            records: ndarray (N, len(LOG_FIELDS)) int32
+                the columns are LOG_FIELDS
+        """
+        n = len(self)
+        start = self.start % self.capacity
+        if start + n <= self.capacity:
+            records = self.buffer[start:start+n].copy()
+        else:
+            records = np.concatenate([
+                self.buffer[start:],
+                self.buffer[:start+n-self.capacity]
+            ], axis=0)
+        self.start = self.n_recorded
+        return records
+
+    def clear(self):
+        """
+        Removes all records from the buffer and resets the step count.
+        """
+        self.start = self.n_recorded
+        self.n_overwritten = 0
+        self.step = 0
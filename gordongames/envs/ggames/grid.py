@@ -12,6 +12,156 @@ thinking. For instance, the coordinate (1,2) will get drawn one row
 down from the top and 3 rows over from the left. Coordinates refer
 to grid units, NOT PIXELS.
 """
+
+"""
+Topologies are shared by every grid with the same configuration.
+    keys: tuple (grid_size, divide, min_play_area)
+    vals: Topology
+"""
+TOPOLOGIES = dict()
+
+def get_middle_row(grid_size, min_play_area=False):
+    """
+    Determines the row of the divider.
+
+    Args:
+        grid_size: tuple (n_row, n_col)
+        min_play_area: bool
+            if true, the play area is minimized to 4 rows
+    Returns:
+        middle_row: int or float
+    """
+    if min_play_area: return 4
+    half = grid_size[0]/2
+    if grid_size[0] % 2 == 0: return half + 1
+    else: return int(half)
+
+def get_topology(grid_size: tuple, divide: bool=True, min_play_area=False):
+    """
+    Returns the shared Topology for the argued grid configuration,
+    creating it if it does not yet exist.
+
+    Args:
+        grid_size: tuple (n_row, n_col)
+        divide: bool
+            if true, the grid is divided
+        min_play_area: bool
+            if true, the play area is minimized to 4 rows
+    Returns:
+        topology: Topology
+    """
+    key = (tuple(grid_size), bool(divide), bool(min_play_area))
+    if key not in TOPOLOGIES:
+        TOPOLOGIES[key] = Topology(*key)
+    return TOPOLOGIES[key]
+
+class Topology:
+    """
+    Precomputed, read-only lookup tables for a grid configuration.
+    Cells are referred to by their flat index row*n_cols+col. Use
+    get_topology to get the instance that is shared by all grids with
+    the same configuration.
+
+    Members:
+        middle_row: int or float
+            the row of the divider. see Grid.middle_row
+        coords: tuple of tuples
+            the (row, col) coordinate of each flat index
+        coord2idx: dict
+            maps each in bounds coordinate to its flat index.
+            Membership doubles as the in bounds test.
+        moves: tuple of tuples (H*W, 5)
+            the flat index that results from moving in each of the
+            DIRECTIONS from each flat index. Moves that would leave the
+            playable area map to the starting index.
+        neighbors: ndarray (H*W, 5) int32
+            an ndarray version of moves
+        playable: ndarray (H*W,) bool
+            true for cells in the playable area
+        targ_area: ndarray (H*W,) bool
+            true for cells in the target area (below the divider)
+        inbounds: ndarray (H*W+1,) bool
+            true for every cell. The final entry is false so that the
+            index -1 can be used for out of bounds coordinates.
+        playable_coords: frozenset of tuples
+            the coordinates in the playable area
+        targ_area_coords: frozenset of tuples
+            the coordinates in the target area
+    """
+    def __init__(self,
+                 grid_size: tuple,
+                 divide: bool=True,
+                 min_play_area: bool=False):
+        """
+        Args:
+            grid_size: tuple (n_row, n_col)
+            divide: bool
+                if true, the grid is divided
+            min_play_area: bool
+                if true, the play area is minimized to 4 rows
+        """
+        n_rows, n_cols = grid_size
+        self.shape = (n_rows, n_cols)
+        self.middle_row = get_middle_row(grid_size, min_play_area)
+        rows, cols = np.divmod(np.arange(n_rows*n_cols), n_cols)
+        self.coords = tuple(
+            (int(r),int(c)) for r,c in zip(rows,cols)
+        )
+        self.coord2idx = {coord: i for i,coord in enumerate(self.coords)}
+        if divide:
+            playable = rows < self.middle_row
+            targ_area = rows > self.middle_row
+        else:
+            playable = np.ones(len(rows), dtype=bool)
+            targ_area = np.ones(len(rows), dtype=bool)
+        self.playable = playable
+        self.targ_area = targ_area
+        self.inbounds = np.ones(len(rows)+1, dtype=bool)
+        self.inbounds[-1] = False
+        self.playable_coords = frozenset(
+            c for c,p in zip(self.coords, playable) if p
+        )
+        self.targ_area_coords = frozenset(
+            c for c,t in zip(self.coords, targ_area) if t
+        )
+
+        # Order must match the DIRECTIONS constant
+        offsets = np.zeros((len(DIRECTIONS), 2), dtype=int)
+        offsets[UP] = (-1, 0)
+        offsets[RIGHT] = (0, 1)
+        offsets[DOWN] = (1, 0)
+        offsets[LEFT] = (0, -1)
+        new_rows = rows[:,None] + offsets[:,0]
+        new_cols = cols[:,None] + offsets[:,1]
+        legal = (new_rows>=0)&(new_rows<n_rows)
+        legal &= (new_cols>=0)&(new_cols<n_cols)
+        dests = np.where(legal, new_rows*n_cols + new_cols, 0)
+        legal &= playable[dests]
+        idxs = np.arange(len(rows))[:,None]
+        self.neighbors = np.where(legal, dests, idxs).astype(np.int32)
+        self.moves = tuple(tuple(int(d) for d in m) for m in self.neighbors)
+        for arr in (self.playable,self.targ_area,self.inbounds,self.neighbors):
+            arr.flags.writeable = False
+
+    def move(self, coord, direction):
+        """
+        Finds the coordinate that results from moving in the argued
+        direction from the argued coordinate.
+
+        Args:
+            coord: tuple (row, col)
+            direction: int
+                see DIRECTIONS
+        Returns:
+            new_coord: tuple or None
+                the resulting coordinate. This is the argued coordinate
+                if the move would leave the playable area. None if the
+                argued coordinate is not on the grid.
+        """
+        idx = self.coord2idx.get(coord)
+        if idx is None: return None
+        return self.coords[self.moves[idx][direction]]
+
 class Grid:
     def __init__(self,
                  grid_size: int or tuple=(31,31),
@@ -40,11 +190,11 @@ class Grid:
             row of the grid.
         """
         self._divided = divide
-        self.min_play_area = min_play_area
         if type(grid_size) == int:
             self._grid_size = (grid_size, grid_size)
         else:
             self._grid_size = grid_size
+        self.min_play_area = min_play_area
         self._pixel_density = pixel_density
         self._grid = self.make_grid(self._divided)
     
@@ -91,12 +241,36 @@ class Grid:
     def grid(self):
         return self._grid.copy()
 
+    @property
+    def min_play_area(self):
+        return self._min_play_area
+
+    @min_play_area.setter
+    def min_play_area(self, min_play_area):
+        """
+        Changing the play area changes the topology of the grid.
+        """
+        self._min_play_area = min_play_area
+        self._background = None
+        self._topology = get_topology(
+            self._grid_size,
+            self._divided,
+            min_play_area
+        )
+
+    @property
+    def topology(self):
+        """
+        Returns:
+          topology: Topology
+            the precomputed lookup tables shared by all grids with
+            the same configuration
+        """
+        return self._topology
+
     @property
     def middle_row(self):
-        if self.min_play_area: return 4
-        half = self.shape[0]/2
-        if self.shape[0] % 2 == 0: return half + 1
-        else: return int(half)
+        return self._topology.middle_row
 
     def units2pixels(self, coord):
         """
@@ -151,10 +325,11 @@ class Grid:
     
     def reset(self):
         """
-        Resets the grid to the initial specifications with new
-        reference to the grid.
+        Resets the grid to the initial specifications in place. The
+        ndarray reference self._grid is maintained so that no new
+        grid is allocated between episodes.
         """
-        self._grid = self.make_grid(do_divide=self.is_divided)
+        self.clear(remove_divider=False)
 
     def clear_unit(self, coord):
         """
@@ -185,9 +360,15 @@ class Grid:
                 if true, the divider is wiped from the grid as well.
                 only applies if self.is_divided is true
         """
-        self._grid[:,:] = COLORS[DEFAULT]
         if self.is_divided and not remove_divider:
-            self.draw_divider()
+            # the cleared grid with the divider is drawn once and
+            # copied on subsequent clears
+            if self._background is None:
+                self._grid[:,:] = COLORS[DEFAULT]
+                self.draw_divider()
+                self._background = self._grid.copy()
+            else: self._grid[:,:] = self._background
+        else: self._grid[:,:] = COLORS[DEFAULT]
     
     def draw(self, coord: tuple, color: float, add_color: bool=True):
         """
@@ -317,8 +498,7 @@ class Grid:
           coord: list like (row, col)
             the coordinate in grid units
         """
-        row, col = coord
-        return self.row_inbounds(row) and self.col_inbounds(col)
+        return tuple(coord) in self._topology.coord2idx
     
     def row_inhalfbounds(self, row):
         """
@@ -356,8 +536,7 @@ class Grid:
           coord: list like (row, col)
             the coordinate in grid units
         """
-        if self.is_divided: return self.is_inhalfbounds(coord)
-        return self.is_inbounds(coord)
+        return tuple(coord) in self._topology.playable_coords
 
     def is_below_divider(self, coord):
         """
@@ -369,9 +548,5 @@ class Grid:
           coord: list like (row, col)
             the coordinate in grid units
         """
-        row, col = coord
-        if self.is_divided:
-            row_inbounds = row > self.middle_row and row < self.shape[0]
-            return row_inbounds and self.col_inbounds(col)
-        return self.is_inbounds(coord)
+        return tuple(coord) in self._topology.targ_area_coords
 
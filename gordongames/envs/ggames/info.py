@@ -0,0 +1,191 @@
+"""
+The info dict returned by each step is a LazyInfo. Cheap values are
+stored directly while expensive values are stored as functions of a
+frozen snapshot of the game and are only computed if they are read.
+"""
+from gordongames.envs.ggames.constants import INFO_KEYS
+import numpy as np
+
+def get_info_keys(info_keys=None):
+    """
+    Validates a selection of info keys.
+
+    Args:
+        info_keys: sequence of str or None
+            the info keys to compute on each step. None selects all
+            keys in INFO_KEYS.
+    Returns:
+        info_keys: frozenset of str
+    """
+    if info_keys is None: return frozenset(INFO_KEYS)
+    info_keys = frozenset(info_keys)
+    unknowns = info_keys - set(INFO_KEYS)
+    assert len(unknowns) == 0, "Unknown info keys: {}".format(unknowns)
+    return info_keys
+
+"""
+The dtype of the structured info records. There is a field for each of
+the INFO_KEYS in the same order. Coordinates are (row, col) int16 pairs.
+"""
+INFO_DTYPE = np.dtype([
+    ("is_harsh", np.bool_),
+    ("n_targs", np.int16),
+    ("n_items", np.int16),
+    ("n_aligned", np.int16),
+    ("disp_targs", np.int8),
+    ("is_animating", np.int8),
+    ("is_pop", np.int8),
+    ("skipped", np.int8),
+    ("grab", np.int8),
+    ("player_loc", np.int16, (2,)),
+    ("count_loc", np.int16, (2,)),
+    ("end_loc", np.int16, (2,)),
+])
+
+def make_info_records(n=1):
+    """
+    Allocates a structured array of info records.
+
+    Args:
+        n: int
+            the number of records
+    Returns:
+        records: ndarray (n,) INFO_DTYPE
+    """
+    return np.zeros(n, dtype=INFO_DTYPE)
+
+def write_info_record(records, idx, info):
+    """
+    Writes the values of an info dict to records[idx]. Keys that are
+    missing from the info are written as 0.
+
+    Args:
+        records: ndarray (N,) INFO_DTYPE
+        idx: int
+            the index of the record to write
+        info: dict
+            an info dict produced by a step
+    """
+    if isinstance(info, LazyInfo):
+        # the resolved values are read without the lazy lookups
+        get = super(LazyInfo, info.resolve()).get
+    else: get = info.get
+    records[idx] = tuple([get(key, 0) for key in INFO_KEYS])
+
+class LazyInfo(dict):
+    """
+    A dict whose expensive values are computed on first access. Lazy
+    values are registered with set_lazy as a function and the
+    arguments that it should be called with. The arguments should be
+    a frozen snapshot (tuples of coords etc.) so that the value
+    reflects the state of the game at the time it was registered, not
+    at the time it is read.
+
+    LazyInfo subclasses dict so that it can be used anywhere the info
+    dict was previously used. Iterating, comparing, copying, or
+    pickling a LazyInfo computes all lazy values first. Copies and
+    pickles are plain dicts.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lazy = dict()
+
+    def set_lazy(self, key, fxn, *args):
+        """
+        Registers a value that is computed on first access.
+
+        Args:
+            key: str
+                the info key
+            fxn: callable
+                the function that computes the value
+            args: any
+                the arguments for fxn
+        """
+        if key in self: super().__delitem__(key)
+        self._lazy[key] = (fxn, args)
+
+    def resolve(self):
+        """
+        Computes all remaining lazy values.
+
+        Returns:
+            self: LazyInfo
+        """
+        if self._lazy:
+            for key, (fxn, args) in self._lazy.items():
+                super().__setitem__(key, fxn(*args))
+            self._lazy = dict()
+        return self
+
+    def __missing__(self, key):
+        if key not in self._lazy: raise KeyError(key)
+        fxn, args = self._lazy.pop(key)
+        val = fxn(*args)
+        super().__setitem__(key, val)
+        return val
+
+    def __setitem__(self, key, val):
+        if self._lazy: self._lazy.pop(key, None)
+        super().__setitem__(key, val)
+
+    def __delitem__(self, key):
+        if key in self._lazy: del self._lazy[key]
+        else: super().__delitem__(key)
+
+    def __contains__(self, key):
+        return key in self._lazy or super().__contains__(key)
+
+    def __len__(self):
+        return super().__len__() + len(self._lazy)
+
+    def __iter__(self):
+        return super(LazyInfo, self.resolve()).__iter__()
+
+    def __eq__(self, other):
+        if isinstance(other, LazyInfo): other.resolve()
+        return super(LazyInfo, self.resolve()).__eq__(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return super(LazyInfo, self.resolve()).__repr__()
+
+    def __reduce__(self):
+        return (dict, (dict(self.items()),))
+
+    def get(self, key, default=None):
+        if key in self: return self[key]
+        return default
+
+    def pop(self, key, *default):
+        if key in self._lazy: self[key]
+        return super().pop(key, *default)
+
+    def setdefault(self, key, default=None):
+        if key in self: return self[key]
+        self[key] = default
+        return default
+
+    def keys(self):
+        return super(LazyInfo, self.resolve()).keys()
+
+    def values(self):
+        return super(LazyInfo, self.resolve()).values()
+
+    def items(self):
+        return super(LazyInfo, self.resolve()).items()
+
+    def copy(self):
+        return dict(self.items())
+
+    def clear(self):
+        self._lazy = dict()
+        super().clear()
+
+    def update(self, *args, **kwargs):
+        for key, val in dict(*args, **kwargs).items():
+            self[key] = val
+
+    __hash__ = None
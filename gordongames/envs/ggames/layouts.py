@@ -0,0 +1,578 @@
+"""
+The initial layout of an episode is the number of targets, the columns
+of the player, pile, and button along the top row, and the coordinates
+of the targets. Resetting a game samples its layout with many small
+scalar random draws. The LayoutBuffer instead generates the layouts
+of many episodes at once with a few array draws and hands them out
+one reset at a time, refilling in bulk once it runs out. A
+LayoutLibrary stores a fixed set of layouts in a memory mapped file.
+
+Each vectorized function mirrors the Register function of the same
+name. The random streams differ but the distribution of the layouts
+does not.
+"""
+import numpy as np
+import json
+from gordongames.envs.ggames.registry import Register
+from gordongames.envs.ggames.utils import get_zipf_sampler
+
+"""
+The Register placement functions that have a vectorized counterpart.
+"""
+LAYOUT_KINDS = (
+    "even_targ_spacing",
+    "uneven_targ_spacing",
+    "vertical_targ_spacing",
+    "rand_targ_placement",
+)
+
+class LayoutBuffer:
+    """
+    Holds n_layouts pre-generated episode layouts for a single game
+    configuration. Use pop to get the next layout.
+
+    Members:
+        kind: str
+            the Register target placement function that is mirrored.
+            See LAYOUT_KINDS.
+        n_layouts: int
+            the number of layouts generated per refill
+        n_targs: ndarray (K,) int64
+            the number of targets of each layout
+        ppb_cols: ndarray (K, 3) int64
+            the player, pile, and button columns of each layout
+        targ_coords: ndarray (K, max_targs, 2) int64
+            the target coordinates of each layout. Only the first
+            n_targs coordinates of each layout are used.
+        idx: int
+            the index of the next layout
+        rand: random number generator or None
+            the generator that the current layouts were drawn from
+    """
+    def __init__(self,
+                 register,
+                 kind: str,
+                 targ_range: tuple,
+                 hold_outs: set=set(),
+                 zipf_exponent=None,
+                 rand_pdb: bool=True,
+                 player_on_pile: bool=False,
+                 spacing_limit=None,
+                 sym_distr: bool=True,
+                 n_layouts: int=256):
+        """
+        Args:
+            register: Register
+                the register of the game. Only its grid, held out
+                coordinates and signal coordinate are used.
+            kind: str
+                the Register target placement function to mirror. See
+                LAYOUT_KINDS.
+            targ_range: tuple (low, high) (inclusive)
+                the range of target quantities
+            hold_outs: set of ints
+                target quantities that are never sampled
+            zipf_exponent: float or None
+                if not None, the target quantities are sampled from
+                the zipfian distribution with this exponent. Otherwise
+                they are sampled uniformly.
+            rand_pdb: bool
+                see Register.place_player_pile_button
+            player_on_pile: bool
+                see Register.place_player_pile_button
+            spacing_limit: None or int greater than 0
+                see Register.place_player_pile_button
+            sym_distr: bool
+                see Register.place_player_pile_button
+            n_layouts: int
+                the number of layouts generated at once
+        """
+        assert kind in LAYOUT_KINDS, "Unknown layout kind: {}".format(kind)
+        assert n_layouts > 0
+        self.kind = kind
+        self.n_layouts = n_layouts
+        order = 0 if zipf_exponent is None else zipf_exponent
+        self.targ_sampler = get_zipf_sampler(
+            targ_range[0], targ_range[1], order, hold_outs
+        )
+        self.max_targs = targ_range[1]
+        self.rand_pdb = rand_pdb
+        self.player_on_pile = player_on_pile
+        self.spacing_limit = spacing_limit
+        self.sym_distr = sym_distr
+
+        grid = register.grid
+        self.shape = grid.shape
+        self.is_divided = grid.is_divided
+        self.middle_row = int(grid.middle_row)
+        # the target placement area in row major order
+        low = self.middle_row+1 if self.is_divided else 0
+        rows, cols = np.divmod(
+            np.arange((self.shape[0]-low)*self.shape[1]),
+            self.shape[1]
+        )
+        self.cells = np.stack([rows+low, cols], axis=-1)
+        coord2cell = {
+            (int(r),int(c)): i for i,(r,c) in enumerate(self.cells)
+        }
+        # The signal coordinate is avoided when the targets are
+        # placed. It is always empty at that point in the reset.
+        self.cell_mask = np.ones(len(self.cells), dtype=bool)
+        signal = (int(3*self.shape[0]/4), self.shape[1]//2)
+        if signal in coord2cell: self.cell_mask[coord2cell[signal]] = False
+        # each target quantity avoids its own held out coordinates
+        self.held_out_masks = np.zeros(
+            (self.max_targs+1, len(self.cells)),
+            dtype=bool
+        )
+        for t in range(1, self.max_targs+1):
+            for coord in register.held_outs.get(t, set()):
+                if coord in coord2cell:
+                    self.held_out_masks[t, coord2cell[coord]] = True
+
+        self.n_targs = np.zeros(0, dtype=np.int64)
+        self.ppb_cols = np.zeros((0,3), dtype=np.int64)
+        self.targ_coords = np.zeros((0,self.max_targs,2), dtype=np.int64)
+        self.idx = 0
+        self.rand = None
+
+    def __len__(self):
+        """
+        Returns:
+            n_remaining: int
+                the number of layouts left before the next refill
+        """
+        return len(self.n_targs) - self.idx
+
+    def clear(self):
+        """
+        Discards the remaining layouts so that the next pop refills
+        the buffer.
+        """
+        self.idx = len(self.n_targs)
+        self.rand = None
+
+    def get_state(self, rand):
+        """
+        Captures the read position of the buffer so that it can later
+        be restored with set_state. The layout arrays are replaced
+        rather than written by fill, so they are recorded without a
+        copy.
+
+        Args:
+            rand: random number generator
+                the generator of the game. Records whether the
+                current layouts were drawn from it.
+        Returns:
+            state: tuple
+                (n_targs, ppb_cols, targ_coords, idx, is_filled)
+        """
+        return (
+            self.n_targs,
+            self.ppb_cols,
+            self.targ_coords,
+            self.idx,
+            self.rand is rand,
+        )
+
+    def set_state(self, state, rand):
+        """
+        Restores the layouts and read position of a state produced by
+        get_state so that the next pops return the same layouts as
+        they would have when the state was captured.
+
+        Args:
+            state: tuple
+                a state returned by get_state
+            rand: random number generator
+                the generator of the game
+        """
+        self.n_targs, self.ppb_cols, self.targ_coords,\
+            self.idx, is_filled = state
+        self.rand = rand if is_filled else None
+
+    def pop(self, rand):
+        """
+        Returns the next layout. The buffer is refilled from the argued
+        generator if it is empty or if the layouts were drawn from a
+        different generator (i.e. the game was reseeded).
+
+        Args:
+            rand: random number generator
+        Returns:
+            n_targs: int
+                the number of targets
+            ppb_cols: list of ints [player, pile, button]
+                the columns along the top row
+            targ_coords: list of [row, col]
+                the coordinate of each target
+        """
+        if rand is not self.rand or self.idx >= len(self.n_targs):
+            self.fill(rand)
+        i = self.idx
+        self.idx += 1
+        n_targs = int(self.n_targs[i])
+        return (
+            n_targs,
+            self.ppb_cols[i].tolist(),
+            self.targ_coords[i,:n_targs].tolist(),
+        )
+
+    def fill(self, rand, n_layouts=None):
+        """
+        Generates a new set of layouts, discarding any remaining ones.
+
+        Args:
+            rand: random number generator
+            n_layouts: int or None
+                the number of layouts to generate. Defaults to
+                self.n_layouts
+        """
+        if n_layouts is None: n_layouts = self.n_layouts
+        self.rand = rand
+        self.n_targs = self.targ_sampler.sample(n_layouts, rand=rand)
+        self.ppb_cols = self.place_player_pile_button(n_layouts, rand)
+        self.targ_coords = getattr(self, self.kind)(self.n_targs, rand)
+        self.idx = 0
+
+    def place_player_pile_button(self, n_layouts, rand):
+        """
+        Vectorized version of Register.place_player_pile_button.
+
+        Args:
+            n_layouts: int
+            rand: random number generator
+        Returns:
+            cols: ndarray (n_layouts, 3) int64
+                the player, pile, and button columns
+        """
+        n_cols = self.shape[1]
+        spacing_limit = self.spacing_limit
+        if self.rand_pdb:
+            if spacing_limit is None or spacing_limit<=0:
+                # the first 3 columns of a random permutation
+                keys = rand.random((n_layouts, n_cols))
+                cols = np.argsort(keys, axis=1)[:,:3]
+            else:
+                col = rand.integers(
+                    spacing_limit,
+                    n_cols-spacing_limit,
+                    size=n_layouts
+                )
+                offsets = np.arange(-spacing_limit, spacing_limit)
+                offsets[-spacing_limit:] += 1
+                keys = rand.random((n_layouts, len(offsets)))
+                picks = offsets[np.argsort(keys, axis=1)[:,:2]]
+                cols = np.stack([
+                    col+picks[:,0], col, col+picks[:,1]
+                ], axis=-1)
+        else:
+            cols = np.tile(Register.even_spacing(n_cols, 3), (n_layouts,1))
+            if not(spacing_limit is None or spacing_limit<=0):
+                cols[:,0] = cols[:,1]-spacing_limit
+                cols[:,2] = cols[:,1]+spacing_limit
+            if self.sym_distr:
+                swap = rand.random(n_layouts) >= .5
+                cols[swap] = cols[swap][:,::-1]
+        cols = cols.astype(np.int64)
+        if self.player_on_pile:
+            cols[:,0] = cols[:,1]
+        return cols
+
+    def get_spacing(self, n_targs, space, rand):
+        """
+        Samples the even spacing of a line of targets. Shared by
+        even_targ_spacing and vertical_targ_spacing.
+
+        Args:
+            n_targs: ndarray (K,) int
+            space: int
+                the number of grid units available to the line
+            rand: random number generator
+        Returns:
+            start: ndarray (K,) int64
+                the offset of the first target from the start of the
+                available space
+            space_between: ndarray (K,) int64
+                the number of empty units between consecutive targets
+        """
+        avail = space - n_targs
+        max_spacing = avail//np.maximum(n_targs-1, 1)
+        space_between = rand.integers(0, np.maximum(max_spacing, 1))
+        space_between = np.where(max_spacing>0, space_between, 0)
+        taken_space = n_targs + space_between*(n_targs-1)
+        start = rand.integers(0, space-taken_space+1)
+        return start, space_between
+
+    def even_targ_spacing(self, n_targs, rand):
+        """
+        Vectorized version of Register.even_targ_spacing.
+
+        Args:
+            n_targs: ndarray (K,) int
+            rand: random number generator
+        Returns:
+            coords: ndarray (K, max_targs, 2) int64
+        """
+        n_rows, n_cols = self.shape
+        rows = rand.integers(self.middle_row+1, n_rows, size=len(n_targs))
+        start, space_between = self.get_spacing(n_targs, n_cols, rand)
+        t = np.arange(self.max_targs)
+        cols = start[:,None] + t*(space_between[:,None]+1)
+        rows = np.broadcast_to(rows[:,None], cols.shape)
+        return np.stack([rows, cols], axis=-1)
+
+    def vertical_targ_spacing(self, n_targs, rand):
+        """
+        Vectorized version of Register.vertical_targ_spacing.
+
+        Args:
+            n_targs: ndarray (K,) int
+            rand: random number generator
+        Returns:
+            coords: ndarray (K, max_targs, 2) int64
+        """
+        n_rows, n_cols = self.shape
+        cols = rand.integers(0, n_cols, size=len(n_targs))
+        if self.is_divided:
+            space = n_rows - self.middle_row - 1
+            start_row = self.middle_row + 1
+        else:
+            space = n_rows
+            start_row = 0
+        start, space_between = self.get_spacing(n_targs, space, rand)
+        t = np.arange(self.max_targs)
+        rows = start_row + start[:,None] + t*(space_between[:,None]+1)
+        cols = np.broadcast_to(cols[:,None], rows.shape)
+        return np.stack([rows, cols], axis=-1)
+
+    def uneven_targ_spacing(self, n_targs, rand, max_spacing=5):
+        """
+        Vectorized version of Register.uneven_targ_spacing.
+
+        Args:
+            n_targs: ndarray (K,) int
+            rand: random number generator
+            max_spacing: int
+                the maximum spacing that can occur between two targets.
+                (inclusive)
+        Returns:
+            coords: ndarray (K, max_targs, 2) int64
+        """
+        n_rows, n_cols = self.shape
+        n_layouts = len(n_targs)
+        rows = rand.integers(self.middle_row+1, n_rows, size=n_layouts)
+        avail = n_cols - n_targs
+        n_gaps = max(self.max_targs-1, 0)
+        spacings = np.zeros((n_layouts, n_gaps), dtype=np.int64)
+        is_gap = np.arange(n_gaps) < (n_targs[:,None]-1)
+        for i in range(n_gaps):
+            lim = np.minimum(max_spacing+1, avail)
+            spacing = rand.integers(0, np.maximum(lim, 1))
+            spacing = np.where(is_gap[:,i] & (avail>0), spacing, 0)
+            spacings[:,i] = spacing
+            avail = avail - spacing
+        # shuffles the gaps of each layout amongst themselves
+        keys = rand.random((n_layouts, n_gaps))
+        keys[~is_gap] = 2
+        order = np.argsort(keys, axis=1)
+        spacings = np.take_along_axis(spacings, order, axis=1)
+        start = rand.integers(0, avail+1)
+        cols = np.zeros((n_layouts, self.max_targs), dtype=np.int64)
+        cols[:,1:] = np.cumsum(spacings+1, axis=1)
+        cols += start[:,None]
+        rows = np.broadcast_to(rows[:,None], cols.shape)
+        return np.stack([rows, cols], axis=-1)
+
+    def rand_targ_placement(self, n_targs, rand):
+        """
+        Vectorized version of Register.rand_targ_placement without
+        inverted held outs. Each target is placed uniformly over the
+        cells that are not taken, not the signal coordinate, and not
+        held out for its target quantity. This is the distribution of
+        the rejection loop in Register.rand_targ_placement.
+
+        Args:
+            n_targs: ndarray (K,) int
+            rand: random number generator
+        Returns:
+            coords: ndarray (K, max_targs, 2) int64
+        """
+        n_layouts = len(n_targs)
+        layouts = np.arange(n_layouts)
+        taken = np.zeros((n_layouts, len(self.cells)), dtype=bool)
+        coords = np.zeros((n_layouts, self.max_targs, 2), dtype=np.int64)
+        for t in range(1, self.max_targs+1):
+            legal = self.cell_mask & ~self.held_out_masks[t]
+            keys = rand.random(taken.shape)
+            keys[:,~legal] = np.inf
+            keys[taken] = np.inf
+            cells = np.argmin(keys, axis=1)
+            coords[:,t-1] = self.cells[cells]
+            active = t <= n_targs
+            taken[layouts[active], cells[active]] = True
+        return coords
+
+def get_library_dtype(max_targs):
+    """
+    Returns the record type of a layout library. The target
+    coordinates are packed as flat indices row*n_cols+col and padded
+    with -1.
+
+    Args:
+        max_targs: int
+            the maximum number of targets of a layout
+    Returns:
+        dtype: np.dtype
+            fields n_targs, ppb_cols (player, pile, button), targ_idxs
+    """
+    return np.dtype([
+        ("n_targs", np.int16),
+        ("ppb_cols", np.int16, (3,)),
+        ("targ_idxs", np.int16, (max_targs,)),
+    ])
+
+def get_library_paths(path):
+    """
+    Returns the paths of the records and of the metadata of a layout
+    library.
+
+    Args:
+        path: str
+            the path of the library with or without the .npy extension
+    Returns:
+        records_path: str
+            the .npy file of the records
+        meta_path: str
+            the .json file of the metadata
+    """
+    if path.endswith(".npy"): path = path[:-len(".npy")]
+    return path + ".npy", path + ".json"
+
+class LayoutLibrary:
+    """
+    A fixed, read only set of episode layouts stored on disk. The
+    records are a memory mapped .npy file so that any number of
+    processes can share one library through the page cache and only
+    the records that are used are ever read. The configuration that
+    the layouts were generated for is stored in a .json file next to
+    the records. Use LayoutLibrary.save to create a library.
+
+    Members:
+        path: str
+            the path of the records
+        meta: dict
+            the configuration of the library. Includes the keys
+            env_id, grid_size, targ_range, min_play_area, layout_kind
+            and seed.
+        records: memmap (N,) see get_library_dtype
+    """
+    def __init__(self, path: str):
+        """
+        Args:
+            path: str
+                the path of the library with or without the .npy
+                extension
+        """
+        self.path, meta_path = get_library_paths(path)
+        with open(meta_path, "r") as f:
+            self.meta = json.load(f)
+        self.meta["grid_size"] = tuple(self.meta["grid_size"])
+        self.meta["targ_range"] = tuple(self.meta["targ_range"])
+        self.records = np.load(self.path, mmap_mode="r")
+        self.n_cols = self.meta["grid_size"][1]
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, idx):
+        """
+        Reads a single layout.
+
+        Args:
+            idx: int
+                the index of the layout
+        Returns:
+            n_targs: int
+                the number of targets
+            ppb_cols: list of ints [player, pile, button]
+                the columns along the top row
+            targ_coords: list of (row, col)
+                the coordinate of each target
+        """
+        record = self.records[idx]
+        n_targs = int(record["n_targs"])
+        targ_coords = [
+            divmod(int(i), self.n_cols)
+            for i in record["targ_idxs"][:n_targs]
+        ]
+        return n_targs, record["ppb_cols"].tolist(), targ_coords
+
+    def __getstate__(self):
+        # the memory map is reopened rather than copied when the
+        # library is sent to another process
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    @staticmethod
+    def save(path: str,
+             buffer: LayoutBuffer,
+             n_layouts: int,
+             rand,
+             meta: dict,
+             chunk_size: int=4096):
+        """
+        Generates n_layouts layouts with the argued buffer and writes
+        them to a new library. The layouts are written in chunks so
+        that large libraries are never held in memory.
+
+        Args:
+            path: str
+                the path of the library with or without the .npy
+                extension. Existing files are overwritten.
+            buffer: LayoutBuffer
+                the buffer that generates the layouts
+            n_layouts: int
+                the number of layouts in the library
+            rand: random number generator
+            meta: dict
+                the configuration of the library. Must be json
+                serializable.
+            chunk_size: int
+                the number of layouts generated at once
+        Returns:
+            library: LayoutLibrary
+        """
+        records_path, meta_path = get_library_paths(path)
+        n_cols = buffer.shape[1]
+        records = np.lib.format.open_memmap(
+            records_path,
+            mode="w+",
+            dtype=get_library_dtype(buffer.max_targs),
+            shape=(n_layouts,)
+        )
+        t = np.arange(buffer.max_targs)
+        for start in range(0, n_layouts, chunk_size):
+            n = min(chunk_size, n_layouts-start)
+            buffer.fill(rand, n_layouts=n)
+            coords = buffer.targ_coords
+            idxs = coords[...,0]*n_cols + coords[...,1]
+            idxs[t >= buffer.n_targs[:,None]] = -1
+            chunk = records[start:start+n]
+            chunk["n_targs"] = buffer.n_targs
+            chunk["ppb_cols"] = buffer.ppb_cols
+            chunk["targ_idxs"] = idxs
+        records.flush()
+        del records
+        buffer.clear()
+        meta = {
+            **meta,
+            "layout_kind": buffer.kind,
+            "max_targs": buffer.max_targs,
+            "n_layouts": n_layouts,
+        }
+        with open(meta_path, "w") as f:
+            json.dump(meta, f, indent=2)
+        return LayoutLibrary(records_path)
@@ -4,6 +4,9 @@ import time
 import numpy as np
 from collections import defaultdict
 from gordongames.envs.ggames.constants import *
+from gordongames.envs.ggames.utils import get_bitboard, pack_indices
+from gordongames.envs.ggames.events import EventLog
+import struct
 
 class GameObject:
     """
@@ -96,7 +99,8 @@ class Register:
     def __init__(self,
                  grid: Grid,
                  n_targs: int,
-                 n_held_outs=0):
+                 n_held_outs=0,
+                 max_targs=None):
         """
         Creates a player, a pile, and the specified number of targs.
         
@@ -107,12 +111,23 @@ class Register:
             the number of targets on the screen
           n_held_outs: int
             the number of held out spaces for each target quantity
+          max_targs: int or None
+            the size of the persistent pool of target objects. The
+            targets of each episode are activated from the pool so
+            that they are not recreated on every reset. The pool
+            grows if more targets are ever needed.
         """
         self.grid = grid
         self.player = GameObject(obj_type=PLAYER, color=COLORS[PLAYER])
         self.pile = GameObject(obj_type=PILE, color=COLORS[PILE])
         self.button = GameObject(obj_type=BUTTON, color=COLORS[BUTTON])
-        self._targs = self.make_targs(n_targs)
+        if max_targs is None: max_targs = n_targs
+        self._targ_pool = list(self.make_targs(max(n_targs, max_targs)))
+        self._targs = set(self._targ_pool[:n_targs])
+        self._items = set()
+        self._signals = set()
+        # deleted items and signals are kept for reuse by make_object
+        self._free_objs = defaultdict(list)
         self.obj_register = {
             self.player,
             self.pile,
@@ -129,9 +144,13 @@ class Register:
         self.full_grid_event_registry = set()
         self.display_targs = True
         self.invsbl_list = []
-        self.rand = np.random.default_rng(int(time.time()))
+        # both are replaced by the env's generators. see GordonGame.seed
+        self.rand = np.random.default_rng()
+        self.oracle_rand = np.random.default_rng()
         self.n_held_outs = n_held_outs
         self.held_outs = self.get_held_outs(n_held_outs)
+        self.event_log = None
+        self._carried = -1 # type of the object carried last step
 
     @property
     def n_targs(self):
@@ -139,20 +158,18 @@ class Register:
 
     @property
     def n_items(self):
-        return len(self.items)
+        return len(self._items)
 
     @property
     def items(self):
         """
-        Filters the obj_register for the item type gameobjects
+        The item type gameobjects in the obj_register. These are
+        tracked as they are created and deleted.
 
         Returns:
             items: set of GameObjects
         """
-        items = set()
-        for obj in self.obj_register:
-            if obj.type == ITEM: items.add(obj)
-        return items
+        return set(self._items)
 
     @property
     def targs(self):
@@ -164,6 +181,208 @@ class Register:
         """
         return {*self._targs}
 
+    def get_bitboard(self, obj_type: str):
+        """
+        Creates a bitboard of the coordinates of all registered objects
+        of the argued type. The bit at flat index row*n_cols+col is set
+        for each occupied coordinate.
+
+        Args:
+            obj_type: str
+                the type of object. See OBJECT_TYPES for options
+        Returns:
+            bits: int
+        """
+        if obj_type == TARG: objs = self._targs
+        else: objs = [o for o in self.obj_register if o.type == obj_type]
+        return get_bitboard(objs, self.grid.shape[1])
+
+    def get_bitboards(self):
+        """
+        Creates a bitboard for each object type in a single pass over
+        the obj_register. See get_bitboard for details.
+
+        Returns:
+            bitboards: dict
+                keys: str
+                    the object types. See OBJECT_TYPES
+                vals: int
+                    the bitboard of the object type
+        """
+        n_cols = self.grid.shape[1]
+        bitboards = dict.fromkeys(OBJECT_TYPES, 0)
+        for obj in self.obj_register:
+            row,col = obj.coord
+            bitboards[obj.type] |= 1 << int(row*n_cols + col)
+        return bitboards
+
+    def get_state_key(self):
+        """
+        Returns a compact, hashable key of the occupancy of the
+        register. Two registers with the same key have the same object
+        types at the same coordinates (ignoring stacked duplicates).
+
+        Returns:
+            key: tuple of ints
+                the bitboards of each type in BITBOARD_TYPES order
+                followed by the display_targs flag
+        """
+        bitboards = self.get_bitboards()
+        return (
+            *[bitboards[t] for t in BITBOARD_TYPES],
+            int(self.display_targs)
+        )
+
+    def get_state(self, targs=None):
+        """
+        Captures the minimal state of the register needed to restore
+        it later using set_state. The grid is not included because it
+        is redrawn from the restored objects.
+
+        Args:
+            targs: sequence of GameObjects or None
+                the order in which to record the targets. Useful for
+                referring to targets by index. If None, the iteration
+                order of the targets is used.
+        Returns:
+            state: tuple
+                (display_targs, player, pile, button, targs, items,
+                signals) where each object is recorded as a tuple of
+                (coord, prev_coord) or (coord, prev_coord, color) for
+                the player, pile, button, and targets.
+        """
+        if targs is None: targs = self._targs
+        items = []
+        signals = []
+        for obj in self.obj_register:
+            if obj.type == ITEM:
+                items.append((obj.coord, obj.prev_coord))
+            elif obj.type == SIGNAL:
+                signals.append((obj.coord, obj.prev_coord))
+        return (
+            self.display_targs,
+            (self.player.coord, self.player.prev_coord, self.player.color),
+            (self.pile.coord, self.pile.prev_coord, self.pile.color),
+            (self.button.coord, self.button.prev_coord, self.button.color),
+            tuple((t.coord, t.prev_coord, t.color) for t in targs),
+            tuple(items),
+            tuple(signals),
+        )
+
+    def set_state(self, state):
+        """
+        Restores the register to a state produced by get_state and
+        redraws the grid. Existing GameObjects are reused where
+        possible.
+
+        Args:
+            state: tuple
+                a state returned by get_state
+        Returns:
+            targs: list of GameObjects
+                the targets in the same order as they were recorded in
+                the state
+        """
+        display_targs, player, pile, button, targ_states,\
+            item_states, signal_states = state
+        targs = list(self._targs)
+        if len(targs) < len(targ_states):
+            self.extend_targ_pool(len(targ_states))
+            targs.extend([
+                t for t in self._targ_pool if t not in self._targs
+            ])
+        targs = targs[:len(targ_states)]
+        items = []
+        for obj in self.obj_register:
+            self.coord_register[obj.coord].discard(obj)
+            if obj.type == ITEM: items.append(obj)
+            elif obj.type == SIGNAL: self._free_objs[SIGNAL].append(obj)
+        while len(items) < len(item_states):
+            items.append(self.get_free_obj(ITEM))
+        self._free_objs[ITEM].extend(items[len(item_states):])
+        self._targs = set(targs)
+        self.obj_register = {self.player, self.pile, self.button}
+        objs = [
+            (self.player, player),
+            (self.pile, pile),
+            (self.button, button),
+            *zip(targs, targ_states),
+        ]
+        for obj, (coord, prev_coord, color) in objs:
+            obj.coord = coord
+            obj.prev_coord = prev_coord
+            obj.color = color
+        for obj, (coord, prev_coord) in zip(items, item_states):
+            obj.coord = coord
+            obj.prev_coord = prev_coord
+            objs.append((obj, None))
+        signals = []
+        for coord, prev_coord in signal_states:
+            obj = self.get_free_obj(SIGNAL, coord)
+            obj.prev_coord = prev_coord
+            signals.append(obj)
+            objs.append((obj, None))
+        for obj,_ in objs:
+            self.obj_register.add(obj)
+            self.coord_register[obj.coord].add(obj)
+        self._items = set(items[:len(item_states)])
+        self._signals = set(signals)
+        self.display_targs = display_targs
+        self.draw_prev_coords()
+        return targs
+
+    def encode_state(self, targs=None):
+        """
+        Creates a canonical byte encoding of the register. Objects are
+        recorded by the flat index (row*n_cols+col) of their coord. The
+        encoding depends only on what is on the grid, not on the
+        identity or iteration order of the GameObjects, so two
+        registers with the same layout produce the same bytes in any
+        process.
+
+        The layout is a little-endian header of (version, n_rows,
+        n_cols, display_targs) as (uint8, uint16, uint16, uint8)
+        followed by the player, pile, and button indices as uint16s.
+        Then come the displayed targets, the darkened targets, the
+        items, and the signals, each as a uint16 count followed by
+        the sorted uint16 indices. Stacked objects repeat their index.
+
+        Args:
+            targs: sequence of GameObjects or None
+                if not None, the targets in this sequence are recorded
+                in the argued order after the other groups. Useful for
+                recording the order in which targets will be flashed.
+        Returns:
+            encoding: bytes
+        """
+        n_cols = self.grid.shape[1]
+        groups = {TARG: [], DEFAULT: [], ITEM: [], SIGNAL: []}
+        for obj in self.obj_register:
+            row,col = obj.coord
+            idx = int(row*n_cols + col)
+            if obj.type == TARG:
+                if obj.color == COLORS[TARG]: groups[TARG].append(idx)
+                else: groups[DEFAULT].append(idx)
+            elif obj.type in groups:
+                groups[obj.type].append(idx)
+        header = struct.pack(
+            "<BHHBHHH",
+            STATE_ENCODING_VERSION,
+            self.grid.shape[0],
+            n_cols,
+            int(self.display_targs),
+            *[int(o.coord[0]*n_cols+o.coord[1])
+                for o in (self.player, self.pile, self.button)]
+        )
+        encoding = [header]
+        for key in (TARG, DEFAULT, ITEM, SIGNAL):
+            encoding.append(pack_indices(sorted(groups[key])))
+        if targs is not None:
+            encoding.append(pack_indices(
+                [int(t.coord[0]*n_cols+t.coord[1]) for t in targs]
+            ))
+        return b"".join(encoding)
+
     def get_held_outs(self, n_held_outs=4, center_signal=True):
         """
         Creates a dict of heldouts dependent on the parameters of the
@@ -180,7 +399,7 @@ class Register:
                 vals: set of coords
                     the held out coordinates
         """
-        rand = np.random.default_rng(12345)
+        rand = np.random.default_rng(np.random.SeedSequence(HELD_OUT_SEED))
         if self.grid.is_divided: low = self.grid.middle_row+1
         else: low = 0
         high = self.grid.shape[0]
@@ -210,13 +429,73 @@ class Register:
         Args:
             n_targs: None or int
                 if int, changes the number of targets to match the
-                argued value. targs are deleted randomly.
+                argued value. targs are deleted randomly. None removes
+                all of the targets, so they must be initialized again
+                with initialize_targs before they are placed.
         """
         self.display_targs = True
-        self.delete_items(incl_targs=True, incl_signals=True)
-        if n_targs is not None: self.initialize_targs(n_targs)
-        self.grid.reset() # makes a fresh grid
+        # the grid is redrawn below so deleted items are not erased
+        self.delete_items(incl_targs=False, incl_signals=True, draw=False)
+        # targets are deactivated rather than deleted. see
+        # initialize_targs. None leaves no targets, the same as
+        # deleting all of them
+        if n_targs is None: n_targs = 0
+        self.initialize_targs(n_targs)
+        self.grid.reset() # clears the grid in place
         self.draw_register()
+        if self.event_log is not None:
+            self.event_log.step = 0
+            self._carried = -1
+            self.event_log.record(LOG_RESET)
+
+    def enable_event_log(self, capacity: int=4096):
+        """
+        Starts recording events to a ring buffer of fixed width integer
+        records. See EventLog and LOG_EVENTS for details. The log is
+        off by default and costs a single comparison per event site
+        while it is off.
+
+        Args:
+            capacity: int
+                the maximum number of records held before the oldest
+                records are overwritten
+        Returns:
+            event_log: EventLog
+        """
+        self.event_log = EventLog(capacity)
+        self._carried = -1
+        return self.event_log
+
+    def disable_event_log(self):
+        """
+        Stops recording events and discards the event log.
+        """
+        self.event_log = None
+
+    def drain_events(self):
+        """
+        Removes and returns all recorded events in the order that they
+        occurred.
+
+        Returns:
+            records: ndarray (N, len(LOG_FIELDS)) int32
+                the columns are LOG_FIELDS. Empty if the event log is
+                not enabled.
+        """
+        if self.event_log is None:
+            return np.zeros((0, len(LOG_FIELDS)), dtype=np.int32)
+        return self.event_log.drain()
+
+    def flat_index(self, coord):
+        """
+        Converts a coordinate to its flat index row*n_cols+col.
+
+        Args:
+            coord: tuple in grid units (row, col)
+        Returns:
+            idx: int
+        """
+        return int(coord[0]*self.grid.shape[1] + coord[1])
 
     def register_button_event_handler(self, fxn):
         """
@@ -274,25 +553,47 @@ class Register:
             targs.add(targ)
         return targs
 
+    def extend_targ_pool(self, n_targs: int):
+        """
+        Grows the persistent pool of target objects to contain at
+        least the argued number of targets.
+
+        Args:
+          n_targs: int
+            the minimum size of the pool
+        """
+        pool = self._targ_pool
+        if len(pool) < n_targs:
+            pool.extend(self.make_targs(n_targs-len(pool)))
+
     def initialize_targs(self, n_targs: int):
         """
-        Creates or deletes targets from the self._targs set to match
-        the argued number of target objects.
+        Activates the first n_targs targets of the persistent target
+        pool and deactivates the rest so that self._targs matches the
+        argued number of target objects. Deactivated targets are
+        removed from the registers but kept in the pool for later
+        episodes. Activated targets are returned to the state of a
+        newly made target so that the placement of the targets does
+        not depend on the previous episode.
         
         Args:
           n_targs: int
             the desired number of targets
         """
-        if not hasattr(self, "_targs"):
-            self._targs = self.make_targs(n_targs)
-        elif len(self._targs) < n_targs:
-            n = n_targs - len(self._targs)
-            self._targs = {*self._targs, *self.make_targs(n)}
-        elif len(self._targs) > n_targs:
-            targs = self.targs
-            loop_len = len(self._targs)-n_targs
-            for i in range(loop_len):
-                self.delete_obj(targs.pop())
+        self.extend_targ_pool(n_targs)
+        pool = self._targ_pool
+        targs = self._targs
+        for i in range(len(pool)):
+            targ = pool[i]
+            if targ in targs:
+                targs.remove(targ)
+                self.obj_register.discard(targ)
+                self.coord_register[targ.coord].discard(targ)
+            if i < n_targs:
+                targ.coord = (0,0)
+                targ.prev_coord = (-math.inf, -math.inf)
+                targ.color = COLORS[TARG]
+                targs.add(targ)
         self.register_targs()
         return self._targs
 
@@ -346,6 +647,20 @@ class Register:
         # to reflect what its coord variable was before entering the
         # move object function
         did_move = self.move_player(direction)
+        log = self.event_log
+        if log is not None:
+            log.step += 1
+            src = self.flat_index(self.player.prev_coord)
+            if did_move:
+                log.record(
+                    LOG_MOVE,
+                    TYPE2PRIORITY[PLAYER],
+                    src,
+                    self.flat_index(self.player.coord)
+                )
+            if grab == 0 and self._carried >= 0:
+                log.record(LOG_DROP, self._carried, src)
+            self._carried = -1
 
         if grab == 0:
             # must check for overlapping objects and handle
@@ -389,10 +704,22 @@ class Register:
             # pile too, then we delete the item
             if len(objs[ITEM]) > 0 and len(objs[PILE]) > 0:
                 self.delete_obj(objs[ITEM][0])
+                if self.event_log is not None:
+                    self.event_log.record(
+                        LOG_PILE_DELETE,
+                        TYPE2PRIORITY[ITEM],
+                        self.flat_index(player.prev_coord)
+                    )
             # If there is a targ on the coordinate and there is a
             # pile too, then we delete the targ
             elif len(objs[TARG]) > 0 and len(objs[PILE]) > 0:
                 self.delete_obj(objs[TARG][0])
+                if self.event_log is not None:
+                    self.event_log.record(
+                        LOG_PILE_DELETE,
+                        TYPE2PRIORITY[TARG],
+                        self.flat_index(player.prev_coord)
+                    )
             # If there is an item or a targ and another item,targ or
             # button, then we find the nearest empty coordinate for
             # one of the items
@@ -402,6 +729,13 @@ class Register:
                 free_coord = self.find_space(player.prev_coord)
                 if free_coord is not None:
                     self.move_object(objs[ITEM][0], free_coord)
+                    if self.event_log is not None:
+                        self.event_log.record(
+                            LOG_RELOCATE,
+                            TYPE2PRIORITY[ITEM],
+                            self.flat_index(player.prev_coord),
+                            self.flat_index(free_coord)
+                        )
                 else:
                     return FULL
             elif len(objs[TARG]) > 1 or\
@@ -410,6 +744,13 @@ class Register:
                 free_coord = self.find_space(player.prev_coord)
                 if free_coord is not None:
                     self.move_object(objs[TARG][0], free_coord)
+                    if self.event_log is not None:
+                        self.event_log.record(
+                            LOG_RELOCATE,
+                            TYPE2PRIORITY[TARG],
+                            self.flat_index(player.prev_coord),
+                            self.flat_index(free_coord)
+                        )
                 else:
                     return FULL
         return STEP
@@ -467,6 +808,8 @@ class Register:
                 if test_loc(loc): return loc
                 loc = (min_row+i, max_col)
                 if test_loc(loc): return loc
+        if self.event_log is not None:
+            self.event_log.record(LOG_FULL, src=self.flat_index(coord))
         self.raise_full_grid_event()
         return None
 
@@ -525,43 +868,63 @@ class Register:
         elif self.player not in objs and len(objs) > 1: return True
         return False
 
-    def delete_obj(self, game_object: GameObject):
+    def delete_obj(self, game_object: GameObject, draw: bool=True):
         """
-        Deletes the object from the registries and the grid
+        Deletes the object from the registries and the grid. Deleted
+        items and signals are kept for reuse by make_object.
 
         Args:
             game_object: GameObject
                 the gameobject to be deleted
-        """
-        self.grid.draw(
-            game_object.prev_coord,
-            -game_object.color,
-            add_color=True
-        )
+            draw: bool
+                if false, the object is not erased from the grid. Use
+                this when the grid is redrawn afterwards anyway.
+        """
+        if draw:
+            self.grid.draw(
+                game_object.prev_coord,
+                -game_object.color,
+                add_color=True
+            )
         if game_object.coord in self.coord_register:
             self.coord_register[game_object.coord].remove(game_object)
         self.obj_register.remove(game_object)
         if game_object.type == TARG: self._targs.remove(game_object)
+        elif game_object.type == ITEM:
+            self._items.discard(game_object)
+            self._free_objs[ITEM].append(game_object)
+        elif game_object.type == SIGNAL:
+            self._signals.discard(game_object)
+            self._free_objs[SIGNAL].append(game_object)
         elif game_object == self.player: del self.player
         elif game_object == self.button: del self.button
         elif game_object == self.pile: del self.pile
         else: del game_object
 
-    def delete_items(self, incl_targs=False, incl_signals=True):
+    def delete_items(self, incl_targs=False, incl_signals=True,
+                           draw=True):
         """
-        Deletes all items from the registers.
+        Deletes all items from the registers. The tracked sets of
+        items, signals and targets are emptied one object at a time so
+        that the obj_register is never copied.
 
         Args:
             incl_targs: bool
                 if true, targets are also deleted.
             incl_signals: bool
                 if true, signals are also deleted.
-        """
-        reg = {*self.obj_register}
-        for obj in reg:
-            d = obj.type == ITEM or (incl_targs and obj.type == TARG)
-            if d or (incl_signals and obj.type == SIGNAL):
-                self.delete_obj(obj)
+            draw: bool
+                if false, the deleted objects are not erased from the
+                grid. see delete_obj
+        """
+        groups = (
+            self._items,
+            self._signals if incl_signals else (),
+            self._targs if incl_targs else (),
+        )
+        for objs in groups:
+            while len(objs) > 0:
+                self.delete_obj(next(iter(objs)), draw=draw)
 
     def handle_grab(self, player):
         """
@@ -585,6 +948,14 @@ class Register:
             for obj in prev_objs:
                 if obj.type == ITEM or obj.type == TARG:
                     self.move_object(obj, coord=player.coord)
+                    if self.event_log is not None:
+                        self._carried = TYPE2PRIORITY[obj.type]
+                        self.event_log.record(
+                            LOG_CARRY,
+                            self._carried,
+                            self.flat_index(player.prev_coord),
+                            self.flat_index(player.coord)
+                        )
                     return STEP
             # Only possibility for 2 objects is if player is one of them
             if len(prev_objs) == 2 and player in prev_objs:
@@ -592,7 +963,20 @@ class Register:
             obj = prev_objs.pop()
             if obj.type == PILE:
                 self.make_object(obj_type=ITEM, coord=player.coord)
+                if self.event_log is not None:
+                    self.event_log.record(
+                        LOG_PILE_GRAB,
+                        TYPE2PRIORITY[ITEM],
+                        self.flat_index(player.prev_coord),
+                        self.flat_index(player.coord)
+                    )
             elif obj.type == BUTTON:
+                if self.event_log is not None:
+                    self.event_log.record(
+                        LOG_BUTTON,
+                        TYPE2PRIORITY[BUTTON],
+                        self.flat_index(player.prev_coord)
+                    )
                 self.raise_button_event()
                 return BUTTON_PRESS
         return STEP
@@ -659,13 +1043,38 @@ class Register:
                 the intial coordinate of the object
         """
         coord = tuple(coord)
-        obj = GameObject(
-            obj_type=obj_type,
-            color=COLORS[obj_type],
-            coord=coord
-        )
+        obj = self.get_free_obj(obj_type, coord)
         self.obj_register.add(obj)
         self.coord_register[coord].add(obj)
+        if obj_type == ITEM: self._items.add(obj)
+        elif obj_type == SIGNAL: self._signals.add(obj)
+
+    def get_free_obj(self, obj_type: str, coord: tuple=(0,0)):
+        """
+        Returns a previously deleted object of the argued type in the
+        state of a newly made object. A new object is only created if
+        no deleted object is available. DOES NOT REGISTER IT!!
+
+        Args:
+            obj_type: str
+                the type of object. See OBJECT_TYPES for options
+            coord: tuple in grid units (row, col)
+                the intial coordinate of the object
+        Returns:
+            obj: GameObject
+        """
+        free = self._free_objs[obj_type]
+        if len(free) == 0:
+            return GameObject(
+                obj_type=obj_type,
+                color=COLORS[obj_type],
+                coord=coord
+            )
+        obj = free.pop()
+        obj.coord = coord
+        obj.prev_coord = (-math.inf, -math.inf)
+        obj.color = COLORS[obj_type]
+        return obj
 
     def apply_direction(self, coord: tuple, direction: int):
         """
@@ -743,11 +1152,17 @@ class Register:
                 game_object does not change
         """
         direction = direction % len(DIRECTIONS)
-        coord = self.apply_direction(self.player.coord, direction)
-        if self.grid.is_playable(coord):
-            return self.move_object(self.player, coord)
+        topology = self.grid.topology
+        idx = topology.coord2idx.get(self.player.coord)
+        if idx is None:
+            coord = self.apply_direction(self.player.coord, direction)
+            if not self.grid.is_playable(coord): return False
         else:
-            return False
+            # illegal moves map to the starting index
+            new_idx = topology.moves[idx][direction]
+            if new_idx == idx: return False
+            coord = topology.coords[new_idx]
+        return self.move_object(self.player, coord)
 
     def draw_register(self):
         """
@@ -764,17 +1179,40 @@ class Register:
         # ndarray reference self.grid._grid.
         self.grid.clear(remove_divider=False)
 
-        n_rows, n_cols = self.grid.shape
-        for row in range(n_rows):
-            for col in range(n_cols):
-                coord = (row,col)
-                if len(self.coord_register[coord]) > 0:
-                    color = 0
-                    for obj in self.coord_register[coord]:
-                        if self.display_targs or obj.type != TARG:
-                            color += obj.color
-                        obj.prev_coord = tuple(obj.coord)
-                    self.grid.draw(coord=coord, color=color)
+        # only the occupied coordinates are visited, each exactly once
+        display_targs = self.display_targs
+        drawn = set()
+        for game_obj in self.obj_register:
+            coord = tuple(game_obj.coord)
+            if coord in drawn: continue
+            drawn.add(coord)
+            objs = self.coord_register[coord]
+            # fsum makes the summed color independent of the
+            # set iteration order
+            color = math.fsum(
+                obj.color for obj in objs\
+                    if display_targs or obj.type != TARG
+            )
+            for obj in objs:
+                obj.prev_coord = coord
+            self.grid.draw(coord=coord, color=color)
+
+    def draw_prev_coords(self):
+        """
+        Redraws the grid using each GameObject's prev_coord. Because
+        prev_coord tracks where each object was last drawn, this
+        recreates the most recently drawn frame without changing the
+        state of any GameObject. Objects that have never been drawn are
+        skipped.
+        """
+        self.grid.clear(remove_divider=False)
+        colors = defaultdict(list)
+        for obj in self.obj_register:
+            if self.display_targs or obj.type != TARG:
+                colors[obj.prev_coord].append(obj.color)
+        for coord, color in colors.items():
+            if self.grid.is_inbounds(coord):
+                self.grid.draw(coord=coord, color=math.fsum(color))
 
     def draw_register_changes(self):
         """
@@ -861,7 +1299,7 @@ class Register:
             if not(spacing_limit is None or spacing_limit<=0):
                 cols[0] = cols[1]-spacing_limit
                 cols[2] = cols[1]+spacing_limit
-            if sym_distr and np.random.random() >= .5:
+            if sym_distr and self.rand.random() >= .5:
                 cols[0],cols[2] = cols[2],cols[0]
         if player_on_pile:
             cols[0] = cols[1]
@@ -875,7 +1313,9 @@ class Register:
         """
         for _ in self._targs:
             self.make_object(obj_type=ITEM, coord=(0,0))
-        objs = [*(self.obj_register-self._targs)]
+        # fixed object order so that seeded layouts are reproducible
+        objs = [self.player, self.pile, self.button]
+        objs += [o for o in self.obj_register-self._targs if o not in objs]
         s = len(objs)
         cols = self.rand.integers(
             low=0,
@@ -886,12 +1326,19 @@ class Register:
         if self.grid.is_divided: high = self.grid.middle_row
         else: high = self.grid.shape[0]
         coords = set()
+        # The objects that are being placed still sit at their coords
+        # from the previous episode, so only the other objects can
+        # block a coord. Otherwise the layout would depend on the
+        # previous episode.
+        placing = set(objs)
+        blocked = {
+            tuple(o.coord) for o in self.obj_register if o not in placing
+        }
         for i in obj_order:
             row = self.rand.integers(0,high)
             coord = (row,cols[i])
             n_loops = 0
-            while coord is None or not self.is_empty(coord) or\
-                                               coord in coords:
+            while coord is None or coord in blocked or coord in coords:
                 n_loops += 1
                 if n_loops > 50:
                     n_loops = 0
@@ -1059,6 +1506,29 @@ class Register:
             coord = (row, col)
             self.move_object(targ, coord=coord)
 
+    def apply_layout(self, ppb_cols, targ_coords):
+        """
+        Places the player, pile, and button along the top row and the
+        targets at the argued coordinates. Used with layouts that were
+        generated ahead of time by a LayoutBuffer.
+
+        Args:
+            ppb_cols: sequence of ints [player, pile, button]
+                the columns of the player, pile, and button
+            targ_coords: sequence of (row, col)
+                a coordinate for each of the targets
+        """
+        assert len(targ_coords) == len(self._targs)
+        self.move_object(self.player, (0, int(ppb_cols[0])))
+        self.move_object(self.pile,   (0, int(ppb_cols[1])))
+        self.move_object(self.button, (0, int(ppb_cols[2])))
+        # the targets are placed in the iteration order of self.targs
+        # as in rand_targ_placement because the flashing games flash
+        # them in that order. The order of _targs itself depends on the
+        # history of the set, i.e. set_state.
+        for targ, (row, col) in zip(self.targs, targ_coords):
+            self.move_object(targ, coord=(int(row), int(col)))
+
     def navigation_task(self, *args, **kwargs):
         """
         Initialization func for the navigation game.
@@ -1072,7 +1542,8 @@ class Register:
 
     def even_line_match(self, rand_pdb=True, player_on_pile=False,
                                              spacing_limit=None,
-                                             sym_distr=True):
+                                             sym_distr=True,
+                                             layout=None):
         """
         Initialization function for the line match game A.
 
@@ -1100,15 +1571,21 @@ class Register:
                 at initialization on every episode. Otherwise the initial
                 distribution is reflected about the yaxis with 50% prob.
                 Only applies when rand_pdb is false.
+            layout: None or tuple (ppb_cols, targ_coords)
+                a pre-generated layout to use instead of sampling
+                one. See apply_layout and LayoutBuffer.
         """
-        # each is randomly placed in the top row of the grid
-        self.place_player_pile_button(
-            rand_pdb,
-            player_on_pile,
-            spacing_limit,
-            sym_distr
-        )
-        self.even_targ_spacing()
+        if layout is not None:
+            self.apply_layout(*layout)
+        else:
+            # each is randomly placed in the top row of the grid
+            self.place_player_pile_button(
+                rand_pdb,
+                player_on_pile,
+                spacing_limit,
+                sym_distr
+            )
+            self.even_targ_spacing()
         self.draw_register()
 
     def cluster_match(self, reserved_coords=set(),
@@ -1116,7 +1593,8 @@ class Register:
                             player_on_pile=False,
                             spacing_limit=None,
                             sym_distr=True,
-                            held_out=False):
+                            held_out=False,
+                            layout=None):
         """
         Intialization function for the Cluster Match game B.
 
@@ -1151,24 +1629,31 @@ class Register:
             held_out: bool
                 if true, will sample an episode that was held out from
                 the non-held out episodes
+            layout: None or tuple (ppb_cols, targ_coords)
+                a pre-generated layout to use instead of sampling
+                one. See apply_layout and LayoutBuffer.
         """
-        self.place_player_pile_button(
-            rand_pdb,
-            player_on_pile,
-            spacing_limit,
-            sym_distr
-        )
-        self.rand_targ_placement(
-            reserved_coords=reserved_coords,
-            held_outs=self.held_outs,
-            invert=held_out
-        )
+        if layout is not None:
+            self.apply_layout(*layout)
+        else:
+            self.place_player_pile_button(
+                rand_pdb,
+                player_on_pile,
+                spacing_limit,
+                sym_distr
+            )
+            self.rand_targ_placement(
+                reserved_coords=reserved_coords,
+                held_outs=self.held_outs,
+                invert=held_out
+            )
         self.draw_register()
 
     def orthogonal_line_match(self, rand_pdb=True,
                                     player_on_pile=False,
                                     spacing_limit=None,
-                                    sym_distr=True):
+                                    sym_distr=True,
+                                    layout=None):
         """
         Initialization function for the orthogonal line match game C.
 
@@ -1196,19 +1681,26 @@ class Register:
                 at initialization on every episode. Otherwise the initial
                 distribution is reflected about the yaxis with 50% prob.
                 Only applies when rand_pdb is false.
+            layout: None or tuple (ppb_cols, targ_coords)
+                a pre-generated layout to use instead of sampling
+                one. See apply_layout and LayoutBuffer.
         """
-        self.place_player_pile_button(
-            rand_pdb,
-            player_on_pile,
-            spacing_limit,
-            sym_distr
-        )
-        self.vertical_targ_spacing()
+        if layout is not None:
+            self.apply_layout(*layout)
+        else:
+            self.place_player_pile_button(
+                rand_pdb,
+                player_on_pile,
+                spacing_limit,
+                sym_distr
+            )
+            self.vertical_targ_spacing()
         self.draw_register()
 
     def uneven_line_match(self, rand_pdb=True, player_on_pile=False,
                                              spacing_limit=None,
-                                             sym_distr=True):
+                                             sym_distr=True,
+                                             layout=None):
         """
         Initialization function for the uneven line match game D.
 
@@ -1236,13 +1728,19 @@ class Register:
                 at initialization on every episode. Otherwise the initial
                 distribution is reflected about the yaxis with 50% prob.
                 Only applies when rand_pdb is false.
+            layout: None or tuple (ppb_cols, targ_coords)
+                a pre-generated layout to use instead of sampling
+                one. See apply_layout and LayoutBuffer.
         """
-        self.place_player_pile_button(
-            rand_pdb,
-            player_on_pile,
-            spacing_limit,
-            sym_distr
-        )
-        self.uneven_targ_spacing()
+        if layout is not None:
+            self.apply_layout(*layout)
+        else:
+            self.place_player_pile_button(
+                rand_pdb,
+                player_on_pile,
+                spacing_limit,
+                sym_distr
+            )
+            self.uneven_targ_spacing()
         self.draw_register()
 
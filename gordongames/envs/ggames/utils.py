@@ -1,5 +1,8 @@
 import numpy as np
+import struct
+import hashlib
 from collections import defaultdict
+from gordongames.envs.ggames.constants import TYPE2PRIORITY
 
 def get_rows_and_cols(objs: set):
     """
@@ -156,10 +159,59 @@ def get_aligned_items(items: set, targs: set, min_row: int=1):
     )
     return items-loners
 
+def count_aligned_coords(item_coords, targ_coords, min_row=0):
+    """
+    Coordinate equivalent of len(get_aligned_items(...)). Useful for
+    computing the number of aligned items from a frozen snapshot of
+    the coordinates.
+
+    Args:
+        item_coords: sequence of tuples (row, col)
+            the coordinates of the items
+        targ_coords: sequence of tuples (row, col)
+            the coordinates of the targets
+        min_row: int
+            the minimum row that is allowed to be the majority row.
+    Returns:
+        n_aligned: int
+    """
+    rows = dict()
+    for row,_ in item_coords:
+        if row >= min_row: rows[row] = rows.get(row, 0) + 1
+    max_row = max_key(rows)
+    if max_row is None: return 0
+    targ_cols = {col for _,col in targ_coords}
+    aligned = {
+        (row,col) for row,col in item_coords\
+            if row == max_row and col in targ_cols
+    }
+    return len(aligned)
+
+def get_grab_priority(objs, obj):
+    """
+    Finds the TYPE2PRIORITY value of the highest priority object in
+    objs that is not the argued object. The highest priority is the
+    lowest value.
+
+    Args:
+        objs: sequence of GameObjects
+        obj: GameObject
+            the object to ignore. usually the player
+    Returns:
+        priority: int
+            0 if there are no other objects
+    """
+    priority = 0
+    for o in objs:
+        if o is not obj:
+            p = TYPE2PRIORITY[o.type]
+            if priority == 0 or p < priority: priority = p
+    return priority
+
 def max_key(d):
     """
     Finds the maximum value of all the keys in the dict and returns
-    the key.
+    the key. Returns the smallest key in case of equal values.
 
     Args:
         d: dict
@@ -170,7 +222,10 @@ def max_key(d):
     max_count = 0
     m_key = None
     for k,v in d.items():
-        if v > max_count: m_key = k
+        if v > max_count or (v == max_count and m_key is not None\
+                                                   and k < m_key):
+            max_count = v
+            m_key = k
     return m_key
 
 def nearest_obj(ref_obj, objs):
@@ -255,7 +310,8 @@ def sample_numpy(pi, rand=None):
 def zipfian(low=1, high=9, order=1, rand=None):
     """
     Draws a single integer from low (inclusive) to high (inclusive) in
-    which the probability is proportional to 1/k^order.
+    which the probability is proportional to 1/k^order. See
+    get_zipf_sampler for repeated or bulk draws.
 
     Args:
         low: int (inclusive)
@@ -273,10 +329,344 @@ def zipfian(low=1, high=9, order=1, rand=None):
     """
     if low == high: return low
     assert low < high and low > 0
+    return get_zipf_sampler(low, high, order).sample(rand=rand)
+
+"""
+Zipf samplers are shared by every caller with the same configuration.
+    keys: tuple (low, high, order, hold_outs)
+    vals: ZipfSampler
+"""
+ZIPF_SAMPLERS = dict()
+
+def get_zipf_sampler(low=1, high=9, order=1, hold_outs=frozenset()):
+    """
+    Returns the shared ZipfSampler for the argued configuration,
+    creating it if it does not yet exist.
 
-    probs = np.arange(low, high+1).astype("float")
-    probs = 1/(probs**order)
-    probs = probs/probs.sum()
-    samp = sample_numpy(probs, rand=rand)
-    return samp + low
+    Args:
+        low: int (inclusive)
+            the lowest possible value
+        high: int (inclusive)
+            the highest possible value
+        order: float
+            the order of the exponent to weight the probability density
+            for each possible value.
+        hold_outs: set of ints
+            values that are never sampled
+    Returns:
+        sampler: ZipfSampler
+    """
+    key = (int(low), int(high), float(order), frozenset(hold_outs))
+    if key not in ZIPF_SAMPLERS:
+        ZIPF_SAMPLERS[key] = ZipfSampler(*key)
+    return ZIPF_SAMPLERS[key]
+
+class ZipfSampler:
+    """
+    Draws integers from low (inclusive) to high (inclusive) in which
+    the probability is proportional to 1/k^order. The hold outs are
+    removed from the distribution and the remaining probabilities are
+    renormalized, which is equivalent to redrawing until a value that
+    is not held out is sampled. Draws use the alias method so each
+    draw costs a single uniform number regardless of the number of
+    values. Use get_zipf_sampler to get the instance that is shared by
+    all callers with the same configuration.
+
+    Members:
+        values: ndarray (N,) int64
+            the values that can be sampled
+        probs: ndarray (N,) float
+            the probability of each value
+        alias_probs: ndarray (N,) float
+            the probability of keeping the drawn column of the alias
+            table rather than using its alias
+        aliases: ndarray (N,) int64
+            the alias index of each column of the alias table
+    """
+    def __init__(self,
+                 low: int=1,
+                 high: int=9,
+                 order: float=1,
+                 hold_outs=frozenset()):
+        """
+        Args:
+            low: int (inclusive)
+                the lowest possible value
+            high: int (inclusive)
+                the highest possible value
+            order: float
+                the order of the exponent to weight the probability
+                density for each possible value.
+            hold_outs: set of ints
+                values that are never sampled
+        """
+        values = [k for k in range(low, high+1) if k not in hold_outs]
+        assert len(values) > 0
+        assert values[0] > 0 or order == 0
+        self.values = np.asarray(values, dtype=np.int64)
+        probs = 1/(self.values.astype("float")**order)
+        self.probs = probs/probs.sum()
+
+        # Vose's alias method
+        n = len(values)
+        scaled = self.probs*n
+        self.alias_probs = np.ones(n)
+        self.aliases = np.arange(n)
+        small = [i for i in range(n) if scaled[i] < 1]
+        large = [i for i in range(n) if scaled[i] >= 1]
+        while len(small) > 0 and len(large) > 0:
+            s = small.pop()
+            l = large.pop()
+            self.alias_probs[s] = scaled[s]
+            self.aliases[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1
+            if scaled[l] < 1: small.append(l)
+            else: large.append(l)
+        # python lists make single draws faster than ndarray indexing
+        self._values = [int(v) for v in self.values]
+        self._alias_probs = [float(p) for p in self.alias_probs]
+        self._aliases = [int(a) for a in self.aliases]
+
+    def __len__(self):
+        return len(self._values)
+
+    def sample(self, n=None, rand=None):
+        """
+        Draws from the distribution. The integer part of a scaled
+        uniform number selects a column of the alias table and the
+        fractional part decides between the column and its alias.
+
+        Args:
+            n: None or int
+                if None, a single int is returned. Otherwise an
+                ndarray of n samples is returned.
+            rand: None or random number generator
+                if None, uses np.random instead
+        Returns:
+            sample: int or ndarray (n,) int64
+        """
+        if rand is None: rand = np.random
+        n_vals = len(self._values)
+        if n is None:
+            u = rand.random()*n_vals
+            i = min(int(u), n_vals-1)
+            if u-i >= self._alias_probs[i]: i = self._aliases[i]
+            return self._values[i]
+        u = rand.random(n)*n_vals
+        idxs = np.minimum(u.astype(np.int64), n_vals-1)
+        keep = (u-idxs) < self.alias_probs[idxs]
+        return self.values[np.where(keep, idxs, self.aliases[idxs])]
+
+def sample_timing_schedule(n_flashes, timing_p=1, rand=None):
+    """
+    Samples the skip schedule of a flashing animation in which each
+    step displays the next target with probability timing_p and is
+    otherwise skipped. The first step is never skipped. After the
+    n_flashes-th displayed step, a final step ends the animation.
+
+    Args:
+        n_flashes: int
+            the number of steps that must be displayed before the
+            final step of the animation
+        timing_p: float between 0 and 1
+            the probability of displaying the next target on any
+            given step after the first
+        rand: None or random number generator
+            if None, uses np.random instead
+    Returns:
+        schedule: ndarray (T,) int8
+            the skipped flag of each step in the animation. The first
+            and last entries are always 0.
+    """
+    if n_flashes <= 1 or timing_p >= 1:
+        return np.zeros(max(n_flashes,0)+1, dtype=np.int8)
+    if rand is None: rand = np.random
+    # the number of displayed steps after the first
+    n_needed = n_flashes-1
+    size = int(np.ceil(2*n_needed/max(timing_p, 0.01)))
+    draws = (rand.random(size) >= timing_p).astype(np.int8)
+    shown = np.flatnonzero(draws==0)
+    while len(shown) < n_needed:
+        more = (rand.random(size) >= timing_p).astype(np.int8)
+        draws = np.concatenate([draws, more])
+        shown = np.flatnonzero(draws==0)
+    draws = draws[:shown[n_needed-1]+1]
+    return np.concatenate([[0], draws, [0]]).astype(np.int8)
+
+
+def popcount(bits):
+    """
+    Counts the number of set bits in a bitboard.
+
+    Args:
+        bits: int
+            a python int bitboard
+    Returns:
+        count: int
+            the number of set bits
+    """
+    return bin(bits).count("1")
 
+def get_bitboard(objs, n_cols):
+    """
+    Creates a bitboard from the coordinates of the argued objects. The
+    bit at flat index row*n_cols+col is set for each object's coord.
+    Objects that share a coordinate set the same bit.
+
+    Args:
+        objs: iterable of GameObjects
+        n_cols: int
+            the number of columns in the grid
+    Returns:
+        bits: int
+            the bitboard
+    """
+    bits = 0
+    for obj in objs:
+        row,col = obj.coord
+        bits |= 1 << int(row*n_cols + col)
+    return bits
+
+def get_row_bits(bits, row, n_cols):
+    """
+    Returns the bits of a single row of the bitboard shifted down to
+    the lowest n_cols bits. Bit i of the returned value corresponds to
+    column i of the row.
+
+    Args:
+        bits: int
+            the bitboard
+        row: int
+            the row of interest
+        n_cols: int
+            the number of columns in the grid
+    Returns:
+        row_bits: int
+    """
+    return (bits >> (row*n_cols)) & ((1<<n_cols)-1)
+
+def get_col_mask(bits, n_cols):
+    """
+    Collapses the bitboard along its rows. Bit i of the returned value
+    is set if any row of the bitboard has column i set.
+
+    Args:
+        bits: int
+            the bitboard
+        n_cols: int
+            the number of columns in the grid
+    Returns:
+        col_mask: int
+    """
+    row_mask = (1<<n_cols)-1
+    col_mask = 0
+    while bits:
+        col_mask |= bits & row_mask
+        bits >>= n_cols
+    return col_mask
+
+def get_row_span(bits, n_cols):
+    """
+    Finds the lowest and highest rows that contain a set bit.
+
+    Args:
+        bits: int
+            the bitboard
+        n_cols: int
+            the number of columns in the grid
+    Returns:
+        min_row: int or None
+            None if no bits are set
+        max_row: int or None
+            None if no bits are set
+    """
+    if bits == 0: return None, None
+    low = (bits & -bits).bit_length()-1
+    high = bits.bit_length()-1
+    return low//n_cols, high//n_cols
+
+def get_max_row_bits(bits, n_cols, min_row=0):
+    """
+    Bitboard equivalent of get_max_row. Finds the row with the most
+    set bits. Returns the earliest row in case of equal counts.
+
+    Args:
+        bits: int
+            the bitboard
+        n_cols: int
+            the number of columns in the grid
+        min_row: int (inclusive)
+            determines the minimum row available for counting
+    Returns:
+        max_row: int or None
+            the row with the largest number of set bits. None if no
+            bits are set at or beyond min_row
+        count: int
+            the number of set bits along the max_row
+    """
+    row_mask = (1<<n_cols)-1
+    bits >>= min_row*n_cols
+    row = min_row
+    max_row = None
+    max_count = 0
+    while bits:
+        count = popcount(bits & row_mask)
+        if count > max_count:
+            max_row = row
+            max_count = count
+        bits >>= n_cols
+        row += 1
+    return max_row, max_count
+
+def count_aligned_bits(item_bits, targ_bits, n_cols, min_row=0):
+    """
+    Bitboard equivalent of len(get_aligned_items(...)). Counts the
+    item coordinates that sit on the row with the most items and have
+    a target in their column.
+
+    Args:
+        item_bits: int
+            the bitboard of the items
+        targ_bits: int
+            the bitboard of the targets
+        n_cols: int
+            the number of columns in the grid
+        min_row: int
+            the minimum row that is allowed to be the majority row.
+    Returns:
+        n_aligned: int
+    """
+    max_row, _ = get_max_row_bits(item_bits, n_cols, min_row=min_row)
+    if max_row is None: return 0
+    row_bits = get_row_bits(item_bits, max_row, n_cols)
+    return popcount(row_bits & get_col_mask(targ_bits, n_cols))
+
+def pack_indices(idxs):
+    """
+    Packs a sequence of flat indices into bytes. The encoding is a
+    little-endian uint16 count followed by each index as a little-endian
+    uint16.
+
+    Args:
+        idxs: sequence of ints
+            the flat indices (row*n_cols+col) to pack
+    Returns:
+        packed: bytes
+    """
+    return struct.pack("<%dH" % (len(idxs)+1), len(idxs), *idxs)
+
+def hash_state(encoding):
+    """
+    Hashes a state encoding produced by encode_state. Unlike python's
+    builtin hash, the value is the same across processes, platforms
+    and python versions.
+
+    Args:
+        encoding: bytes
+            a state encoding
+    Returns:
+        hash: int
+            an unsigned 64 bit hash of the encoding
+    """
+    digest = hashlib.blake2b(encoding, digest_size=8).digest()
+    return int.from_bytes(digest, "little")
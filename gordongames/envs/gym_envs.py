@@ -4,8 +4,11 @@ import gym.spaces as spaces
 #from gordongames.envs.ggames import Discrete
 from gordongames.envs.ggames.controllers import *
 from gordongames.envs.ggames.constants import GRAB, STAY, ITEM, TARG, PLAYER, PILE, BUTTON, OBJECT_TYPES
-from gordongames.envs.ggames.utils import find_empty_space_along_row
+from gordongames.envs.ggames.utils import find_empty_space_along_row, hash_state, get_grab_priority
+from gordongames.envs.ggames.info import get_info_keys, INFO_DTYPE, make_info_records, write_info_record
+from gordongames.envs.ggames.layouts import LayoutLibrary
 import numpy as np
+import struct
 import time
 
 try:
@@ -47,6 +50,9 @@ class GordonGame(gym.Env):
                  min_play_area=False,
                  n_held_outs=0,
                  center_signal=True,
+                 info_keys=None,
+                 n_layouts=0,
+                 layout_library=None,
                  *args, **kwargs):
         """
         Args:
@@ -80,7 +86,9 @@ class GordonGame(gym.Env):
                 if true, the number of frames after each pixel reveal
                 is uniformly selected from 1-2 frames. This forces the
                 numeric signal to be derived from the number of pixels
-                rather than the number of frames.
+                rather than the number of frames. The skips are
+                sampled from the seeded generator at reset and can be
+                found at controller.timing_schedule
             timing_p: float between 0 and 1
                 the probability of displaying the next target item. the
                 animation phase continues until all targets are
@@ -111,6 +119,19 @@ class GordonGame(gym.Env):
                 if true, signal coord will be centered in demonstration
                 area. Otherwise a signal pixel will appear on both
                 edges of the grid one row down from the top.
+            info_keys: sequence of str or None
+                the info keys to compute on each step. See INFO_KEYS
+                for options. Keys that are not selected are never
+                computed. If empty, step returns a shared, empty dict
+                that must not be written to. None selects all keys.
+            n_layouts: int
+                if greater than 0, the initial layouts of this many
+                episodes are generated at once and popped by the
+                following resets. The distribution of the layouts is
+                unchanged. See LayoutBuffer.
+            layout_library: None or str or LayoutLibrary
+                a layout library (or its path) to load layouts from
+                with reset(layout_index=i). See make_layout_library.
         """
         # determines the unit dimensions of the grid
         self.grid_size = grid_size
@@ -140,11 +161,18 @@ class GordonGame(gym.Env):
         self.n_held_outs = n_held_outs
         if n_held_outs is None: self.n_held_outs = 0
         self.center_signal = center_signal
+        self.info_keys = get_info_keys(info_keys)
+        self.n_layouts = n_layouts
+        self.info_records = None
+        self.info_index = 0
         self.viewer = None
         self.action_space = spaces.Discrete(6)
         self.is_grabbing = False
-        self.seed(int(time.time()))
+        self.seed()
         self.set_controller()
+        self.layout_library = None
+        if layout_library is not None:
+            self.set_layout_library(layout_library)
         obs = np.zeros(
             [g*self.pixel_density for g in self.grid_size],
             dtype=np.float32
@@ -177,9 +205,11 @@ class GordonGame(gym.Env):
                 "min_play_area": self.min_play_area,
                 "n_held_outs": self.n_held_outs,
                 "center_signal": self.center_signal,
+                "info_keys": self.info_keys,
+                "n_layouts": self.n_layouts,
             }
         self.controller = self.controller_type(**contr_kwargs)
-        self.controller.rand = self.rand
+        self.share_rands()
         self.controller.reset()
 
     def _toggle_grab(self):
@@ -206,6 +236,10 @@ class GordonGame(gym.Env):
 
     def step(self, action):
         """
+        This step is shared by all games. The conversion of the action
+        into controls is implemented in get_controls and the game
+        specific info in update_info.
+
         Args:
             action: int
                 the action should be an int of either a direction or
@@ -224,29 +258,122 @@ class GordonGame(gym.Env):
             done: bool
                 if true, the episode has ended
             info: dict
-                whatever information the game contains
+                whatever information the game contains. If info
+                records are enabled, the info is written to
+                info_records[info_index] instead and an empty dict
+                is returned.
         """
         self.step_count += 1
-        if action != GRAB:
-            direction = action
-            grab = self.is_grabbing
-        else:
-            direction = STAY
-            grab = self._toggle_grab()
-        self.last_obs,rew,done,info = self.controller.step(
-            direction,
-            int(grab)
-        )
-        player = self.controller.register.player
-        info["grab"] = self.get_other_obj_idx(player, grab)
-        info["player_loc"] = self.controller.register.player.coord
-        info["count_loc"] = self.controller.register.pile.coord
-        info["end_loc"] = self.controller.register.button.coord
+        direction, grab, grabbed = self.get_controls(action)
+        controller = self.controller
+        obs, rew, done, info = controller.step(direction, grab)
+        self.last_obs = obs
         if self.step_count > self.max_steps: done = True
         elif self.step_count == self.max_steps and rew == 0:
-            rew = self.controller.max_punishment
+            rew = controller.max_punishment
             done = True
-        return self.last_obs, rew, done, info
+        if self.info_keys:
+            self.update_info(info, grab, done, grabbed)
+        if self.info_records is not None:
+            write_info_record(self.info_records, self.info_index, info)
+            info = dict()
+        return obs, rew, done, info
+
+    def enable_info_records(self, records=None, index=0):
+        """
+        Makes each step write its info into a preallocated structured
+        record array rather than returning an info dict. See
+        INFO_DTYPE for the fields. Keys that are not in info_keys are
+        written as 0. Vectorized environments can share a single
+        (N,) array by giving each environment its own index.
+
+        Args:
+            records: ndarray (N,) INFO_DTYPE or None
+                the array to write to. If None, a single record is
+                allocated.
+            index: int
+                the index of the record that this environment writes
+        Returns:
+            records: ndarray (N,) INFO_DTYPE
+        """
+        if records is None: records = make_info_records(1)
+        assert records.dtype == INFO_DTYPE
+        self.info_records = records
+        self.info_index = index
+        return records
+
+    def disable_info_records(self):
+        """
+        Returns step to producing info dicts.
+        """
+        self.info_records = None
+
+    def get_controls(self, action):
+        """
+        Converts the action into the controls of the controller. The
+        grab action toggles the grab state of the player.
+
+        Args:
+            action: int
+                the action should be an int of either a direction or
+                a grab command. See step.
+        Returns:
+            direction: int
+                the direction argued to the controller
+            grab: int [0,1]
+                the grab argued to the controller
+            grabbed: int
+                the TYPE2PRIORITY value of the object grabbed by the
+                env on behalf of the player. 0 if the env did not grab
+                anything
+        """
+        if action != GRAB: return action, int(self.is_grabbing), 0
+        return STAY, int(self._toggle_grab()), 0
+
+    def update_info(self, info, grab, done, grabbed):
+        """
+        Adds the env specific values to the info of the controller.
+        Only the keys in info_keys are written.
+
+        Args:
+            info: LazyInfo
+                the info returned by the controller
+            grab: int [0,1]
+                the grab argued to the controller
+            done: bool
+                if true, the episode has ended
+            grabbed: int
+                see get_controls
+        """
+        if "grab" in self.info_keys:
+            if grab:
+                # the objects under the player are frozen so that grab
+                # can be computed lazily
+                reg = self.controller.register
+                info.set_lazy(
+                    "grab",
+                    get_grab_priority,
+                    tuple(reg.coord_register[reg.player.coord]),
+                    reg.player
+                )
+            else: info["grab"] = 0
+        self.set_loc_info(info)
+
+    def set_loc_info(self, info):
+        """
+        Adds the current locations of the player, pile, and button to
+        the argued info dict if they are in info_keys.
+
+        Args:
+            info: dict
+        """
+        keys = self.info_keys
+        if "player_loc" in keys:
+            info["player_loc"] = self.controller.register.player.coord
+        if "count_loc" in keys:
+            info["count_loc"] = self.controller.register.pile.coord
+        if "end_loc" in keys:
+            info["end_loc"] = self.controller.register.button.coord
 
     def get_other_obj_idx(self, obj, grab):
         """
@@ -298,15 +425,262 @@ class GordonGame(gym.Env):
             else: self.max_steps = self.master_max_steps
         else: self.max_steps = max_steps
 
+    def get_layout_meta(self):
+        """
+        Returns the options that determine the distribution of the
+        initial layouts. A layout library is only valid for games with
+        the same options.
+
+        Returns:
+            meta: dict
+                the values are json serializable. grid_size and
+                targ_range are tuples as in LayoutLibrary.meta
+        """
+        spacing_limit = self.spacing_limit
+        if spacing_limit is not None: spacing_limit = int(spacing_limit)
+        zipf_exponent = self.zipf_exponent
+        if zipf_exponent is not None: zipf_exponent = float(zipf_exponent)
+        return {
+            "grid_size": tuple(int(g) for g in self.grid_size),
+            "targ_range": tuple(int(t) for t in self.controller.targ_range),
+            "min_play_area": bool(self.min_play_area),
+            "hold_outs": sorted(int(h) for h in self.hold_outs),
+            "zipf_exponent": zipf_exponent,
+            "n_held_outs": int(self.n_held_outs),
+            "rand_pdb": bool(self.rand_pdb),
+            "player_on_pile": bool(self.player_on_pile),
+            "spacing_limit": spacing_limit,
+            "sym_distr": bool(self.sym_distr),
+        }
+
+    def make_layout_library(self, path, n_layouts, seed=0):
+        """
+        Generates a fixed set of initial layouts for this game's
+        configuration and saves it as a memory mapped LayoutLibrary.
+        The library is attached to the env.
+
+        Args:
+            path: str
+                the path of the library with or without the .npy
+                extension. Existing files are overwritten.
+            n_layouts: int
+                the number of layouts in the library
+            seed: int
+                the seed of the layouts
+        Returns:
+            library: LayoutLibrary
+        """
+        env_id = type(self).__name__
+        if self.spec is not None: env_id = self.spec.id
+        meta = {
+            "env_id": env_id,
+            **self.get_layout_meta(),
+            "seed": seed,
+        }
+        library = LayoutLibrary.save(
+            path,
+            self.controller.make_layout_buffer(),
+            n_layouts,
+            np.random.default_rng(seed),
+            meta
+        )
+        self.set_layout_library(library)
+        return library
+
+    def set_layout_library(self, library):
+        """
+        Attaches a layout library so that episodes can be started from
+        its layouts with reset(layout_index=i). The library must have
+        been made by a game with the same layout kind and the same
+        options (see get_layout_meta).
+
+        Args:
+            library: str or LayoutLibrary
+                the library or the path of the library
+        """
+        if type(library) == str: library = LayoutLibrary(library)
+        meta = library.meta
+        assert meta["layout_kind"] == self.controller.layout_kind
+        for key,val in self.get_layout_meta().items():
+            assert key in meta and meta[key] == val,\
+                "The layout library was made with {}={}, not {}".format(
+                    key, meta.get(key), val
+                )
+        self.layout_library = library
+
     def reset(self, n_targs=None, max_steps=None, held_out=False,
-                                                *args, **kwargs):
-        self.controller.rand = self.rand
-        self.controller.reset(n_targs=n_targs, held_out=held_out)
+                                  fast_forward=False,
+                                  layout_index=None,
+                                  *args, **kwargs):
+        """
+        Args:
+            n_targs: int or None
+                if int is argued, this will dictate the number of
+                target items for the episode
+            max_steps: positive int or None
+                the maximum number of steps for the episode
+            held_out: bool
+                if true, will sample an episode that was held out from
+                the non-held out episodes
+            fast_forward: bool
+                if true, the animation phase is run within the reset
+                with the player staying still (see
+                Controller.fast_forward). The agent's first step is
+                then the first interactive step of the game. The
+                animation steps count towards max_steps. If the
+                animation outlasts max_steps, it is only run up to
+                the step before max_steps, so that the step that
+                reaches max_steps ends the episode with the usual
+                punishment.
+            layout_index: int or None
+                if int, the episode starts from this layout of the
+                attached layout library and the layout is not
+                sampled. n_targs and held_out are ignored. The timing
+                of the flashing games is still sampled.
+        Returns:
+            last_obs: ndarray (H, W)
+                the observation. If fast_forward is true, this is an
+                ndarray (T, H, W) of the reset observation followed by
+                the observation of each animation step.
+            info: dict
+                an empty dict. If fast_forward is true, this is an
+                ndarray (T,) INFO_DTYPE of the info records matching
+                each observation. The first record is empty because
+                reset does not produce an info.
+        """
+        self.share_rands()
+        if layout_index is not None:
+            assert self.layout_library is not None,\
+                "no layout library, see make_layout_library"
+            n_targs, ppb_cols, targ_coords =\
+                self.layout_library[layout_index]
+            assert n_targs not in self.hold_outs,\
+                "Layout {} has a held out n_targs".format(layout_index)
+            self.controller.next_layout = (ppb_cols, targ_coords)
+        # the controller returns a copy of the grid so it is used as
+        # the observation rather than copying the grid a second time
+        self.last_obs = self.controller.reset(
+            n_targs=n_targs,
+            held_out=held_out
+        )
         self.reset_max_steps(max_steps)
         self.is_grabbing = False
         self.step_count = 0
+        if not fast_forward: return self.last_obs, {}
+
+        frames, records = self.controller.fast_forward(
+            n_lead=1, max_frames=self.max_steps-1
+        )
+        frames[0] = self.last_obs
+        if len(frames) > 1:
+            self.step_count = len(frames)-1
+            self.last_obs = frames[-1]
+            # the player stays still and does not grab
+            register = self.controller.register
+            keys = self.info_keys
+            if "grab" in keys: records["grab"][1:] = 0
+            if "player_loc" in keys:
+                records["player_loc"][1:] = register.player.coord
+            if "count_loc" in keys:
+                records["count_loc"][1:] = register.pile.coord
+            if "end_loc" in keys:
+                records["end_loc"][1:] = register.button.coord
+        return frames, records
+
+    def get_state(self):
+        """
+        Captures the minimal state of the environment so that episodes
+        can be branched. Much cheaper than deepcopying the environment
+        as the viewer, event handlers and grid are not included.
+
+        Returns:
+            state: dict
+        """
+        return {
+            "controller": self.controller.get_state(),
+            "step_count": self.step_count,
+            "max_steps": self.max_steps,
+            "is_grabbing": self.is_grabbing,
+            "rand": self.rand.bit_generator.state,
+            "oracle_rand": self.oracle_rand.bit_generator.state,
+        }
+
+    def set_state(self, state):
+        """
+        Restores the environment to a state produced by get_state. The
+        restored environment produces the same future as the
+        environment from which the state was captured.
+
+        Args:
+            state: dict
+                a state returned by get_state
+        Returns:
+            last_obs: ndarray
+                the observation of the restored state
+        """
+        self.rand.bit_generator.state = state["rand"]
+        self.oracle_rand.bit_generator.state = state["oracle_rand"]
+        self.controller.set_state(state["controller"])
+        self.step_count = state["step_count"]
+        self.max_steps = state["max_steps"]
+        self.is_grabbing = state["is_grabbing"]
         self.last_obs = self.controller.grid.grid
-        return self.last_obs, {}
+        return self.last_obs
+
+    def encode_state(self):
+        """
+        Creates a compact, canonical byte encoding of the state of the
+        environment. Useful as a key for transposition tables, for
+        deduplicating layouts, and for caching rendered frames. The
+        encoding is tens of bytes whereas an observation is often
+        hundreds of kilobytes.
+
+        The encoding is the controller encoding (see
+        Controller.encode_state) followed by the little-endian
+        (is_grabbing, step_count) as (uint8, uint32). The random
+        number generator is not included.
+
+        Returns:
+            encoding: bytes
+        """
+        return self.controller.encode_state() + struct.pack(
+            "<BI", int(self.is_grabbing), self.step_count
+        )
+
+    def state_hash(self):
+        """
+        Returns a 64 bit hash of encode_state. Unlike python's builtin
+        hash, the value is stable across processes and library versions.
+
+        Returns:
+            hash: int
+        """
+        return hash_state(self.encode_state())
+
+    def enable_event_log(self, capacity=4096):
+        """
+        Starts recording game events. See Register.enable_event_log.
+        The log persists across resets but not across calls to
+        set_controller.
+
+        Args:
+            capacity: int
+                the maximum number of records held before the oldest
+                records are overwritten
+        Returns:
+            event_log: EventLog
+        """
+        return self.controller.register.enable_event_log(capacity)
+
+    def drain_events(self):
+        """
+        Removes and returns all recorded events. See
+        Register.drain_events.
+
+        Returns:
+            records: ndarray (N, len(LOG_FIELDS)) int32
+        """
+        return self.controller.register.drain_events()
 
     def render(self, mode='human', close=False, frame_speed=.1):
         if self.viewer is None:
@@ -320,12 +694,63 @@ class GordonGame(gym.Env):
             plt.pause(frame_speed)
         self.fig.canvas.draw()
 
-    def seed(self, x):
-        self.rand = np.random.default_rng(x)
+    def seed(self, x=None):
+        """
+        Seeds every random draw of the environment. The generators of
+        the environment form a tree derived from a single SeedSequence.
+        The games draw their layouts, target counts and timings from
+        self.rand, which is made from the root of the tree. The oracles
+        in ai.py draw from self.oracle_rand, a child of the root, so
+        that using an oracle does not change the episodes. Use spawn to
+        seed the environments of other processes.
 
-    def set_seed(self, x):
+        Args:
+            x: None or int or sequence of ints or SeedSequence
+                None seeds from fresh entropy from the OS
+        Returns:
+            entropy: list of int
+                the entropy of the root SeedSequence. Seeding with it
+                reproduces the environment.
+        """
+        if not isinstance(x, np.random.SeedSequence):
+            x = np.random.SeedSequence(x)
+        self.seed_seq = x
+        # a generator made from the root is the same as
+        # np.random.default_rng(x) for integer seeds
         self.rand = np.random.default_rng(x)
-        pass
+        self.oracle_rand = np.random.default_rng(x.spawn(1)[0])
+        if hasattr(self, "controller"): self.share_rands()
+        return [x.entropy]
+
+    def set_seed(self, x=None):
+        return self.seed(x)
+
+    def spawn(self, n_children: int):
+        """
+        Creates independent SeedSequences for seeding the environments
+        of worker processes, i.e. env.seed(child). The children never
+        share streams with this environment or with each other, and
+        repeated calls make new children.
+
+            seqs = env.spawn(n_workers)
+            # in worker i
+            worker_env.seed(seqs[i])
+
+        Args:
+            n_children: int
+        Returns:
+            children: list of SeedSequence
+        """
+        return self.seed_seq.spawn(n_children)
+
+    def share_rands(self):
+        """
+        Hands the environment's generators to the controller and the
+        register.
+        """
+        self.controller.rand = self.rand
+        self.controller.register.rand = self.rand
+        self.controller.register.oracle_rand = self.oracle_rand
 
 class EvenLineMatch(GordonGame):
     """
@@ -458,104 +883,72 @@ class NavigationTask(GordonGame):
         self.controller_type = NavigationTaskController
         super().set_controller()
 
-    def step(self, action):
+    def update_info(self, info, grab, done, grabbed):
         """
+        The end of the episode counts as a grab. See
+        GordonGame.update_info.
+
         Args:
-            action: int
-                the action should be an int of either a direction or
-                a grab command
-                    0: null action
-                    1: move up one unit
-                    2: move right one unit
-                    3: move down one unit
-                    4: move left one unit
-                    5: grab/drop object
-        Returns:
-            last_obs: ndarray
-                the observation
-            rew: float
-                the reward
+            info: LazyInfo
+            grab: int [0,1]
             done: bool
-                if true, the episode has ended
-            info: dict
-                whatever information the game contains
+            grabbed: int
         """
-        self.last_obs, rew, done, info = super().step(action)
-        info["grab"] = done or info["grab"]
-        info["player_loc"] = self.controller.register.player.coord
-        info["count_loc"] = self.controller.register.pile.coord
-        info["end_loc"] = self.controller.register.button.coord
-        return self.last_obs, rew, done, info
+        super().update_info(info, grab, done, grabbed)
+        if done and "grab" in self.info_keys: info["grab"] = True
 
 class CanTask(GordonGame):
     """
     This is an abstract class to unify some code between NutsInCan
     varieties.
     """
-    def step(self, action):
+    def get_controls(self, action):
         """
+        Converts the action into the controls of the controller. Grabs
+        are handled by the env. Grabbing the pile places a new item
+        along a row and grabbing the button presses it. Grabs are
+        ignored during the initial animation.
+
         Args:
             action: int
                 the action should be an int of either a direction or
-                a grab command
-                    0: null action
-                    1: move up one unit
-                    2: move right one unit
-                    3: move down one unit
-                    4: move left one unit
-                    5: grab/drop object
+                a grab command. See step.
         Returns:
-            last_obs: ndarray
-                the observation
-            rew: float
-                the reward
-            done: bool
-                if true, the episode has ended
-            info: dict
-                whatever information the game contains
+            direction: int
+            grab: int [0,1]
+            grabbed: int
+                see GordonGame.get_controls
         """
-        self.step_count += 1
-
-        direction = STAY
-        grab = 0
-        if action < 5:
-            direction = action
-            grab = 0 # We always handle grabs here
-        elif not self.controller.is_animating:
-            coord = self.controller.register.player.coord
-            if not self.controller.register.is_empty(coord):
-                grab = 1
-
+        if action < 5: return action, 0, 0
+        controller = self.controller
+        if controller.is_animating: return STAY, 0, 0
+        reg = controller.register
+        player = reg.player
         # Check if player grabbed the pile
-        grabbed_type = self.get_other_obj_idx(
-            self.controller.register.player,
-            grab
-        )
+        grabbed = get_grab_priority(reg.coord_register[player.coord], player)
         # Other option is if it's an item, but this will only happen
         # when the agent grabs one that has been placed by the env.
-        if grabbed_type == TYPE2PRIORITY[PILE]:
+        if grabbed == TYPE2PRIORITY[PILE]:
             self.place_item()
-            direction = STAY
-            grab = 0
-        elif grabbed_type == TYPE2PRIORITY[BUTTON]:
-            direction = STAY
-            grab = 1
-
-        self.last_obs,rew,done,info = self.controller.step(
-            direction,
-            grab
-        )
-        player = self.controller.register.player
-        if self.step_count > self.max_steps: done = True
-        elif self.step_count == self.max_steps and rew == 0:
-            rew = self.controller.max_punishment
-            done = True
-        info["grab"] = done or grab or grabbed_type==TYPE2PRIORITY[PILE]
-        info["player_loc"] = self.controller.register.player.coord
-        info["count_loc"] = self.controller.register.pile.coord
-        info["end_loc"] = self.controller.register.button.coord
-        if grabbed_type==TYPE2PRIORITY[PILE]: info["n_items"] -= 1
-        return self.last_obs, rew, done, info
+            return STAY, 0, grabbed
+        return STAY, int(grabbed != 0), grabbed
+
+    def update_info(self, info, grab, done, grabbed):
+        """
+        See GordonGame.update_info. Items placed by a pile grab are not
+        counted until the next step.
+
+        Args:
+            info: LazyInfo
+            grab: int [0,1]
+            done: bool
+            grabbed: int
+        """
+        is_pile = grabbed == TYPE2PRIORITY[PILE]
+        if "grab" in self.info_keys:
+            info["grab"] = done or grab or is_pile
+        self.set_loc_info(info)
+        if is_pile and "n_items" in info: info["n_items"] -= 1
 
     def place_item(self):
         """
@@ -572,10 +965,18 @@ class CanTask(GordonGame):
             )
             row += 1
         if coord is None: return
-        self.controller.register.make_object(
+        register = self.controller.register
+        register.make_object(
             obj_type=ITEM,
             coord=coord
         )
+        if register.event_log is not None:
+            register.event_log.record(
+                LOG_PILE_GRAB,
+                TYPE2PRIORITY[ITEM],
+                register.flat_index(register.pile.coord),
+                register.flat_index(coord)
+            )
 
 class NutsInCan(CanTask):
     """
@@ -673,95 +1074,11 @@ class StaticVisNuts(CanTask):
         self.controller_type = StaticVisNutsController
         super().set_controller()
 
-class GiveN(GordonGame):
+class GiveN(CanTask):
     """
     An abstract class to unify code for the visible and invisible give
     n task variants.
     """
-    def step(self, action):
-        """
-        Args:
-            action: int
-                the action should be an int of either a direction or
-                a grab command
-                    0: null action
-                    1: move up one unit
-                    2: move right one unit
-                    3: move down one unit
-                    4: move left one unit
-                    5: grab/drop object
-        Returns:
-            last_obs: ndarray
-                the observation
-            rew: float
-                the reward
-            done: bool
-                if true, the episode has ended
-            info: dict
-                whatever information the game contains
-        """
-        self.step_count += 1
-
-        direction = STAY
-        grab = 0
-        if action < 5:
-            direction = action
-            grab = 0 # We always handle grabs here
-        elif not self.controller.is_animating:
-            coord = self.controller.register.player.coord
-            if not self.controller.register.is_empty(coord):
-                grab = 1
-
-        # Check if player grabbed the pile
-        grabbed_type = self.get_other_obj_idx(
-            self.controller.register.player,
-            grab
-        )
-        # Other option is if it's an item, but this will only happen
-        # when the agent grabs one that has been placed by the env.
-        if grabbed_type == TYPE2PRIORITY[PILE]:
-            self.place_item()
-            direction = STAY
-            grab = 0
-        elif grabbed_type == TYPE2PRIORITY[BUTTON]:
-            direction = STAY
-            grab = 1
-
-        self.last_obs,rew,done,info = self.controller.step(
-            direction,
-            grab
-        )
-        player = self.controller.register.player
-        if self.step_count > self.max_steps: done = True
-        elif self.step_count == self.max_steps and rew == 0:
-            rew = self.controller.max_punishment
-            done = True
-        info["grab"] = done or grab or grabbed_type==TYPE2PRIORITY[PILE]
-        info["player_loc"] = self.controller.register.player.coord
-        info["count_loc"] = self.controller.register.pile.coord
-        info["end_loc"] = self.controller.register.button.coord
-        if grabbed_type==TYPE2PRIORITY[PILE]: info["n_items"] -= 1
-        return self.last_obs, rew, done, info
-
-    def place_item(self):
-        """
-        Creates and places an item along a row.
-        """
-        player = self.controller.register.player
-        middle = self.controller.register.grid.middle_row
-        row = 2
-        coord = None
-        while row < middle and coord is None:
-            coord = find_empty_space_along_row(
-                self.controller.register,
-                (row, player.coord[1])
-            )
-            row += 1
-        if coord is None: return
-        self.controller.register.make_object(
-            obj_type=ITEM,
-            coord=coord
-        )
 
 class InvisN(GiveN):
     """
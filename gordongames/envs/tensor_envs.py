@@ -0,0 +1,1294 @@
+"""
+The tensor engine steps N games at once by representing the state of
+all of the games as integer arrays rather than as GameObjects. Cells
+are referred to by their flat index row*n_cols+col (see Topology).
+Each step applies the rules of GordonGame.step, Controller.step and
+Register.step to every game with a fixed number of NumPy operations,
+so the cost of a step barely depends on the number of games.
+
+The trajectories of the tensor games are identical to those of the
+object based games when started from the same layout and timing
+schedule, including the info records of the selected info keys.
+"""
+import math
+import numpy as np
+from gordongames.envs.ggames.constants import GRAB, STAY, ITEM, TARG, PLAYER, PILE, BUTTON, SIGNAL, COLORS, DIRECTIONS, TYPE2PRIORITY
+from gordongames.envs.ggames.controllers import EvenLineMatchController, ClusterMatchController, NutsInCanController, VisNutsController, StaticVisNutsController, InvisNController, VisNController
+from gordongames.envs.ggames.info import get_info_keys, make_info_records
+
+"""
+The search orders of find_space for every cell of a topology.
+    keys: tuple (grid_size, divide, min_play_area, playable_half)
+    vals: ndarray (H*W, L) int64
+"""
+SEARCH_ORDERS = dict()
+
+def get_search_order(topology, playable_half=True):
+    """
+    Tabulates the order in which Register.find_space visits the cells
+    around each cell. Row i holds the flat indices that find_space
+    tests when searching from cell i, restricted to the cells that it
+    accepts (playable cells if playable_half is true, target area
+    cells otherwise). Rows are padded with H*W which can be used as an
+    always occupied cell.
+
+    Args:
+        topology: Topology
+        playable_half: bool
+            see Register.find_space
+    Returns:
+        order: ndarray (H*W, L) int64
+    """
+    n_rows, n_cols = topology.shape
+    key = (
+        topology.shape,
+        topology.middle_row,
+        bool(topology.targ_area.all()),
+        bool(playable_half)
+    )
+    if key in SEARCH_ORDERS: return SEARCH_ORDERS[key]
+    area = topology.playable if playable_half else topology.targ_area
+    n_cells = n_rows*n_cols
+    orders = []
+    for row,col in topology.coords:
+        order = []
+        def test_loc(loc):
+            r,c = loc
+            if 0 <= r < n_rows and 0 <= c < n_cols and area[r*n_cols+c]:
+                order.append(r*n_cols+c)
+        # mirrors the loops of Register.find_space
+        for layer in range(1, max(n_rows, n_cols)+1):
+            min_row, min_col = row-layer, col-layer
+            max_row, max_col = row+layer, col+layer
+            for i in range(max_col-min_col+1):
+                test_loc((min_row, min_col+i))
+                test_loc((max_row, min_col+i))
+            for i in range(1,max_row-min_row):
+                test_loc((min_row+i, min_col))
+                test_loc((min_row+i, max_col))
+        orders.append(order)
+    width = max(1, max(len(o) for o in orders))
+    table = np.full((n_cells, width), n_cells, dtype=np.int64)
+    for i,order in enumerate(orders):
+        table[i,:len(order)] = order
+    table.flags.writeable = False
+    SEARCH_ORDERS[key] = table
+    return table
+
+"""
+The colors of every combination of objects that can share a cell. The
+index is a cell code, see TensorGordonGame.get_cell_codes. The colors
+are summed with fsum exactly as in Register.draw_register.
+"""
+MAX_CELL_ITEMS = 3
+CELL_CODE_FIELDS = (
+    (ITEM, MAX_CELL_ITEMS+1),
+    (TARG, 2),
+    (SIGNAL, 2),
+    (PLAYER, 2),
+    (PILE, 2),
+    (BUTTON, 2),
+)
+CELL_COLORS = np.zeros(
+    np.prod([n for _,n in CELL_CODE_FIELDS]),
+    dtype=float
+)
+for code in range(len(CELL_COLORS)):
+    colors = []
+    rem = code
+    for obj_type, n in reversed(CELL_CODE_FIELDS):
+        colors += [COLORS[obj_type]]*(rem % n)
+        rem //= n
+    CELL_COLORS[code] = math.fsum(colors)
+CELL_COLORS.flags.writeable = False
+
+def get_row_order(topology):
+    """
+    Tabulates the order in which CanTask.place_item visits the cells
+    when the player is in each column. The rows from 2 up to the
+    divider are searched in order and each row is searched outward
+    from the column of the player, see find_empty_space_along_row.
+    Rows are padded with H*W which can be used as an always occupied
+    cell.
+
+    Args:
+        topology: Topology
+    Returns:
+        order: ndarray (W, L) int64
+    """
+    n_rows, n_cols = topology.shape
+    n_cells = n_rows*n_cols
+    rows = range(2, min(math.ceil(topology.middle_row), n_rows))
+    orders = []
+    for col in range(n_cols):
+        cols = [col]
+        for half in range(1, n_cols):
+            cols += [c for c in (col+half, col-half) if 0 <= c < n_cols]
+        orders.append([r*n_cols+c for r in rows for c in cols])
+    width = max(1, max(len(o) for o in orders))
+    table = np.full((n_cols, width), n_cells, dtype=np.int64)
+    for i,order in enumerate(orders):
+        table[i,:len(order)] = order
+    table.flags.writeable = False
+    return table
+
+def sample_timing_schedules(n_flashes, timing_p=1, rand=None):
+    """
+    Batched sample_timing_schedule. The schedules of all of the games
+    are sampled with a fixed number of draws from rand rather than
+    one game at a time.
+
+    Args:
+        n_flashes: ndarray (K,) int
+            the number of flashes of each game
+        timing_p: float between 0 and 1
+            the probability of displaying the next target on any
+            given step after the first
+        rand: None or random number generator
+            if None, uses np.random instead
+    Returns:
+        schedules: ndarray (K, T) int8
+            the skipped flag of each step in the animation of each
+            game. The rows are padded with zeros.
+    """
+    n_flashes = np.asarray(n_flashes, dtype=np.int64)
+    width = max(int(n_flashes.max(initial=0)), 0) + 1
+    # the number of displayed steps after the first
+    n_needed = np.where(n_flashes > 1, n_flashes-1, 0)
+    if timing_p >= 1 or not n_needed.any():
+        return np.zeros((len(n_flashes), width), dtype=np.int8)
+    if rand is None: rand = np.random
+    K = len(n_flashes)
+    size = int(np.ceil(2*n_needed.max()/max(timing_p, 0.01)))
+    draws = (rand.random((K,size)) >= timing_p).astype(np.int8)
+    shown = np.cumsum(draws==0, axis=1)
+    while (shown[:,-1] < n_needed).any():
+        more = (rand.random((K,size)) >= timing_p).astype(np.int8)
+        draws = np.concatenate([draws, more], axis=1)
+        shown = np.cumsum(draws==0, axis=1)
+    # the draw of the last needed displayed step of each game
+    last = np.argmax(shown >= n_needed[:,None], axis=1)
+    keep = np.arange(draws.shape[1]) <= last[:,None]
+    keep &= n_needed[:,None] > 0
+    schedules = np.zeros((K, draws.shape[1]+2), dtype=np.int8)
+    schedules[:,1:-1] = draws*keep
+    width = max(width, int(np.where(n_needed > 0, last+3, 0).max()))
+    return schedules[:,:width]
+
+class TensorGordonGame:
+    """
+    The base class of the tensor games. Subclasses set controller_type
+    and implement calculate_rewards. Like GordonGame and Controller,
+    games with different controls override get_controls and
+    update_infos and games with a different initial animation
+    override reset_animation, animate and end_animation.
+
+    The state of game n is held in the following members:
+
+        player: ndarray (N,) int64
+            the flat index of the player
+        pile: ndarray (N,) int64
+            the flat index of the pile (dispenser)
+        button: ndarray (N,) int64
+            the flat index of the ending button
+        items: ndarray (N, H*W) int8
+            the number of items on each cell
+        targs: ndarray (N, H*W) int8
+            the number of targets on each cell
+        hidden: ndarray (N, H*W) bool
+            the cells whose targets are not lit, i.e. targets with the
+            DEFAULT color
+        signals: ndarray (N, H*W) int8
+            the number of signals on each cell
+        flash_cells: ndarray (N, max_targs) int64
+            the flat index of each target in the order of its layout,
+            which is the order in which the targets are flashed
+        n_targs: ndarray (N,) int64
+        is_grabbing: ndarray (N,) bool
+            the grab state of the player. See GordonGame._toggle_grab
+        is_animating: ndarray (N,) bool
+        display_targs: ndarray (N,) bool
+        n_steps: ndarray (N,) int64
+            the controller's step count
+        step_count: ndarray (N,) int64
+            the env's step count
+        max_steps: ndarray (N,) int64
+        skipped: ndarray (N,) int8
+        prev_skipped: ndarray (N,) int8
+        anim_step: ndarray (N,) int64
+            the index of the current step in the timing schedule
+        n_popped: ndarray (N,) int64
+            the number of targets that have been flashed
+        schedules: ndarray (N, T) int8
+            the timing schedule of each game padded with zeros. See
+            sample_timing_schedules
+        drawn_codes: ndarray (N, H*W) int64
+            the cell codes that are currently drawn in obs. -1 marks
+            cells that have not been drawn. See get_cell_codes
+
+    Step outputs are written into the preallocated obs, final_obs,
+    rews and dones buffers as in VectorGordonGame. Only the cells
+    whose objects changed since the last render are redrawn, see
+    drawn_codes and render, so obs must not be written to by the
+    caller. If any info keys
+    are selected, the infos of each step are written into the infos
+    records. See INFO_DTYPE.
+    """
+    controller_type = None
+
+    def __init__(self,
+                 num_envs,
+                 targ_range=(1,10),
+                 grid_size=(31,31),
+                 pixel_density=5,
+                 harsh=True,
+                 max_steps=None,
+                 hold_outs=set(),
+                 rand_pdb=True,
+                 sym_distr=True,
+                 player_on_pile=True,
+                 rand_timing=False,
+                 timing_p=0.8,
+                 spacing_limit=None,
+                 zipf_exponent=None,
+                 min_play_area=False,
+                 n_held_outs=0,
+                 center_signal=True,
+                 info_keys=None,
+                 n_layouts=1024,
+                 seed=None,
+                 auto_reset=True,
+                 **kwargs):
+        """
+        The game arguments are the same as those of GordonGame.
+
+        Args:
+            num_envs: int
+                the number of games
+            info_keys: sequence of str or None
+                the info keys that are written to the info records on
+                each step. None selects all keys. If no keys are
+                selected, no infos are computed and steps return an
+                empty dict.
+            n_layouts: int
+                the number of layouts that are generated at once. See
+                LayoutBuffer.
+            seed: None or int or SeedSequence
+                the seed of the layouts and timing schedules
+            auto_reset: bool
+                if true, games that finish are reset within the step
+            kwargs: game arguments that do not affect these games are
+                ignored
+        """
+        assert num_envs > 0
+        if type(targ_range) == int: targ_range = (targ_range,targ_range)
+        if hold_outs is None: hold_outs = set()
+        self.num_envs = num_envs
+        self.targ_range = targ_range
+        self.grid_size = grid_size
+        self.harsh = harsh
+        self.master_max_steps = max_steps
+        self.rand_timing = rand_timing
+        self.timing_p = timing_p
+        self.center_signal = center_signal
+        self.info_keys = get_info_keys(info_keys)
+        self.n_layouts = n_layouts
+        self.auto_reset = auto_reset
+        # the object based controller supplies the grid configuration,
+        # held out coordinates and layout generator
+        self.controller = self.controller_type(
+            grid_size=grid_size,
+            pixel_density=pixel_density,
+            harsh=harsh,
+            targ_range=targ_range,
+            zipf_exponent=zipf_exponent,
+            hold_outs=set(hold_outs),
+            rand_pdb=rand_pdb,
+            sym_distr=sym_distr,
+            player_on_pile=player_on_pile,
+            spacing_limit=spacing_limit,
+            min_play_area=min_play_area,
+            n_held_outs=0 if n_held_outs is None else n_held_outs,
+            center_signal=center_signal,
+            info_keys=(),
+        )
+        self.layouts = self.controller.make_layout_buffer(n_layouts)
+        self.max_punishment = self.controller.max_punishment
+        self.max_step_base = grid_size[0]//2*grid_size[1]*2
+
+        grid = self.controller.grid
+        topology = grid.topology
+        self.topology = topology
+        self.shape = tuple(grid.shape)
+        self.n_cells = self.shape[0]*self.shape[1]
+        self.neighbors = topology.neighbors.astype(np.int64)
+        self.playable_order = get_search_order(topology, True)
+        self.targ_area_order = get_search_order(topology, False)
+        self.signal_cell = int(3*self.shape[0]/4)*self.shape[1]
+        self.signal_cell += self.shape[1]//2
+        # the grid without any objects. Objects are drawn to the
+        # upper left density-1 pixels of each cell, the rest of the
+        # cell keeps its background.
+        grid.clear(remove_divider=False)
+        self.density = grid.density
+        self.draw_space = max(1, self.density-1)
+        pixels = grid._grid.reshape(
+            self.shape[0], self.density, self.shape[1], self.density
+        )
+        self.background = pixels[:,0,:,0].reshape(-1).copy()
+        pixel_shape = grid.pixel_shape
+
+        N, C = num_envs, self.n_cells
+        self.player = np.zeros(N, dtype=np.int64)
+        self.pile = np.zeros(N, dtype=np.int64)
+        self.button = np.zeros(N, dtype=np.int64)
+        self.items = np.zeros((N,C), dtype=np.int8)
+        self.targs = np.zeros((N,C), dtype=np.int8)
+        self.hidden = np.zeros((N,C), dtype=bool)
+        self.signals = np.zeros((N,C), dtype=np.int8)
+        self.flash_cells = np.zeros((N,max(targ_range[1],1)), dtype=np.int64)
+        self.n_targs = np.zeros(N, dtype=np.int64)
+        self.is_grabbing = np.zeros(N, dtype=bool)
+        self.is_animating = np.zeros(N, dtype=bool)
+        self.display_targs = np.ones(N, dtype=bool)
+        self.n_steps = np.zeros(N, dtype=np.int64)
+        self.step_count = np.zeros(N, dtype=np.int64)
+        self.max_steps = np.zeros(N, dtype=np.int64)
+        self.skipped = np.zeros(N, dtype=np.int8)
+        self.prev_skipped = np.zeros(N, dtype=np.int8)
+        self.anim_step = np.zeros(N, dtype=np.int64)
+        self.n_popped = np.zeros(N, dtype=np.int64)
+        self.schedules = np.zeros((N,2), dtype=np.int8)
+        self.arange = np.arange(N)
+
+        self.obs = np.zeros((N, *pixel_shape), dtype=grid._grid.dtype)
+        self.obs[:] = grid._grid
+        self.drawn_codes = np.full((N,C), -1, dtype=np.int64)
+        self.final_obs = self.obs.copy()
+        self.rews = np.zeros(N, dtype=float)
+        self.dones = np.zeros(N, dtype=bool)
+        self.infos = make_info_records(N)
+        self.seed(seed)
+
+    def seed(self, x=None):
+        """
+        Seeds the layouts and timing schedules of the games.
+
+        Args:
+            x: None or int or sequence of ints or SeedSequence
+                None seeds from fresh entropy from the OS
+        Returns:
+            entropy: list of int
+                the entropy of the root SeedSequence
+        """
+        if not isinstance(x, np.random.SeedSequence):
+            x = np.random.SeedSequence(x)
+        self.seed_seq = x
+        self.rand = np.random.default_rng(x)
+        self.layouts.clear()
+        return [x.entropy]
+
+    def get_infos(self):
+        """
+        Returns:
+            infos: ndarray (N,) INFO_DTYPE or dict
+                the info records if any info keys are selected.
+                Otherwise an empty dict.
+        """
+        if self.info_keys: return self.infos
+        return dict()
+
+    def reset(self, seed=None):
+        """
+        Resets all of the games.
+
+        Args:
+            seed: None or int or SeedSequence
+                if not None, the games are reseeded before the reset
+        Returns:
+            obs: ndarray (N, H, W) float
+            infos: ndarray (N,) INFO_DTYPE or dict
+                zeroed records as reset does not produce an info. See
+                get_infos
+        """
+        if seed is not None: self.seed(seed)
+        self.reset_at(self.arange)
+        self.rews[:] = 0
+        self.infos[:] = 0
+        return self.obs, self.get_infos()
+
+    def pop_layouts(self, n):
+        """
+        Takes the next n layouts from the layout buffer.
+
+        Args:
+            n: int
+        Returns:
+            n_targs: ndarray (n,) int64
+            ppb_cols: ndarray (n, 3) int64
+            targ_coords: ndarray (n, max_targs, 2) int64
+        """
+        buf = self.layouts
+        if buf.rand is not self.rand or len(buf) < n:
+            buf.fill(self.rand, max(self.n_layouts, n))
+        i = buf.idx
+        buf.idx += n
+        return (
+            buf.n_targs[i:i+n],
+            buf.ppb_cols[i:i+n],
+            buf.targ_coords[i:i+n],
+        )
+
+    def reset_at(self, idxs, layouts=None):
+        """
+        Resets the argued games.
+
+        Args:
+            idxs: int or ndarray of ints or bool mask (N,)
+                the games to reset
+            layouts: None or tuple (n_targs, ppb_cols, targ_coords)
+                the layouts of the games as returned by pop_layouts.
+                If None, the layouts are popped from the buffer.
+        Returns:
+            obs: ndarray (N, H, W) float
+        """
+        idxs = self.arange[idxs].reshape(-1)
+        if len(idxs) == 0: return self.obs
+        if layouts is None: layouts = self.pop_layouts(len(idxs))
+        n_targs, ppb_cols, targ_coords = layouts
+        n_targs = np.asarray(n_targs, dtype=np.int64)
+        ppb_cols = np.asarray(ppb_cols, dtype=np.int64)
+        self.n_targs[idxs] = n_targs
+        self.player[idxs] = ppb_cols[:,0]
+        self.pile[idxs] = ppb_cols[:,1]
+        self.button[idxs] = ppb_cols[:,2]
+        self.items[idxs] = 0
+        self.targs[idxs] = 0
+        self.hidden[idxs] = False
+        self.signals[idxs] = 0
+        self.flash_cells[idxs] = 0
+        targ_coords = np.asarray(targ_coords, dtype=np.int64)
+        if targ_coords.size > 0:
+            cells = targ_coords[...,0]*self.shape[1] + targ_coords[...,1]
+            assert cells.shape[1] <= self.flash_cells.shape[1]
+            used = np.arange(cells.shape[1]) < n_targs[:,None]
+            rows = np.broadcast_to(idxs[:,None], cells.shape)
+            self.targs[rows[used], cells[used]] = 1
+            self.flash_cells[idxs, :cells.shape[1]] = cells
+        self.is_grabbing[idxs] = False
+        self.is_animating[idxs] = True
+        self.display_targs[idxs] = True
+        self.n_steps[idxs] = 0
+        self.step_count[idxs] = 0
+        self.skipped[idxs] = 0
+        self.prev_skipped[idxs] = 0
+        self.anim_step[idxs] = 0
+        self.n_popped[idxs] = 0
+        self.reset_animation(idxs)
+        if self.master_max_steps is None or self.master_max_steps<=0:
+            self.max_steps[idxs] = (n_targs+1)*self.max_step_base
+        else: self.max_steps[idxs] = self.master_max_steps
+        self.dones[idxs] = False
+        self.render(idxs)
+        return self.obs
+
+    def reset_animation(self, idxs):
+        """
+        Prepares the initial animation of the argued games. Called by
+        reset_at after the layouts are placed. The default animation
+        needs no preparation.
+
+        Args:
+            idxs: ndarray (K,) int64
+        """
+        pass
+
+    def set_schedules(self, idxs, schedules):
+        """
+        Stores the timing schedules of the argued games, widening the
+        schedules member if needed.
+
+        Args:
+            idxs: ndarray (K,) int64
+            schedules: ndarray (K, T) int8
+        """
+        width = schedules.shape[1]
+        if width > self.schedules.shape[1]:
+            pad = width - self.schedules.shape[1]
+            self.schedules = np.pad(self.schedules, ((0,0),(0,pad)))
+        self.schedules[idxs] = 0
+        self.schedules[idxs,:width] = schedules
+
+    def get_layouts(self, idxs):
+        """
+        Finds the current layout of each of the argued games in the
+        form of GordonGame's layouts, i.e. to start an object based
+        game from the same layout with controller.next_layout. Only
+        valid before the first step of the games.
+
+        Args:
+            idxs: sequence of ints
+        Returns:
+            layouts: list of tuples (ppb_cols, targ_coords)
+        """
+        n_cols = self.shape[1]
+        layouts = []
+        for i in idxs:
+            cells = np.repeat(
+                np.arange(self.n_cells), self.targs[i].astype(np.int64)
+            )
+            layouts.append((
+                [
+                    int(self.player[i]%n_cols),
+                    int(self.pile[i]%n_cols),
+                    int(self.button[i]%n_cols),
+                ],
+                [(int(c//n_cols), int(c%n_cols)) for c in cells],
+            ))
+        return layouts
+
+    def get_flash_coords(self, idx):
+        """
+        Finds the coordinates of the targets of a game in the order in
+        which they are flashed.
+
+        Args:
+            idx: int
+        Returns:
+            coords: list of tuples (row, col)
+        """
+        n_cols = self.shape[1]
+        cells = self.flash_cells[idx,:self.n_targs[idx]]
+        return [(int(c//n_cols), int(c%n_cols)) for c in cells]
+
+    def get_occupied(self, rows):
+        """
+        Counts the objects other than the player on every cell of the
+        argued games, see Register.is_empty. An extra, always occupied
+        cell is appended for the padding of the search orders.
+
+        Args:
+            rows: ndarray (K,) int64
+                the game indices
+        Returns:
+            occupied: ndarray (K, H*W+1) bool
+        """
+        C = self.n_cells
+        occupied = np.ones((len(rows), C+1), dtype=bool)
+        occupied[:,:C] = self.items[rows] != 0
+        occupied[:,:C] |= self.targs[rows] != 0
+        occupied[:,:C] |= self.signals[rows] != 0
+        k = np.arange(len(rows))
+        occupied[k, self.pile[rows]] = True
+        occupied[k, self.button[rows]] = True
+        return occupied
+
+    def get_grab_priorities(self, cells):
+        """
+        Vectorized get_grab_priority. Finds the TYPE2PRIORITY value of
+        the highest priority object other than the player on the
+        argued cell of each game.
+
+        Args:
+            cells: ndarray (N,) int64
+                the flat index of the cell of each game
+        Returns:
+            priorities: ndarray (N,) int8
+                0 if there are no other objects
+        """
+        arange = self.arange
+        priorities = np.zeros(self.num_envs, dtype=np.int8)
+        priorities[self.signals[arange, cells] > 0] = TYPE2PRIORITY[SIGNAL]
+        priorities[self.targs[arange, cells] > 0] = TYPE2PRIORITY[TARG]
+        priorities[self.items[arange, cells] > 0] = TYPE2PRIORITY[ITEM]
+        priorities[self.button == cells] = TYPE2PRIORITY[BUTTON]
+        priorities[self.pile == cells] = TYPE2PRIORITY[PILE]
+        return priorities
+
+    def find_space(self, rows, cells, playable_half=True):
+        """
+        Vectorized Register.find_space.
+
+        Args:
+            rows: ndarray (K,) int64
+                the game indices
+            cells: ndarray (K,) int64
+                the flat index that each search starts from
+            playable_half: bool
+                see Register.find_space
+        Returns:
+            free: ndarray (K,) int64
+                the nearest empty cell of each game. -1 if the game
+                has no empty cell.
+        """
+        order = self.playable_order if playable_half else\
+                self.targ_area_order
+        order = order[cells]
+        occupied = self.get_occupied(rows)
+        k = np.arange(len(rows))[:,None]
+        empty = ~occupied[k, order]
+        first = np.argmax(empty, axis=1)
+        free = order[k[:,0], first]
+        free[~empty[k[:,0], first]] = -1
+        return free
+
+    def count_aligned(self):
+        """
+        Vectorized count_aligned_coords with a min_row of 0.
+
+        Returns:
+            n_aligned: ndarray (N,) int64
+        """
+        H, W = self.shape
+        items = self.items.reshape(-1, H, W)
+        max_row = items.sum(-1, dtype=np.int64).argmax(-1)
+        targ_cols = (self.targs.reshape(-1, H, W) > 0).any(1)
+        aligned = (items[self.arange, max_row] > 0) & targ_cols
+        return aligned.sum(-1)
+
+    def get_controls(self, actions):
+        """
+        Vectorized GordonGame.get_controls. The grab action toggles the
+        grab state of the player.
+
+        Args:
+            actions: ndarray (N,) int64
+        Returns:
+            directions: ndarray (N,) int64
+            grab: ndarray (N,) bool
+            grabbed: ndarray (N,) int8
+                see GordonGame.get_controls
+        """
+        is_grab = actions == GRAB
+        directions = np.where(is_grab, STAY, actions) % len(DIRECTIONS)
+        occupied = self.get_grab_priorities(self.player) != 0
+        grab = np.where(is_grab, ~self.is_grabbing, self.is_grabbing)
+        self.is_grabbing = np.where(
+            is_grab, ~self.is_grabbing & occupied, self.is_grabbing
+        )
+        return directions, grab, np.zeros(self.num_envs, dtype=np.int8)
+
+    def make_infos(self):
+        """
+        Vectorized Controller.make_info. Writes the selected keys that
+        describe the state before the step into the info records.
+        """
+        keys, infos = self.info_keys, self.infos
+        if "is_harsh" in keys: infos["is_harsh"] = self.harsh
+        if "n_targs" in keys: infos["n_targs"] = self.n_targs
+        if "n_items" in keys:
+            infos["n_items"] = self.items.sum(-1, dtype=np.int64)
+        if "disp_targs" in keys: infos["disp_targs"] = self.display_targs
+        if "is_animating" in keys:
+            infos["is_animating"] = self.is_animating
+        if "is_pop" in keys: infos["is_pop"] = self.player == self.pile
+        if "skipped" in keys: infos["skipped"] = self.prev_skipped
+        if "n_aligned" in keys: infos["n_aligned"] = self.count_aligned()
+
+    def update_infos(self, grab, grabbed):
+        """
+        Vectorized GordonGame.update_info. Writes the selected keys
+        that are added by the env into the info records.
+
+        Args:
+            grab: ndarray (N,) bool
+                the grabs returned by get_controls
+            grabbed: ndarray (N,) int8
+                see get_controls
+        """
+        if "grab" in self.info_keys:
+            priorities = self.get_grab_priorities(self.player)
+            self.infos["grab"] = np.where(grab, priorities, 0)
+        self.set_loc_infos()
+
+    def set_loc_infos(self):
+        """
+        Writes the locations of the player, pile, and button into the
+        info records if they are in info_keys.
+        """
+        keys, infos = self.info_keys, self.infos
+        n_cols = self.shape[1]
+        for key, cells in (
+                ("player_loc", self.player),
+                ("count_loc", self.pile),
+                ("end_loc", self.button)):
+            if key in keys:
+                infos[key][:,0] = cells // n_cols
+                infos[key][:,1] = cells % n_cols
+
+    def animate(self, rows, grab):
+        """
+        Vectorized Controller.animate. The targets are displayed for
+        n_targs steps during which the player cannot grab.
+
+        Args:
+            rows: ndarray (K,) int64
+                the games that are animating
+            grab: ndarray (N,) bool
+                the grabs of the current step
+        Returns:
+            grab: ndarray (N,) bool
+                the grabs that are passed to the registers
+        """
+        ending = rows[self.n_steps[rows] > self.n_targs[rows]]
+        if len(ending) > 0:
+            self.end_animation(ending)
+            self.prev_skipped[ending] = 0
+            self.skipped[ending] = 0
+        if "n_items" in self.info_keys:
+            self.infos["n_items"][rows] = self.n_steps[rows]-1
+        grab[rows] = False
+        return grab
+
+    def advance_schedules(self, rows):
+        """
+        Reads the skipped flag of the next step of the timing schedule
+        of each of the argued games that is still animating.
+
+        Args:
+            rows: ndarray (K,) int64
+        """
+        rows = rows[self.is_animating[rows]]
+        self.anim_step[rows] += 1
+        self.skipped[rows] = self.schedules[rows, self.anim_step[rows]]
+
+    def end_animation(self, rows):
+        """
+        Vectorized Controller.end_animation. Places the signals and
+        ends the animation of the argued games.
+
+        Args:
+            rows: ndarray (K,) int64
+        """
+        self.is_animating[rows] = False
+        if not self.center_signal:
+            n_cols = self.shape[1]
+            self.signals[rows, n_cols+n_cols-1] += 1
+            self.signals[rows, n_cols] += 1
+            return
+        cell = self.signal_cell
+        taken = self.get_occupied(rows)[:,cell]
+        cells = np.full(len(rows), cell, dtype=np.int64)
+        if taken.any():
+            cells[taken] = self.find_space(
+                rows[taken], cells[taken], playable_half=False
+            )
+        self.signals[rows, cells] += 1
+
+    def step_registers(self, directions, grab):
+        """
+        Vectorized Register.step.
+
+        Args:
+            directions: ndarray (N,) int64
+            grab: ndarray (N,) bool
+        Returns:
+            press: ndarray (N,) bool
+                the games whose button was pressed
+            full: ndarray (N,) bool
+                the games in which a dropped object found no space
+        """
+        arange = self.arange
+        items, targs = self.items, self.targs
+        prev = self.player
+        pile_here = self.pile == prev
+        button_here = self.button == prev
+        items_prev = items[arange, prev]
+        targs_prev = targs[arange, prev]
+        player = self.neighbors[prev, directions]
+        self.player = player
+        full = np.zeros(self.num_envs, dtype=bool)
+        # handle_drop
+        drop = ~grab
+        del_item = drop & (items_prev > 0) & pile_here
+        del_targ = drop & ~del_item & (targs_prev > 0) & pile_here
+        drop &= ~(del_item | del_targ)
+        move_item = drop & ((items_prev > 1) | ((items_prev > 0) &\
+                            (button_here | (targs_prev > 0))))
+        move_targ = drop & ~move_item & ((targs_prev > 1) |\
+                            ((targs_prev > 0) &\
+                             (button_here | (items_prev > 0))))
+        items[arange[del_item], prev[del_item]] -= 1
+        targs[arange[del_targ], prev[del_targ]] -= 1
+        for moving, objs in ((move_item, items), (move_targ, targs)):
+            if not moving.any(): continue
+            rows = arange[moving]
+            free = self.find_space(rows, prev[rows])
+            found = free >= 0
+            rows, free = rows[found], free[found]
+            objs[rows, prev[rows]] -= 1
+            objs[rows, free] += 1
+            full[arange[moving][~found]] = True
+        # handle_grab, items take priority over targets
+        carry_item = grab & (items_prev > 0)
+        carry_targ = grab & ~carry_item & (targs_prev > 0)
+        grab = grab & ~(carry_item | carry_targ)
+        make_item = grab & pile_here
+        press = grab & ~pile_here & button_here
+        for carrying, objs in ((carry_item, items), (carry_targ, targs)):
+            rows = arange[carrying]
+            objs[rows, prev[rows]] -= 1
+            objs[rows, player[rows]] += 1
+        items[arange[make_item], player[make_item]] += 1
+        return press, full
+
+    def step(self, actions):
+        """
+        Args:
+            actions: ndarray or sequence of ints (N,)
+                the action of each game. See GordonGame.step
+        Returns:
+            obs: ndarray (N, H, W) float
+            rews: ndarray (N,) float
+            dones: ndarray (N,) bool
+            infos: ndarray (N,) INFO_DTYPE or dict
+                the info records of the step. See get_infos
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        assert actions.shape == (self.num_envs,)
+        arange = self.arange
+        keys = self.info_keys
+        self.step_count += 1
+        directions, grab, grabbed = self.get_controls(actions)
+        env_grab = grab.copy()
+
+        # Controller.step
+        self.n_steps += 1
+        if keys: self.make_infos()
+        self.prev_skipped[:] = self.skipped
+        animating = arange[self.is_animating]
+        if len(animating) > 0: grab = self.animate(animating, grab)
+        press, full = self.step_registers(directions, grab)
+
+        # the rewards of the controller and the step limit of the env
+        rews = self.rews
+        rews[:] = 0
+        if press.any(): rews[press] = self.calculate_rewards(arange[press])
+        rews[full] = -1
+        dones = self.dones
+        np.logical_or(press, full, out=dones)
+        over = self.step_count > self.max_steps
+        dones |= over
+        limit = ~over & (self.step_count == self.max_steps) & (rews == 0)
+        rews[limit] = self.max_punishment
+        dones |= limit
+        if keys: self.update_infos(env_grab, grabbed)
+
+        self.render()
+        if self.auto_reset and dones.any():
+            finished = dones.copy()
+            self.final_obs[finished] = self.obs[finished]
+            # reset_at clears the dones of the reset games
+            self.reset_at(finished)
+            dones |= finished
+        return self.obs, rews, dones, self.get_infos()
+
+    def calculate_rewards(self, rows):
+        """
+        Vectorized Controller.calculate_reward. Must be overridden.
+
+        Args:
+            rows: ndarray (K,) int64
+                the games whose button was pressed
+        Returns:
+            rews: ndarray (K,) float
+        """
+        raise NotImplementedError
+
+    def get_cell_codes(self, rows=None):
+        """
+        Encodes the objects on each cell as an index into CELL_COLORS.
+        Unlit targets and the targets of games that do not display
+        their targets are not drawn.
+
+        Args:
+            rows: None or ndarray (K,) int64
+                the game indices. None selects all games.
+        Returns:
+            codes: ndarray (K, H*W) int64
+        """
+        if rows is None: rows = self.arange
+        codes = np.minimum(self.items[rows], MAX_CELL_ITEMS).astype(np.int64)
+        codes *= 2
+        lit = ~self.hidden[rows]
+        lit &= self.display_targs[rows,None]
+        codes += self.targs[rows]*lit
+        codes *= 2
+        codes += self.signals[rows]
+        codes *= 8
+        k = np.arange(len(rows))
+        codes[k, self.player[rows]] += 4
+        codes[k, self.pile[rows]] += 2
+        codes[k, self.button[rows]] += 1
+        return codes
+
+    def render(self, rows=None):
+        """
+        Draws the observations of the argued games into self.obs. Only
+        the cells whose code differs from drawn_codes are drawn. Most
+        steps change a few cells of each game, so this avoids
+        rewriting every pixel at large pixel densities.
+
+        Args:
+            rows: None or ndarray (K,) int64
+                the game indices. None selects all games.
+        """
+        codes = self.get_cell_codes(rows)
+        if rows is None: rows = self.arange
+        k, cells = np.nonzero(codes != self.drawn_codes[rows])
+        if len(k) == 0: return
+        games = rows[k]
+        codes = codes[k, cells]
+        self.drawn_codes[games, cells] = codes
+        colors = self.background[cells] + CELL_COLORS[codes]
+        H, W = self.shape
+        d, ds = self.density, self.draw_space
+        obs = self.obs.reshape(self.num_envs, H, d, W, d)
+        obs[games, cells//W, :ds, cells%W, :ds] = colors[:,None,None]
+
+    def close(self):
+        pass
+
+class TensorEvenLineMatch(TensorGordonGame):
+    """
+    The tensor version of EvenLineMatch (gordongames-v0).
+    """
+    controller_type = EvenLineMatchController
+
+    def calculate_rewards(self, rows):
+        """
+        See EvenLineMatchController.calculate_reward
+        """
+        H, W = self.shape
+        items = self.items[rows]
+        n_items = items.sum(-1, dtype=np.int64)
+        n_targs = self.n_targs[rows]
+        item_mask = (items > 0).reshape(-1, H, W)
+        targ_mask = (self.targs[rows] > 0).reshape(-1, H, W)
+        one_row = item_mask.any(-1).sum(-1) <= 1
+        item_cols = item_mask.any(1)
+        targ_cols = targ_mask.any(1)
+        if self.harsh:
+            match = (item_cols == targ_cols).all(-1)
+            rews = np.where(one_row & match, 1, -1)
+            rews[n_items != n_targs] = -1
+            return rews
+        n_intersection = (item_cols & targ_cols).sum(-1)
+        rews = n_intersection - (item_cols.sum(-1)-n_intersection)
+        rews -= np.abs(n_items-n_targs)
+        return np.where(one_row, rews, -1)
+
+class TensorClusterMatch(TensorEvenLineMatch):
+    """
+    The tensor version of ClusterMatch (gordongames-v1).
+    """
+    controller_type = ClusterMatchController
+
+    def calculate_rewards(self, rows):
+        """
+        See ClusterMatchController.calculate_reward
+        """
+        H, W = self.shape
+        items = self.items[rows]
+        n_items = items.sum(-1, dtype=np.int64)
+        n_targs = self.n_targs[rows]
+        item_mask = (items > 0).reshape(-1, H, W)
+        n_aligned = item_mask[:,1:].sum(-1).max(-1, initial=0)
+        if self.harsh:
+            rews = (n_aligned == n_targs).astype(np.int64)
+            rews[n_items != n_targs] = -1
+            return rews
+        rews = (n_targs - np.abs(n_items-n_targs))/n_targs
+        rews -= np.abs(n_aligned-n_items)/n_targs
+        return rews
+
+class TensorCanTask(TensorGordonGame):
+    """
+    The base class of the tensor versions of the counting games (see
+    CanTask). Grabbing the pile places a new item along a row and
+    grabbing the button presses it.
+    """
+    def __init__(self, num_envs, **kwargs):
+        """
+        See TensorGordonGame
+        """
+        super().__init__(num_envs, **kwargs)
+        self.row_order = get_row_order(self.topology)
+
+    def get_controls(self, actions):
+        """
+        Vectorized CanTask.get_controls. Grabs are ignored during the
+        initial animation.
+
+        Args:
+            actions: ndarray (N,) int64
+        Returns:
+            directions: ndarray (N,) int64
+            grab: ndarray (N,) bool
+            grabbed: ndarray (N,) int8
+                see GordonGame.get_controls
+        """
+        is_grab = actions >= GRAB
+        directions = np.where(is_grab, STAY, actions)
+        is_grab &= ~self.is_animating
+        grabbed = self.get_grab_priorities(self.player)
+        grabbed[~is_grab] = 0
+        is_pile = grabbed == TYPE2PRIORITY[PILE]
+        if is_pile.any(): self.place_items(self.arange[is_pile])
+        grab = (grabbed != 0) & ~is_pile
+        return directions, grab, grabbed
+
+    def place_items(self, rows):
+        """
+        Vectorized CanTask.place_item. Creates an item on the first
+        empty cell of the row order of the column of the player.
+
+        Args:
+            rows: ndarray (K,) int64
+        """
+        order = self.row_order[self.player[rows] % self.shape[1]]
+        occupied = self.get_occupied(rows)
+        k = np.arange(len(rows))
+        empty = ~occupied[k[:,None], order]
+        first = np.argmax(empty, axis=1)
+        found = empty[k, first]
+        self.items[rows[found], order[k, first][found]] += 1
+
+    def update_infos(self, grab, grabbed):
+        """
+        Vectorized CanTask.update_info. Items placed by a pile grab
+        are not counted until the next step.
+
+        Args:
+            grab: ndarray (N,) bool
+            grabbed: ndarray (N,) int8
+        """
+        keys, infos = self.info_keys, self.infos
+        is_pile = grabbed == TYPE2PRIORITY[PILE]
+        if "grab" in keys: infos["grab"] = self.dones | grab | is_pile
+        self.set_loc_infos()
+        if "n_items" in keys: infos["n_items"] -= is_pile
+
+    def calculate_rewards(self, rows):
+        """
+        See NutsInCanController.calculate_reward
+        """
+        n_items = self.items[rows].sum(-1, dtype=np.int64)
+        return np.where(n_items == self.n_targs[rows], 1, -1)
+
+class TensorNutsInCan(TensorCanTask):
+    """
+    The tensor version of NutsInCan (gordongames-v4). The targets are
+    flashed in the order of flash_cells following the timing
+    schedules.
+
+    The flashing variants differ in three flags:
+
+        hide_at_reset: the targets are unlit until they are flashed
+        hide_flashed: each flashed target is unlit again when the
+            next target is flashed
+        hide_on_end: the targets are not displayed after the
+            animation
+    """
+    controller_type = NutsInCanController
+    hide_at_reset = True
+    hide_flashed = True
+    hide_on_end = True
+
+    def reset_animation(self, idxs):
+        """
+        Samples the timing schedules of the argued games. See
+        NutsInCanController.reset
+
+        Args:
+            idxs: ndarray (K,) int64
+        """
+        if self.hide_at_reset: self.hidden[idxs] = self.targs[idxs] > 0
+        self.set_schedules(idxs, sample_timing_schedules(
+            self.n_targs[idxs],
+            self.timing_p if self.rand_timing else 1,
+            rand=self.rand
+        ))
+
+    def animate(self, rows, grab):
+        """
+        Vectorized NutsInCanController.animate. Flashes the next
+        target unless the step is skipped.
+
+        Args:
+            rows: ndarray (K,) int64
+                the games that are animating
+            grab: ndarray (N,) bool
+        Returns:
+            grab: ndarray (N,) bool
+        """
+        n_popped = self.n_popped[rows]
+        ending = n_popped >= self.n_targs[rows]
+        flashing = rows[~ending]
+        if self.hide_flashed:
+            lit = flashing[n_popped[~ending] > 0]
+            cells = self.flash_cells[lit, self.n_popped[lit]-1]
+            self.hidden[lit, cells] = True
+        skipped = self.skipped[flashing] != 0
+        self.n_steps[flashing[skipped]] -= 1
+        popping = flashing[~skipped]
+        self.n_popped[popping] += 1
+        cells = self.flash_cells[popping, self.n_popped[popping]-1]
+        self.hidden[popping, cells] = False
+        ending = rows[ending]
+        if len(ending) > 0:
+            self.end_animation(ending)
+            self.prev_skipped[ending] = 0
+            self.skipped[ending] = 0
+        if "n_items" in self.info_keys: self.set_flash_n_items(rows)
+        self.advance_schedules(rows)
+        return grab
+
+    def set_flash_n_items(self, rows):
+        """
+        Writes the n_items info of the argued animating games. See
+        NutsInCanController.animate
+
+        Args:
+            rows: ndarray (K,) int64
+        """
+        n_steps, n_targs = self.n_steps[rows], self.n_targs[rows]
+        n_items = self.infos["n_items"]
+        shown = n_steps - (self.skipped[rows] == 0)
+        n_items[rows] = np.where(
+            n_steps <= n_targs,
+            shown,
+            np.where(n_steps == n_targs+1, n_targs, n_items[rows])
+        )
+
+    def end_animation(self, rows):
+        """
+        See NutsInCanController.end_animation
+
+        Args:
+            rows: ndarray (K,) int64
+        """
+        super().end_animation(rows)
+        self.hidden[rows] = False
+        if self.hide_on_end: self.display_targs[rows] = False
+
+class TensorVisNuts(TensorNutsInCan):
+    """
+    The tensor version of VisNuts (gordongames-v8). Flashed targets
+    remain displayed.
+    """
+    controller_type = VisNutsController
+    hide_at_reset = True
+    hide_flashed = False
+    hide_on_end = False
+
+    def set_flash_n_items(self, rows):
+        """
+        See VisNutsController.animate
+
+        Args:
+            rows: ndarray (K,) int64
+        """
+        n_steps, n_targs = self.n_steps[rows], self.n_targs[rows]
+        n_items = self.infos["n_items"]
+        shown = n_steps - (self.skipped[rows] == 0)
+        n_items[rows] = np.where(n_steps <= n_targs+1, shown, n_items[rows])
+
+class TensorStaticVisNuts(TensorVisNuts):
+    """
+    The tensor version of StaticVisNuts (gordongames-v10). All targets
+    are displayed for the whole animation.
+    """
+    controller_type = StaticVisNutsController
+    hide_at_reset = False
+
+class TensorInvisN(TensorNutsInCan):
+    """
+    The tensor version of InvisN (gordongames-v11). The targets are
+    never displayed and the animation is a single step.
+    """
+    controller_type = InvisNController
+
+    def reset_animation(self, idxs):
+        """
+        See InvisNController.reset
+
+        Args:
+            idxs: ndarray (K,) int64
+        """
+        if self.hide_at_reset: self.hidden[idxs] = self.targs[idxs] > 0
+        self.set_schedules(idxs, np.zeros((len(idxs),1), dtype=np.int8))
+        self.n_steps[idxs] = self.n_targs[idxs]
+
+    def animate(self, rows, grab):
+        """
+        See InvisNController.animate
+
+        Args:
+            rows: ndarray (K,) int64
+            grab: ndarray (N,) bool
+        Returns:
+            grab: ndarray (N,) bool
+        """
+        if "n_items" in self.info_keys:
+            self.infos["n_items"][rows] = self.n_targs[rows]
+        self.end_animation(rows)
+        return grab
+
+class TensorVisN(TensorStaticVisNuts):
+    """
+    The tensor version of VisN (gordongames-v12). All targets are
+    displayed immediately and the animation is a single step.
+    """
+    controller_type = VisNController
+    reset_animation = TensorInvisN.reset_animation
+
+    def animate(self, rows, grab):
+        """
+        See VisNController.animate
+
+        Args:
+            rows: ndarray (K,) int64
+            grab: ndarray (N,) bool
+        Returns:
+            grab: ndarray (N,) bool
+        """
+        if "n_items" in self.info_keys:
+            self.infos["n_items"][rows] = self.n_targs[rows]
+        ending = rows[self.skipped[rows] == 0]
+        if len(ending) > 0:
+            self.end_animation(ending)
+            self.prev_skipped[ending] = 0
+            self.skipped[ending] = 0
+        self.advance_schedules(rows)
+        return grab
+
+"""
+The tensor games of each env id.
+"""
+TENSOR_GAMES = {
+    "gordongames-v0": TensorEvenLineMatch,
+    "gordongames-v1": TensorClusterMatch,
+    "gordongames-v4": TensorNutsInCan,
+    "gordongames-v8": TensorVisNuts,
+    "gordongames-v10": TensorStaticVisNuts,
+    "gordongames-v11": TensorInvisN,
+    "gordongames-v12": TensorVisN,
+    "gordongames-v13": TensorNutsInCan,
+    "gordongames-v14": TensorVisNuts,
+}
+
+def make_tensor_game(env_id, num_envs, **kwargs):
+    """
+    Creates the tensor version of the argued env id.
+
+    Args:
+        env_id: str
+            see TENSOR_GAMES for the supported ids
+        num_envs: int
+        kwargs: see TensorGordonGame
+    Returns:
+        game: TensorGordonGame
+    """
+    assert env_id in TENSOR_GAMES, "No tensor game for {}".format(env_id)
+    return TENSOR_GAMES[env_id](num_envs, **kwargs)
@@ -0,0 +1,728 @@
+import gym
+import gym.spaces as spaces
+from gym.vector.utils import batch_space
+from gordongames.envs.ggames.info import make_info_records, INFO_DTYPE
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor
+import os
+import traceback
+
+def step_envs(envs, idxs, actions, obs, final_obs, rews, dones,
+                                                    auto_reset=True):
+    """
+    Steps each env with its action and writes the outputs into the
+    argued buffers. Envs that finish are reset if auto_reset is true,
+    in which case their last observation is written to final_obs.
+
+    Args:
+        envs: sequence of GordonGame
+        idxs: sequence of ints
+            the index of each env in the buffers
+        actions: sequence of ints (N,)
+            the actions of all of the envs in the buffers
+        obs: ndarray (N, H, W) float
+        final_obs: ndarray (N, H, W) float
+        rews: ndarray (N,) float32
+        dones: ndarray (N,) bool
+        auto_reset: bool
+    """
+    for i,env in zip(idxs, envs):
+        o, rew, done, _ = env.step(actions[i])
+        rews[i] = rew
+        dones[i] = done
+        if done and auto_reset:
+            final_obs[i] = o
+            o = env.reset()[0]
+        obs[i] = o
+
+def reset_envs(envs, idxs, obs, kwargs):
+    """
+    Resets each env and writes its first observation into obs.
+
+    Args:
+        envs: sequence of GordonGame
+        idxs: sequence of ints
+            the index of each env in obs
+        obs: ndarray (N, H, W) float
+        kwargs: dict
+            the kwargs of GordonGame.reset
+    """
+    for i,env in zip(idxs, envs):
+        obs[i] = env.reset(**kwargs)[0]
+
+class VectorGordonGame:
+    """
+    Steps N independent games of a single env id in one call. The
+    games are stepped directly rather than through the gym wrapper
+    stack and their outputs are written into preallocated buffers:
+
+        obs: ndarray (N, H, W) float
+        rews: ndarray (N,) float32
+        dones: ndarray (N,) bool
+        infos: ndarray (N,) INFO_DTYPE
+
+    The buffers are reused by every step, so copy them if they need
+    to outlive the next step.
+
+    Games that finish are automatically reset within the step. The
+    observation of a finished game is then the first observation of
+    its next episode and the last observation of the finished episode
+    is stored in final_obs. The reward, done and info of a finished
+    game are those of its final step.
+    """
+    def __init__(self, env_id, num_envs, seed=None, auto_reset=True,
+                                                    **kwargs):
+        """
+        Args:
+            env_id: str
+                the registered id of the games, i.e. "gordongames-v1"
+            num_envs: int
+                the number of games
+            seed: None or int or SeedSequence
+                the root seed of the games. The games are seeded with
+                its spawned children. See seed.
+            auto_reset: bool
+                if true, games that finish are reset within the step.
+                Otherwise finished games must be reset with reset_at
+                before they are stepped again.
+            kwargs: the env kwargs shared by all of the games. Select
+                info_keys to avoid computing unused info values.
+        """
+        assert num_envs > 0
+        self.env_id = env_id
+        self.num_envs = num_envs
+        self.auto_reset = auto_reset
+        self.envs = [
+            gym.make(env_id, **kwargs).unwrapped for _ in range(num_envs)
+        ]
+        env = self.envs[0]
+        self.single_observation_space = env.observation_space
+        self.single_action_space = env.action_space
+        self.observation_space = batch_space(
+            env.observation_space, num_envs
+        )
+        self.action_space = spaces.MultiDiscrete(
+            [env.action_space.n]*num_envs
+        )
+        # the buffers take the dtype of the grid so that the
+        # observations are the same as those of a single game
+        grid = env.controller.grid.grid
+        shape = (num_envs, *grid.shape)
+        self.obs = np.zeros(shape, dtype=grid.dtype)
+        self.final_obs = np.zeros(shape, dtype=grid.dtype)
+        self.rews = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.infos = make_info_records(num_envs)
+        for i,env in enumerate(self.envs):
+            env.enable_info_records(self.infos, i)
+        self.seed(seed)
+
+    def seed(self, x=None):
+        """
+        Seeds game i with the ith child spawned from a SeedSequence
+        made from x. The games then never share streams.
+
+        Args:
+            x: None or int or sequence of ints or SeedSequence
+                None seeds from fresh entropy from the OS
+        Returns:
+            entropy: list of int
+                the entropy of the root SeedSequence
+        """
+        if not isinstance(x, np.random.SeedSequence):
+            x = np.random.SeedSequence(x)
+        self.seed_seq = x
+        for env,child in zip(self.envs, x.spawn(self.num_envs)):
+            env.seed(child)
+        return [x.entropy]
+
+    def reset(self, seed=None, **kwargs):
+        """
+        Resets all of the games.
+
+        Args:
+            seed: None or int or SeedSequence
+                if not None, the games are reseeded before the reset
+            kwargs: the kwargs of GordonGame.reset, applied to every
+                game. fast_forward is not supported.
+        Returns:
+            obs: ndarray (N, H, W) float
+            infos: ndarray (N,) INFO_DTYPE
+                zeroed records as reset does not produce an info
+        """
+        assert not kwargs.get("fast_forward", False)
+        if seed is not None: self.seed(seed)
+        reset_envs(self.envs, range(self.num_envs), self.obs, kwargs)
+        self.rews[:] = 0
+        self.dones[:] = False
+        self.infos[:] = 0
+        return self.obs, self.infos
+
+    def reset_at(self, idx, **kwargs):
+        """
+        Resets a single game.
+
+        Args:
+            idx: int
+                the index of the game
+            kwargs: the kwargs of GordonGame.reset
+        Returns:
+            obs: ndarray (N, H, W) float
+        """
+        assert not kwargs.get("fast_forward", False)
+        self.obs[idx] = self.envs[idx].reset(**kwargs)[0]
+        self.dones[idx] = False
+        return self.obs
+
+    def step(self, actions):
+        """
+        Args:
+            actions: ndarray or sequence of ints (N,)
+                the action of each game. See GordonGame.step
+        Returns:
+            obs: ndarray (N, H, W) float
+            rews: ndarray (N,) float32
+            dones: ndarray (N,) bool
+            infos: ndarray (N,) INFO_DTYPE
+                the info records of the step. See INFO_DTYPE
+        """
+        if isinstance(actions, np.ndarray): actions = actions.tolist()
+        assert len(actions) == self.num_envs
+        step_envs(
+            self.envs,
+            range(self.num_envs),
+            actions,
+            self.obs,
+            self.final_obs,
+            self.rews,
+            self.dones,
+            self.auto_reset
+        )
+        return self.obs, self.rews, self.dones, self.infos
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+
+class ThreadVectorGordonGame(VectorGordonGame):
+    """
+    A VectorGordonGame whose games are stepped by a pool of threads.
+    Each thread steps a contiguous subset of the games and writes into
+    the shared buffers. The NumPy writes to the grids release the
+    GIL, so the threads can overlap them without the cost of
+    processes. See tests/backend_benchmark.py to compare the backends.
+
+    The interface and the trajectories are the same as those of a
+    VectorGordonGame with the same seed.
+    """
+    def __init__(self, env_id, num_envs, num_threads=None, seed=None,
+                                                   auto_reset=True,
+                                                   **kwargs):
+        """
+        Args:
+            env_id: str
+                the registered id of the games, i.e. "gordongames-v1"
+            num_envs: int
+                the number of games
+            num_threads: int or None
+                the number of threads. None uses one thread per cpu,
+                up to num_envs.
+            seed: None or int or SeedSequence
+                see VectorGordonGame.seed
+            auto_reset: bool
+                see VectorGordonGame
+            kwargs: the env kwargs shared by all of the games
+        """
+        super().__init__(
+            env_id, num_envs, seed=seed, auto_reset=auto_reset, **kwargs
+        )
+        if num_threads is None:
+            num_threads = min(num_envs, os.cpu_count() or 1)
+        assert 0 < num_threads <= num_envs
+        self.num_threads = num_threads
+        self.idxs = [
+            idxs.tolist() for idxs in\
+                np.array_split(np.arange(num_envs), num_threads)
+        ]
+        self.env_subsets = [
+            [self.envs[i] for i in idxs] for idxs in self.idxs
+        ]
+        self.pool = ThreadPoolExecutor(max_workers=num_threads)
+
+    def run_all(self, fxn, *args):
+        """
+        Calls fxn(envs, idxs, *args) for each subset of the games in
+        the thread pool and waits for all of the calls to finish.
+
+        Args:
+            fxn: callable
+            args: the remaining arguments of fxn
+        """
+        futures = [
+            self.pool.submit(fxn, envs, idxs, *args)\
+                for envs,idxs in zip(self.env_subsets, self.idxs)
+        ]
+        for future in futures: future.result()
+
+    def reset(self, seed=None, **kwargs):
+        """
+        Resets all of the games. See VectorGordonGame.reset
+        """
+        assert not kwargs.get("fast_forward", False)
+        if seed is not None: self.seed(seed)
+        self.run_all(reset_envs, self.obs, kwargs)
+        self.rews[:] = 0
+        self.dones[:] = False
+        self.infos[:] = 0
+        return self.obs, self.infos
+
+    def step(self, actions):
+        """
+        See VectorGordonGame.step
+        """
+        if isinstance(actions, np.ndarray): actions = actions.tolist()
+        assert len(actions) == self.num_envs
+        self.run_all(
+            step_envs,
+            actions,
+            self.obs,
+            self.final_obs,
+            self.rews,
+            self.dones,
+            self.auto_reset
+        )
+        return self.obs, self.rews, self.dones, self.infos
+
+    def close(self):
+        self.pool.shutdown()
+        super().close()
+
+def get_buffer_specs(num_envs, grid):
+    """
+    Describes the buffers that are shared by the workers of a
+    SubprocVectorGordonGame and its parent.
+
+    Args:
+        num_envs: int
+        grid: ndarray (H, W) float
+            the observation of a single game
+    Returns:
+        specs: tuple of tuples (key, shape, dtype)
+    """
+    return (
+        ("obs", (num_envs, *grid.shape), grid.dtype),
+        ("final_obs", (num_envs, *grid.shape), grid.dtype),
+        ("rews", (num_envs,), np.dtype(np.float32)),
+        ("dones", (num_envs,), np.dtype(bool)),
+        ("infos", (num_envs,), INFO_DTYPE),
+        ("actions", (num_envs,), np.dtype(np.int64)),
+    )
+
+def get_shared_layout(specs):
+    """
+    Lays out the argued buffers one after the other in a single block
+    of memory. Each buffer starts on a 64 byte boundary.
+
+    Args:
+        specs: sequence of tuples (key, shape, dtype)
+    Returns:
+        offsets: list of int
+            the byte offset of each buffer
+        size: int
+            the size of the block in bytes
+    """
+    offsets = []
+    size = 0
+    for _,shape,dtype in specs:
+        size = -(-size//64)*64
+        offsets.append(size)
+        size += int(np.prod(shape))*np.dtype(dtype).itemsize
+    return offsets, max(size, 1)
+
+def map_shared_arrays(buf, specs):
+    """
+    Creates ndarray views of the argued buffers in a block of memory.
+    See get_shared_layout.
+
+    Args:
+        buf: memoryview
+            the block of memory, i.e. SharedMemory.buf
+        specs: sequence of tuples (key, shape, dtype)
+    Returns:
+        arrays: dict
+            keys: str
+                the keys of the specs
+            vals: ndarray
+    """
+    offsets, _ = get_shared_layout(specs)
+    arrays = dict()
+    for (key,shape,dtype),offset in zip(specs, offsets):
+        arrays[key] = np.ndarray(
+            shape, dtype=dtype, buffer=buf, offset=offset
+        )
+    return arrays
+
+def subproc_worker(pipe, parent_pipe, shm_name, specs, env_id, idxs,
+                                                auto_reset, kwargs):
+    """
+    The loop of a SubprocVectorGordonGame worker. The worker owns the
+    games at idxs and writes their outputs directly into the shared
+    buffers. Commands are received as (cmd, data) tuples and each one
+    is answered with (True, None) once its outputs are written. The
+    step_each and reset_each commands instead answer with (True, idx)
+    as soon as each of the argued games is done, see GordonEnvPool. If
+    a command fails, (False, traceback) is sent and the worker exits.
+
+    Args:
+        pipe: Connection
+            the worker end of the pipe
+        parent_pipe: Connection or None
+            the parent end of the pipe, which is closed by the worker
+        shm_name: str
+            the name of the SharedMemory that holds the buffers
+        specs: sequence of tuples (key, shape, dtype)
+            see get_buffer_specs
+        env_id: str
+        idxs: list of ints
+            the indices of the games of the worker
+        auto_reset: bool
+        kwargs: dict
+            the env kwargs
+    """
+    if parent_pipe is not None: parent_pipe.close()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    bufs = map_shared_arrays(shm.buf, specs)
+    obs, final_obs = bufs["obs"], bufs["final_obs"]
+    rews, dones, infos = bufs["rews"], bufs["dones"], bufs["infos"]
+    local = {i:k for k,i in enumerate(idxs)}
+    envs = []
+    try:
+        for i in idxs:
+            env = gym.make(env_id, **kwargs).unwrapped
+            env.enable_info_records(bufs["infos"], i)
+            envs.append(env)
+        pipe.send((True, None))
+        while True:
+            cmd, data = pipe.recv()
+            if cmd == "step":
+                step_envs(
+                    envs,
+                    idxs,
+                    bufs["actions"].tolist(),
+                    obs,
+                    final_obs,
+                    rews,
+                    dones,
+                    auto_reset
+                )
+            elif cmd == "reset":
+                reset_envs(envs, idxs, obs, data)
+            elif cmd == "reset_at":
+                i, data = data
+                obs[i] = envs[local[i]].reset(**data)[0]
+            elif cmd == "step_each":
+                actions = bufs["actions"]
+                for i in data:
+                    step_envs(
+                        [envs[local[i]]],
+                        [i],
+                        {i: int(actions[i])},
+                        obs,
+                        final_obs,
+                        rews,
+                        dones,
+                        auto_reset
+                    )
+                    pipe.send((True, i))
+                continue
+            elif cmd == "reset_each":
+                for i in data:
+                    reset_envs([envs[local[i]]], [i], obs, dict())
+                    rews[i] = 0
+                    dones[i] = False
+                    infos[i] = 0
+                    pipe.send((True, i))
+                continue
+            elif cmd == "seed":
+                for env,child in zip(envs, data): env.seed(child)
+            elif cmd == "close":
+                pipe.send((True, None))
+                break
+            else: raise ValueError("Unknown command {}".format(cmd))
+            pipe.send((True, None))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        pipe.send((False, traceback.format_exc()))
+    finally:
+        # the views must be released before the memory is closed
+        for env in envs:
+            env.info_records = None
+            env.close()
+        del envs, bufs, obs, final_obs, rews, dones, infos
+        shm.close()
+        pipe.close()
+
+class SubprocVectorGordonGame:
+    """
+    Steps N games of a single env id in worker processes. Each worker
+    owns a contiguous subset of the games and writes their
+    observations, rewards, dones and info records directly into
+    shared memory, so the parent reads them as (N, H, W) views without
+    any pickling:
+
+        obs: ndarray (N, H, W) float
+        rews: ndarray (N,) float32
+        dones: ndarray (N,) bool
+        infos: ndarray (N,) INFO_DTYPE
+
+    The actions are written to a shared array as well and each step
+    only sends a short command through the pipe of each worker. Works
+    with both the fork and spawn start methods.
+
+    The interface and the trajectories are the same as those of a
+    VectorGordonGame with the same seed. The buffers are reused by
+    every step, so copy them if they need to outlive the next step or
+    the call to close.
+    """
+    def __init__(self, env_id, num_envs, num_workers=None, seed=None,
+                                                   auto_reset=True,
+                                                   start_method=None,
+                                                   **kwargs):
+        """
+        Args:
+            env_id: str
+                the registered id of the games, i.e. "gordongames-v1"
+            num_envs: int
+                the number of games
+            num_workers: int or None
+                the number of worker processes. None uses one worker
+                per cpu, up to num_envs.
+            seed: None or int or SeedSequence
+                the root seed of the games. See VectorGordonGame.seed
+            auto_reset: bool
+                see VectorGordonGame
+            start_method: str or None
+                the multiprocessing start method, i.e. "fork" or
+                "spawn". None uses the default start method.
+            kwargs: the env kwargs shared by all of the games. Must
+                be picklable.
+        """
+        assert num_envs > 0
+        if num_workers is None:
+            num_workers = min(num_envs, os.cpu_count() or 1)
+        assert 0 < num_workers <= num_envs
+        self.env_id = env_id
+        self.num_envs = num_envs
+        self.num_workers = num_workers
+        self.auto_reset = auto_reset
+        self.closed = True
+
+        env = gym.make(env_id, **kwargs).unwrapped
+        self.single_observation_space = env.observation_space
+        self.single_action_space = env.action_space
+        self.observation_space = batch_space(
+            env.observation_space, num_envs
+        )
+        self.action_space = spaces.MultiDiscrete(
+            [env.action_space.n]*num_envs
+        )
+        specs = get_buffer_specs(num_envs, env.controller.grid.grid)
+        env.close()
+
+        _, size = get_shared_layout(specs)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        bufs = map_shared_arrays(self.shm.buf, specs)
+        self.obs = bufs["obs"]
+        self.final_obs = bufs["final_obs"]
+        self.rews = bufs["rews"]
+        self.dones = bufs["dones"]
+        self.infos = bufs["infos"]
+        self.actions = bufs["actions"]
+
+        ctx = mp.get_context(start_method)
+        self.idxs = [
+            idxs.tolist() for idxs in\
+                np.array_split(np.arange(num_envs), num_workers)
+        ]
+        self.pipes = []
+        self.procs = []
+        for idxs in self.idxs:
+            parent_pipe, child_pipe = ctx.Pipe()
+            proc = ctx.Process(
+                target=subproc_worker,
+                args=(
+                    child_pipe,
+                    parent_pipe,
+                    self.shm.name,
+                    specs,
+                    env_id,
+                    idxs,
+                    auto_reset,
+                    kwargs,
+                ),
+                daemon=True
+            )
+            proc.start()
+            child_pipe.close()
+            self.pipes.append(parent_pipe)
+            self.procs.append(proc)
+        self.closed = False
+        self.recv_all()
+        self.seed(seed)
+
+    def recv_all(self, pipes=None):
+        """
+        Waits for the answers of the workers.
+
+        Args:
+            pipes: None or sequence of Connections
+                None waits for all of the workers
+        """
+        if pipes is None: pipes = self.pipes
+        errors = []
+        for pipe in pipes:
+            ok, data = pipe.recv()
+            if not ok: errors.append(data)
+        if errors:
+            raise RuntimeError("Worker failed:\n{}".format(errors[0]))
+
+    def send_each(self, msgs, pipes=None):
+        """
+        Sends a command to each of the argued workers and waits for
+        their answers. All of the synchronous commands are sent
+        through this method.
+
+        Args:
+            msgs: sequence of (cmd, data)
+                the message of each worker
+            pipes: None or sequence of Connections
+                the workers of the messages. None sends to all of
+                the workers.
+        """
+        if pipes is None: pipes = self.pipes
+        assert len(msgs) == len(pipes)
+        for pipe,msg in zip(pipes, msgs): pipe.send(msg)
+        self.recv_all(pipes)
+
+    def send_all(self, cmd, data=None):
+        """
+        Sends the same command to all of the workers and waits for
+        their answers.
+
+        Args:
+            cmd: str
+            data: any picklable object
+        """
+        self.send_each([(cmd, data)]*len(self.pipes))
+
+    def seed(self, x=None):
+        """
+        Seeds game i with the ith child spawned from a SeedSequence
+        made from x. See VectorGordonGame.seed
+
+        Args:
+            x: None or int or sequence of ints or SeedSequence
+        Returns:
+            entropy: list of int
+                the entropy of the root SeedSequence
+        """
+        if not isinstance(x, np.random.SeedSequence):
+            x = np.random.SeedSequence(x)
+        self.seed_seq = x
+        children = x.spawn(self.num_envs)
+        self.send_each([
+            ("seed", [children[i] for i in idxs]) for idxs in self.idxs
+        ])
+        return [x.entropy]
+
+    def reset(self, seed=None, **kwargs):
+        """
+        Resets all of the games.
+
+        Args:
+            seed: None or int or SeedSequence
+                if not None, the games are reseeded before the reset
+            kwargs: the kwargs of GordonGame.reset, applied to every
+                game. fast_forward is not supported.
+        Returns:
+            obs: ndarray (N, H, W) float
+            infos: ndarray (N,) INFO_DTYPE
+                zeroed records as reset does not produce an info
+        """
+        assert not kwargs.get("fast_forward", False)
+        if seed is not None: self.seed(seed)
+        self.send_all("reset", kwargs)
+        self.rews[:] = 0
+        self.dones[:] = False
+        self.infos[:] = 0
+        return self.obs, self.infos
+
+    def reset_at(self, idx, **kwargs):
+        """
+        Resets a single game.
+
+        Args:
+            idx: int
+                the index of the game
+            kwargs: the kwargs of GordonGame.reset
+        Returns:
+            obs: ndarray (N, H, W) float
+        """
+        assert not kwargs.get("fast_forward", False)
+        idx = int(idx)
+        assert 0 <= idx < self.num_envs
+        for pipe,idxs in zip(self.pipes, self.idxs):
+            if idx in idxs:
+                self.send_each([("reset_at", (idx, kwargs))], [pipe])
+        self.dones[idx] = False
+        return self.obs
+
+    def step(self, actions):
+        """
+        Args:
+            actions: ndarray or sequence of ints (N,)
+                the action of each game. See GordonGame.step
+        Returns:
+            obs: ndarray (N, H, W) float
+            rews: ndarray (N,) float32
+            dones: ndarray (N,) bool
+            infos: ndarray (N,) INFO_DTYPE
+                the info records of the step. See INFO_DTYPE
+        """
+        assert len(actions) == self.num_envs
+        self.actions[:] = actions
+        self.send_all("step")
+        return self.obs, self.rews, self.dones, self.infos
+
+    def close(self):
+        """
+        Stops the workers and frees the shared memory. The buffers
+        must not be used afterwards.
+        """
+        if self.closed: return
+        self.closed = True
+        for pipe in self.pipes:
+            try:
+                pipe.send(("close", None))
+                pipe.recv()
+            except (BrokenPipeError, EOFError, ConnectionResetError):
+                pass
+            pipe.close()
+        for proc in self.procs:
+            proc.join(timeout=5)
+            if proc.is_alive(): proc.terminate()
+        self.obs = self.final_obs = self.rews = None
+        self.dones = self.infos = self.actions = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # views that are still referenced elsewhere keep the
+            # memory mapped until they are freed
+            pass
+        self.shm.unlink()
+
+    def __del__(self):
+        if not getattr(self, "closed", True): self.close()
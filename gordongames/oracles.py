@@ -22,11 +22,25 @@ class NullOracle(Oracle):
         return 0
 
 class RandOracle(Oracle):
-    def __init__(self, actn_min=0, actn_max=5):
-        self.brain = lambda: np.random.randint(actn_min, actn_max)
+    def __init__(self, actn_min=0, actn_max=5, seed=None):
+        """
+        Args:
+            actn_min: int (inclusive)
+                the lowest action
+            actn_max: int (exclusive)
+                the upper bound of the actions
+            seed: None or int or SeedSequence or Generator
+                the seed of the oracle's generator. A child of an
+                env's seed (env.spawn(1)[0]) or the env's oracle_rand
+                keeps the oracle within the env's seed tree. None
+                seeds from fresh entropy from the OS.
+        """
+        self.actn_min = actn_min
+        self.actn_max = actn_max
+        self.rand = np.random.default_rng(seed)
 
     def __call__(self, *args, **kwargs):
-        return self.brain()
+        return int(self.rand.integers(self.actn_min, self.actn_max))
 
 class GordonOracle(Oracle):
     def __init__(self, env_type, *args, **kwargs):
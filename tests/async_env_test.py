@@ -0,0 +1,103 @@
+import gordongames
+import gym
+from gordongames.envs import AsyncGordonGame
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import asyncio
+
+"""
+Checks that games driven concurrently through AsyncGordonGame follow
+the same trajectories as synchronous envs with the same seeds and
+actions, and that the event loop keeps running while they step.
+"""
+
+def make_policy(seed):
+    """
+    Returns a coroutine function that picks random actions after
+    yielding to the event loop, imitating remote inference.
+    """
+    rand = np.random.default_rng(seed)
+    async def policy(obs):
+        await asyncio.sleep(0)
+        return int(rand.integers(0, 6))
+    return policy
+
+async def play(game, seed, n_episodes):
+    """
+    Plays n_episodes and returns every yielded transition.
+    """
+    policy = make_policy(seed)
+    transitions = []
+    for _ in range(n_episodes):
+        async for obs, action, rew, done, info in game.episode(policy):
+            transitions.append((obs, action, rew, done, dict(info)))
+    return transitions
+
+async def tick(n_ticks, stop):
+    """
+    Counts the iterations of the event loop until stop is set.
+    """
+    while not stop.is_set():
+        n_ticks[0] += 1
+        await asyncio.sleep(0)
+
+async def main(env_name, kwargs, n_games, n_episodes):
+    executor = ThreadPoolExecutor(max_workers=4)
+    games = [
+        AsyncGordonGame(env_name, seed=i, executor=executor, **kwargs)\
+            for i in range(n_games)
+    ]
+    n_ticks = [0]
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(tick(n_ticks, stop))
+    results = await asyncio.gather(*[
+        play(game, i, n_episodes) for i,game in enumerate(games)
+    ])
+    stop.set()
+    await ticker
+    for game in games: game.close()
+    executor.shutdown()
+    return results, n_ticks[0]
+
+if __name__=="__main__":
+    n_games = 8
+    n_episodes = 3
+    kwargs = {
+        "targ_range": (1,5),
+        "grid_size": (12,12),
+        "pixel_density": 2,
+        "max_steps": 40,
+    }
+    for env_name in ["gordongames-v1", "gordongames-v4"]:
+        print("Testing Env:", env_name)
+        results, n_ticks = asyncio.run(
+            main(env_name, kwargs, n_games, n_episodes)
+        )
+        assert n_ticks > n_games
+        for i,transitions in enumerate(results):
+            env = gym.make(env_name, **kwargs).unwrapped
+            env.seed(i)
+            obs, _ = env.reset()
+            n_dones = 0
+            for o, action, rew, done, info in transitions:
+                assert np.array_equal(o, obs)
+                obs, r, d, inf = env.step(action)
+                assert r == rew and d == done and dict(inf) == info
+                if done:
+                    n_dones += 1
+                    obs, _ = env.reset()
+            assert n_dones == n_episodes
+
+        # the same game is never stepped concurrently
+        async def double_step():
+            game = AsyncGordonGame(env_name, seed=0, **kwargs)
+            await game.reset()
+            outs = await asyncio.gather(game.step(1), game.step(1))
+            game.close()
+            return outs
+        outs = asyncio.run(double_step())
+        env = gym.make(env_name, **kwargs).unwrapped
+        env.seed(0)
+        env.reset()
+        assert np.array_equal(env.step(1)[0], outs[0][0])
+        assert np.array_equal(env.step(1)[0], outs[1][0])
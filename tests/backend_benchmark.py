@@ -0,0 +1,76 @@
+import gordongames
+from gordongames.envs import VectorGordonGame, ThreadVectorGordonGame, SubprocVectorGordonGame
+import numpy as np
+import os
+import sys
+import time
+
+"""
+Compares the steps per second of the serial, thread and process
+vector env backends as the grid size and pixel density vary. The
+results depend on the number of cpus, which is printed with them, so
+run it on the machine that will train. The number of steps can be
+argued on the command line.
+"""
+
+BACKENDS = {
+    "serial": VectorGordonGame,
+    "threads": ThreadVectorGordonGame,
+    "procs": SubprocVectorGordonGame,
+}
+
+def benchmark(backend, env_name, n_envs, n_steps, kwargs):
+    """
+    Args:
+        backend: str
+            a key of BACKENDS
+        env_name: str
+        n_envs: int
+        n_steps: int
+            the number of vector steps
+        kwargs: dict
+            the env kwargs
+    Returns:
+        steps_per_sec: float
+            the number of single game steps per second
+    """
+    vec = BACKENDS[backend](env_name, n_envs, seed=0, **kwargs)
+    vec.reset()
+    actions = np.random.default_rng(0).integers(0, 6, size=(n_steps,n_envs))
+    start = time.perf_counter()
+    for step in range(n_steps):
+        vec.step(actions[step])
+    duration = time.perf_counter()-start
+    vec.close()
+    return n_steps*n_envs/duration
+
+if __name__=="__main__":
+    n_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_envs = 16
+    env_name = "gordongames-v1"
+    configs = [
+        ((12,12), 2),
+        ((12,12), 10),
+        ((31,31), 1),
+        ((31,31), 5),
+        ((31,31), 15),
+    ]
+    print("cpus:", os.cpu_count(), "envs:", n_envs, "steps:", n_steps)
+    for grid_size, pixel_density in configs:
+        kwargs = {
+            "targ_range": (1,6),
+            "grid_size": grid_size,
+            "pixel_density": pixel_density,
+            "info_keys": (),
+        }
+        results = {
+            backend: benchmark(backend, env_name, n_envs, n_steps, kwargs)\
+                for backend in BACKENDS
+        }
+        print(
+            "grid {}x{} density {:>2}:".format(*grid_size, pixel_density),
+            " ".join(
+                "{} {:8.0f}/s".format(k,v) for k,v in results.items()
+            ),
+            "best:", max(results, key=results.get)
+        )
@@ -0,0 +1,96 @@
+from gordongames.envs.ggames.grid import Grid
+from gordongames.envs.ggames.registry import Register
+from gordongames.envs.ggames.constants import *
+import gordongames
+import gym
+import numpy as np
+import subprocess
+import sys
+import time
+
+HASH_SCRIPT = """
+import gordongames, gym
+env = gym.make("{}", grid_size=(12,12)).unwrapped
+env.seed({})
+env.reset()
+print(env.state_hash())
+"""
+
+if __name__=="__main__":
+    # The encoding layout must not change without bumping
+    # STATE_ENCODING_VERSION
+    grid = Grid((4,5), 1, divide=True)
+    register = Register(grid, n_targs=2)
+    register.move_object(register.player, (0,1))
+    register.move_object(register.pile, (0,2))
+    register.move_object(register.button, (0,4))
+    targs = list(register._targs)
+    register.move_object(targs[0], (3,3))
+    register.move_object(targs[1], (3,0))
+    targs[0].color = COLORS[DEFAULT]
+    register.make_object(obj_type=ITEM, coord=(1,1))
+    register.make_object(obj_type=ITEM, coord=(1,1))
+    expected = bytes([
+        1, 4,0, 5,0, 1, 1,0, 2,0, 4,0, # header, player, pile, button
+        1,0, 15,0, # displayed targs
+        1,0, 18,0, # darkened targs
+        2,0, 6,0, 6,0, # items
+        0,0, # signals
+    ])
+    assert register.encode_state() == expected
+    print("Golden encoding passed")
+
+    kwargs = {
+        "targ_range": (1,6),
+        "grid_size": (12,12),
+        "pixel_density": 5,
+        "rand_pdb": True,
+    }
+    env_names = [
+        "gordongames-v0",
+        "gordongames-v1",
+        "gordongames-v3",
+        "gordongames-v4",
+        "gordongames-v5",
+        "gordongames-v6",
+        "gordongames-v7",
+        "gordongames-v8",
+        "gordongames-v9",
+        "gordongames-v10",
+    ]
+    rand = np.random.default_rng(int(time.time()))
+    for env_name in env_names:
+        print("Testing Env:", env_name)
+        env = gym.make(env_name, **kwargs).unwrapped
+        env2 = gym.make(env_name, **kwargs).unwrapped
+        for trial in range(20):
+            env.seed(trial)
+            env2.seed(trial)
+            np.random.seed(trial)
+            env.reset()
+            np.random.seed(trial)
+            env2.reset()
+            assert env.encode_state() == env2.encode_state()
+            state = env.get_state()
+            actions = rand.integers(0, 6, size=30)
+            encodings = []
+            for actn in actions:
+                _, _, done, _ = env.step(actn)
+                encodings.append(env.encode_state())
+                if done: break
+            env.set_state(state)
+            for actn, encoding in zip(actions, encodings):
+                env.step(actn)
+                assert env.encode_state() == encoding
+
+        obs = env.reset()[0]
+        encoding = env.encode_state()
+        print("Encoding size:", len(encoding), "Obs size:", obs.nbytes)
+
+        # hashes must agree across processes
+        cmd = [sys.executable, "-c", HASH_SCRIPT.format(env_name, 3)]
+        h = int(subprocess.check_output(cmd).decode().strip())
+        env = gym.make(env_name, grid_size=(12,12)).unwrapped
+        env.seed(3)
+        env.reset()
+        assert env.state_hash() == h
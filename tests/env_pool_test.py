@@ -0,0 +1,108 @@
+import gordongames
+import gym
+from gordongames.envs import GordonEnvPool
+from gordongames.envs.ggames.info import make_info_records
+import numpy as np
+
+"""
+Checks that every game of a GordonEnvPool follows the same trajectory
+as a separately seeded env that is stepped with the same actions, no
+matter in which order the games are received.
+"""
+
+if __name__=="__main__":
+    n_envs = 6
+    batch_size = 4
+    n_recvs = 400
+    kwargs = {
+        "targ_range": (1,5),
+        "grid_size": (12,12),
+        "pixel_density": 2,
+        "rand_timing": True,
+        "max_steps": 40,
+    }
+    for start_method in ["fork", "spawn"]:
+        for env_name in ["gordongames-v1", "gordongames-v4"]:
+            print("Testing Env:", env_name, start_method)
+            pool = GordonEnvPool(
+                env_name,
+                n_envs,
+                batch_size=batch_size,
+                num_workers=3,
+                seed=3,
+                start_method=start_method,
+                **kwargs
+            )
+            envs = [
+                gym.make(env_name, **kwargs).unwrapped\
+                    for _ in range(n_envs)
+            ]
+            records = make_info_records(n_envs)
+            children = np.random.SeedSequence(3).spawn(n_envs)
+            expected = []
+            for i,(env,child) in enumerate(zip(envs, children)):
+                env.seed(child)
+                env.enable_info_records(records, i)
+                expected.append((env.reset()[0], 0, False, records[i]))
+            first = np.stack([o for o,_,_,_ in expected])
+
+            pool.async_reset()
+            rand = np.random.default_rng(0)
+            counts = np.zeros(n_envs, dtype=int)
+            n_dones = 0
+            for _ in range(n_recvs):
+                obs, rews, dones, infos, env_ids = pool.recv()
+                assert len(env_ids) == batch_size
+                assert len(set(env_ids.tolist())) == batch_size
+                for k,i in enumerate(env_ids):
+                    o, rew, done, info = expected[i]
+                    assert np.array_equal(obs[k], o)
+                    assert rews[k] == rew and dones[k] == done
+                    assert infos[k] == info
+                    counts[i] += 1
+                actions = rand.integers(0, 6, size=len(env_ids))
+                for i,action in zip(env_ids, actions):
+                    env = envs[i]
+                    o, rew, done, _ = env.step(int(action))
+                    if done:
+                        n_dones += 1
+                        o = env.reset()[0]
+                    expected[i] = (o, rew, done, records[i].copy())
+                pool.send(actions, env_ids)
+            # every game is received, none are starved
+            assert np.all(counts > 0), counts
+            assert n_dones > 0
+
+            # games cannot be sent while they are in flight
+            # and a rejected send leaves their actions unchanged
+            in_flight = np.flatnonzero(pool.in_flight)[:1]
+            assert len(in_flight) == 1
+            prev_actions = pool.actions.copy()
+            new_actions = (prev_actions[in_flight]+1)%6
+            try:
+                pool.send(new_actions, in_flight)
+                raise AssertionError("expected an AssertionError")
+            except AssertionError as e:
+                assert "before they are received" in str(e)
+            assert np.array_equal(pool.actions, prev_actions)
+
+            # synchronous commands are rejected while games are in
+            # flight, so the answers of the games are not taken as the
+            # answers of the commands
+            n_in_flight = pool.in_flight.sum()
+            for fxn in [lambda: pool.seed(4), lambda: pool.reset_at(0)]:
+                try:
+                    fxn()
+                    raise AssertionError("expected an AssertionError")
+                except AssertionError as e:
+                    assert "all games are received" in str(e)
+            assert pool.in_flight.sum() == n_in_flight
+
+            # the synchronous interface works once all games are
+            # received
+            pool.batch_size = len(pool.ready) + pool.in_flight.sum()
+            pool.recv()
+            pool.batch_size = batch_size
+            obs, _ = pool.reset(seed=3)
+            assert np.array_equal(obs, first)
+            pool.close()
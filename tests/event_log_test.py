@@ -0,0 +1,81 @@
+from gordongames.envs.ggames.events import EventLog
+from gordongames.envs.ggames.constants import *
+import gordongames
+import gym
+import numpy as np
+import time
+
+if __name__=="__main__":
+    # Ring buffer keeps the newest records in order
+    log = EventLog(capacity=4)
+    for i in range(10):
+        log.step = i
+        log.record(LOG_MOVE, 0, i, i+1)
+    records = log.drain()
+    assert records.shape == (4, len(LOG_FIELDS))
+    assert np.array_equal(records[:,0], [6,7,8,9])
+    assert log.n_overwritten == 6
+    assert len(log) == 0 and len(log.drain()) == 0
+    log.record(LOG_RESET)
+    log.record(LOG_MOVE)
+    assert np.array_equal(log.drain()[:,1], [LOG_RESET, LOG_MOVE])
+    print("Ring buffer passed")
+
+    kwargs = {
+        "targ_range": (1,6),
+        "grid_size": (12,12),
+        "pixel_density": 1,
+        "rand_pdb": True,
+    }
+    env_names = [
+        "gordongames-v0",
+        "gordongames-v1",
+        "gordongames-v4",
+        "gordongames-v6",
+        "gordongames-v9",
+    ]
+    rand = np.random.default_rng(int(time.time()))
+    for env_name in env_names:
+        print("Testing Env:", env_name)
+        env = gym.make(env_name, **kwargs).unwrapped
+        register = env.controller.register
+        assert len(env.drain_events()) == 0
+        env.enable_event_log(capacity=100000)
+        n_cols = register.grid.shape[1]
+        for trial in range(20):
+            env.reset()
+            player = register.flat_index(register.player.coord)
+            n_items = register.n_items
+            for step in range(100):
+                _, _, done, _ = env.step(int(rand.integers(0,6)))
+                if done: break
+            records = env.drain_events()
+            assert records[0,1] == LOG_RESET
+            assert register.event_log.step == env.step_count
+            assert np.all(np.diff(records[:,0]) >= 0)
+            # replaying the moves recovers the player location
+            for _, event, _, src, dst in records:
+                if event == LOG_MOVE:
+                    assert src == player
+                    player = dst
+            assert player == register.flat_index(register.player.coord)
+            events = records[:,1]
+            n_items += np.sum(events == LOG_PILE_GRAB)
+            n_items -= np.sum(
+                (events==LOG_PILE_DELETE)&(records[:,2]==TYPE2PRIORITY[ITEM])
+            )
+            assert n_items == register.n_items
+            if register.is_empty((0,0)) and done and register.n_items>0:
+                assert LOG_BUTTON in events
+
+        # overhead of the log
+        for enabled in [False, True]:
+            if enabled: env.enable_event_log()
+            else: register.disable_event_log()
+            env.reset()
+            start = time.time()
+            for i in range(3000):
+                _, _, done, _ = env.step(int(rand.integers(0,6)))
+                if done: env.reset()
+            print("Event log enabled:", enabled,
+                  "Step time:", (time.time()-start)/3000)
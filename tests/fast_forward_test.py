@@ -0,0 +1,130 @@
+from gordongames.envs.ggames.info import make_info_records, write_info_record
+from gordongames.envs.ggames.constants import STAY
+import gordongames
+import gym
+import numpy as np
+import time
+
+if __name__=="__main__":
+    kwargs = {
+        "targ_range": (1,6),
+        "grid_size": (12,12),
+        "pixel_density": 2,
+        "rand_pdb": True,
+        "rand_timing": True,
+        "timing_p": 0.6,
+    }
+    env_names = [
+        "gordongames-v0",
+        "gordongames-v1",
+        "gordongames-v3",
+        "gordongames-v4",
+        "gordongames-v5",
+        "gordongames-v6",
+        "gordongames-v7",
+        "gordongames-v8",
+        "gordongames-v9",
+        "gordongames-v10",
+        "gordongames-v11",
+        "gordongames-v12",
+    ]
+    rand = np.random.default_rng(int(time.time()))
+    total_ff = 0
+    total_step = 0
+    for env_name in env_names:
+        print("Testing Env:", env_name)
+        env = gym.make(env_name, **kwargs).unwrapped
+        env2 = gym.make(env_name, **kwargs).unwrapped
+        for trial in range(10):
+            env.seed(trial)
+            env2.seed(trial)
+            np.random.seed(trial)
+            frames, records = env.reset(fast_forward=True)
+            assert not env.controller.is_animating
+            assert len(frames) == len(records) == env.step_count+1
+
+            # step by step equivalent
+            np.random.seed(trial)
+            obs, _ = env2.reset()
+            frames2 = [obs]
+            records2 = make_info_records(1)
+            while env2.controller.is_animating:
+                obs, _, done, info = env2.step(STAY)
+                assert not done
+                frames2.append(obs)
+                record = make_info_records(1)
+                write_info_record(record, 0, info)
+                records2 = np.concatenate([records2, record])
+            assert np.array_equal(frames, np.stack(frames2))
+            assert np.array_equal(records, records2)
+
+            # the rest of the episode is the same
+            done = False
+            while not done:
+                actn = int(rand.integers(0,6))
+                np.random.seed(env.step_count)
+                obs, rew, done, info = env.step(actn)
+                np.random.seed(env2.step_count)
+                obs2, rew2, done2, info2 = env2.step(actn)
+                assert np.array_equal(obs, obs2)
+                assert rew == rew2 and done == done2
+                assert info == info2, (info, info2)
+
+        # the fast forward must not be slower than stepping through the
+        # animation. The resets are interleaved so that both are timed
+        # under the same load.
+        ff_times, step_times = [], []
+        for i in range(500):
+            start = time.perf_counter()
+            env.reset(fast_forward=True)
+            ff_times.append(time.perf_counter()-start)
+            start = time.perf_counter()
+            env2.reset()
+            while env2.controller.is_animating:
+                env2.step(STAY)
+            step_times.append(time.perf_counter()-start)
+        ff_time = np.median(ff_times)
+        step_time = np.median(step_times)
+        print("Fast forward reset time:", ff_time)
+        print("Step by step time:", step_time)
+        # single step animations only add the cost of allocating the
+        # outputs, which is within the timing noise
+        assert ff_time <= 1.25*step_time
+        total_ff += ff_time
+        total_step += step_time
+    print("Total fast forward time:", total_ff)
+    print("Total step by step time:", total_step)
+    assert total_ff <= total_step
+
+    # the fast forward stops before max_steps when the animation is
+    # longer, so the step that reaches max_steps ends the episode with
+    # the max punishment as it does when stepping
+    for env_name in ["gordongames-v1", "gordongames-v4"]:
+        print("Testing max_steps:", env_name)
+        kwargs = {"targ_range": (6,6), "grid_size": (9,9)}
+        for max_steps in [1, 2, 3, 5]:
+            env = gym.make(env_name, max_steps=max_steps, **kwargs)
+            env2 = gym.make(env_name, max_steps=max_steps, **kwargs)
+            env, env2 = env.unwrapped, env2.unwrapped
+            env.seed(max_steps)
+            env2.seed(max_steps)
+            np.random.seed(max_steps)
+            frames, records = env.reset(fast_forward=True)
+            assert env.controller.is_animating
+            assert len(frames) == len(records) == max_steps
+            assert env.step_count == max_steps-1
+
+            np.random.seed(max_steps)
+            obs, _ = env2.reset()
+            frames2 = [obs]
+            for step in range(max_steps-1):
+                obs, _, done, _ = env2.step(STAY)
+                assert not done
+                frames2.append(obs)
+            assert np.array_equal(frames, np.stack(frames2))
+
+            obs, rew, done, _ = env.step(STAY)
+            obs2, rew2, done2, _ = env2.step(STAY)
+            assert done and done2
+            assert rew == rew2 == env.controller.max_punishment
+            assert np.array_equal(obs, obs2)
@@ -0,0 +1,166 @@
+from gordongames.envs.ggames.info import LazyInfo, make_info_records
+from gordongames.envs.ggames.utils import get_aligned_items
+from gordongames.envs.ggames.constants import *
+import gordongames
+import gym
+import numpy as np
+import pickle
+import json
+import time
+
+if __name__=="__main__":
+    # LazyInfo behaves like a dict
+    calls = []
+    def fxn(x):
+        calls.append(x)
+        return x*2
+    info = LazyInfo({"a": 1})
+    info.set_lazy("b", fxn, 2)
+    assert len(info) == 2 and "b" in info and len(calls) == 0
+    assert info["a"] == 1 and len(calls) == 0
+    assert info["b"] == 4 and info["b"] == 4 and len(calls) == 1
+    info.set_lazy("c", fxn, 3)
+    assert info.get("c") == 6 and info.get("d", 7) == 7
+    info.set_lazy("d", fxn, 4)
+    assert set(info.keys()) == {"a","b","c","d"}
+    assert info == {"a": 1, "b": 4, "c": 6, "d": 8}
+    info2 = LazyInfo({"a": 1, "b": 4, "c": 6})
+    info2.set_lazy("d", fxn, 4)
+    assert info == info2 and info2 == info
+    info.set_lazy("e", fxn, 5)
+    assert type(info.copy()) == dict and info.copy()["e"] == 10
+    info.set_lazy("f", fxn, 6)
+    assert pickle.loads(pickle.dumps(info)) == dict(info)
+    info.set_lazy("g", fxn, 7)
+    assert json.loads(json.dumps(info))["g"] == 14
+    info.set_lazy("h", fxn, 8)
+    info["h"] = 0
+    assert info["h"] == 0 and 8 not in calls
+    print("LazyInfo passed")
+
+    kwargs = {
+        "targ_range": (1,6),
+        "grid_size": (12,12),
+        "pixel_density": 1,
+        "rand_pdb": True,
+    }
+    env_names = [
+        "gordongames-v0",
+        "gordongames-v1",
+        "gordongames-v3",
+        "gordongames-v4",
+        "gordongames-v5",
+        "gordongames-v6",
+        "gordongames-v7",
+        "gordongames-v8",
+        "gordongames-v9",
+        "gordongames-v10",
+    ]
+    can_tasks = {"gordongames-v4", "gordongames-v8", "gordongames-v10"}
+    rand = np.random.default_rng(int(time.time()))
+    for env_name in env_names:
+        print("Testing Env:", env_name)
+        env = gym.make(env_name, **kwargs).unwrapped
+        register = env.controller.register
+        for trial in range(20):
+            env.reset()
+            done = False
+            while not done:
+                # the info must reflect the state before the step
+                n_aligned = len(get_aligned_items(
+                    items=register.items,
+                    targs=register.targs,
+                    min_row=0
+                ))
+                is_pop = int(register.pile in\
+                        register.coord_register[register.player.coord])
+                n_items = register.n_items
+                assert n_items == len(
+                    [o for o in register.obj_register if o.type == ITEM]
+                )
+                actn = int(rand.integers(0,6))
+                was_grabbing = env.is_grabbing
+                _, _, done, info = env.step(actn)
+                assert type(info["n_targs"]) == int
+                # the counting games place items before the info is made
+                if actn == GRAB and env_name in can_tasks: continue
+                assert info["n_aligned"] == n_aligned
+                assert info["is_pop"] == is_pop
+                if "player_loc" in info:
+                    assert info["player_loc"] == register.player.coord
+                if env_name in can_tasks or env_name in {
+                                "gordongames-v7", "gordongames-v9"}:
+                    continue
+                grab = not was_grabbing if actn == GRAB else was_grabbing
+                grab = env.get_other_obj_idx(register.player, grab)
+                assert info["grab"] == grab
+
+        # cost of the info when only cheap keys are read
+        env.reset()
+        start = time.time()
+        for i in range(3000):
+            _, _, done, info = env.step(int(rand.integers(0,6)))
+            info["n_targs"], info["n_items"]
+            if done: env.reset()
+        print("Step time:", (time.time()-start)/3000)
+
+    # Selecting info keys
+    for env_name in env_names:
+        print("Testing info_keys:", env_name)
+        for info_keys in [(), ("n_targs",), ("n_items","grab","end_loc")]:
+            env = gym.make(env_name, info_keys=info_keys, **kwargs)
+            env = env.unwrapped
+            infos = []
+            for trial in range(5):
+                env.reset()
+                done = False
+                while not done:
+                    _, _, done, info = env.step(int(rand.integers(0,6)))
+                    assert set(info.keys()) == set(info_keys)
+                    infos.append(info)
+            if len(info_keys) == 0:
+                # every step returns its own dict, so writes to one
+                # info (i.e. by a wrapper) do not leak into the others
+                assert len(set(id(info) for info in infos)) == len(infos)
+                infos[0]["TimeLimit.truncated"] = True
+                _, _, _, info = env.step(0)
+                assert len(info) == 0
+                assert all([len(info) == 0 for info in infos[1:]])
+        env.reset()
+        start = time.time()
+        for i in range(3000):
+            _, _, done, info = env.step(int(rand.integers(0,6)))
+            if done: env.reset()
+        print("Step time with no info:", (time.time()-start)/3000)
+
+    # Structured info records match the info dicts
+    for env_name in env_names:
+        print("Testing info records:", env_name)
+        env = gym.make(env_name, **kwargs).unwrapped
+        env2 = gym.make(env_name, **kwargs).unwrapped
+        records = make_info_records(3)
+        env.enable_info_records(records, index=1)
+        for trial in range(5):
+            env.seed(trial)
+            env2.seed(trial)
+            np.random.seed(trial)
+            env.reset()
+            np.random.seed(trial)
+            env2.reset()
+            done = False
+            while not done:
+                actn = int(rand.integers(0,6))
+                np.random.seed(env.step_count)
+                _, _, done, info = env.step(actn)
+                np.random.seed(env2.step_count)
+                _, _, done2, info2 = env2.step(actn)
+                assert done == done2 and info == dict()
+                for key,val in info2.items():
+                    assert np.array_equal(records[1][key], val), key
+        assert np.all(records[0] == make_info_records(1)[0])
+        env.reset()
+        start = time.time()
+        for i in range(3000):
+            _, _, done, info = env.step(int(rand.integers(0,6)))
+            if done: env.reset()
+        print("Step time with records:", (time.time()-start)/3000)
@@ -0,0 +1,117 @@
+from gordongames.envs.ggames.layouts import LayoutLibrary
+import gordongames
+import gym
+import numpy as np
+import multiprocessing as mp
+import pickle
+import tempfile
+import os
+
+"""
+Creates layout libraries and checks that reset(layout_index=i) loads
+the stored layouts without sampling.
+"""
+
+def get_layout(env):
+    """
+    Returns the layout of the current episode of the env.
+    """
+    register = env.controller.register
+    return (
+        register.n_targs,
+        [register.player.coord[1], register.pile.coord[1],
+            register.button.coord[1]],
+        sorted(tuple(t.coord) for t in register.targs),
+    )
+
+def read_obs(args):
+    """
+    Resets a new env from the argued library in a worker process.
+    """
+    env_name, kwargs, library, idx = args
+    env = gym.make(env_name, **kwargs).unwrapped
+    env.set_layout_library(library)
+    obs, _ = env.reset(layout_index=idx)
+    return obs
+
+if __name__=="__main__":
+    n_layouts = 300
+    kwargs = {
+        "targ_range": (1,6),
+        "grid_size": (12,12),
+        "pixel_density": 2,
+    }
+    env_names = [
+        "gordongames-v0",
+        "gordongames-v1",
+        "gordongames-v3",
+        "gordongames-v4",
+        "gordongames-v7",
+        "gordongames-v8",
+        "gordongames-v11",
+    ]
+    tmp_dir = tempfile.mkdtemp()
+    for env_name in env_names:
+        print("Testing Env:", env_name)
+        path = os.path.join(tmp_dir, env_name)
+        env = gym.make(env_name, **kwargs).unwrapped
+        library = env.make_layout_library(path, n_layouts, seed=1)
+        assert len(library) == n_layouts
+        assert isinstance(library.records, np.memmap)
+        assert library.meta["env_id"] == env_name
+
+        # the same seed makes the same library
+        env2 = gym.make(env_name, **kwargs).unwrapped
+        lib2 = env2.make_layout_library(path+"_2.npy", n_layouts, seed=1)
+        assert np.array_equal(library.records, lib2.records)
+
+        # the episodes start from the stored layouts
+        env2.set_layout_library(path)
+        for idx in [0, 7, n_layouts-1]:
+            n_targs, ppb_cols, targ_coords = library[idx]
+            state = env.rand.bit_generator.state
+            obs, _ = env.reset(layout_index=idx)
+            if env_name in {"gordongames-v0","gordongames-v1"}:
+                # nothing is sampled
+                assert env.rand.bit_generator.state == state
+            assert get_layout(env) == (n_targs, ppb_cols, sorted(targ_coords))
+            assert n_targs in range(kwargs["targ_range"][0],
+                                    kwargs["targ_range"][1]+1)
+            obs2, _ = env2.reset(layout_index=idx)
+            assert np.array_equal(obs, obs2)
+            done = False
+            while not done:
+                _, _, done, _ = env.step(0)
+            # sampled resets are unaffected
+            env.reset()
+
+        # worker processes share the file
+        lib = pickle.loads(pickle.dumps(library))
+        assert np.array_equal(lib.records, library.records)
+        with mp.get_context("spawn").Pool(2) as pool:
+            idxs = [3, 11]
+            args = [(env_name, kwargs, library, i) for i in idxs]
+            for i,obs in zip(idxs, pool.map(read_obs, args)):
+                assert np.array_equal(obs, env.reset(layout_index=i)[0])
+
+        # libraries are rejected by games with a different layout
+        # distribution
+        for key,val in [("rand_pdb", False), ("hold_outs", {3}),
+                        ("zipf_exponent", 1.5), ("player_on_pile", False),
+                        ("spacing_limit", 2), ("sym_distr", False),
+                        ("n_held_outs", 2)]:
+            kwargs2 = {**kwargs, key: val}
+            env2 = gym.make(env_name, **kwargs2).unwrapped
+            try:
+                env2.set_layout_library(library)
+                raise AssertionError("expected an AssertionError")
+            except AssertionError as e:
+                assert "made with {}=".format(key) in str(e), key
+        # a library of the same options is accepted
+        kwargs2 = {**kwargs, "hold_outs": {3}}
+        env = gym.make(env_name, **kwargs2).unwrapped
+        lib3 = env.make_layout_library(path+"_3.npy", 50, seed=2)
+        assert 3 not in lib3.records["n_targs"]
+        env2 = gym.make(env_name, **kwargs2).unwrapped
+        env2.set_layout_library(lib3)
+        env2.reset(layout_index=0)
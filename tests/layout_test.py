@@ -0,0 +1,96 @@
+import gordongames
+import gym
+import numpy as np
+import time
+
+"""
+Compares the initial layouts of episodes that were generated in bulk
+by the LayoutBuffer against the layouts of the scalar reset path.
+"""
+
+def get_layout_stats(env, n_resets):
+    """
+    Collects histograms of the number of targets, the player, pile,
+    and button columns, the target coordinates and the column gaps
+    between targets over many resets.
+
+    Returns:
+        stats: dict
+            keys: str
+            vals: ndarray
+                normalized histograms
+    """
+    register = env.controller.register
+    n_rows, n_cols = register.grid.shape
+    stats = {
+        "n_targs": np.zeros(n_cols+1),
+        "player": np.zeros(n_cols),
+        "pile": np.zeros(n_cols),
+        "button": np.zeros(n_cols),
+        "targ_cells": np.zeros(n_rows*n_cols),
+        "gaps": np.zeros(n_rows*n_cols),
+    }
+    for i in range(n_resets):
+        env.reset()
+        stats["n_targs"][register.n_targs] += 1
+        stats["player"][register.player.coord[1]] += 1
+        stats["pile"][register.pile.coord[1]] += 1
+        stats["button"][register.button.coord[1]] += 1
+        coords = sorted(t.coord for t in register.targs)
+        for row,col in coords:
+            stats["targ_cells"][int(row*n_cols + col)] += 1
+        for c0, c1 in zip(coords[:-1], coords[1:]):
+            gap = (c1[0]-c0[0])*n_cols + (c1[1]-c0[1])
+            stats["gaps"][int(gap)] += 1
+        # the targets must never overlap or leave the target area
+        assert len(set(coords)) == len(coords)
+        for coord in coords:
+            assert register.grid.is_inbounds(coord)
+            assert not register.grid.is_playable(coord)
+    return {k: v/max(v.sum(),1) for k,v in stats.items()}
+
+if __name__=="__main__":
+    n_resets = 4000
+    tv_thresh = 0.06
+    kwargs = {
+        "targ_range": (1,7),
+        "grid_size": (12,12),
+        "pixel_density": 1,
+    }
+    configs = [
+        ("gordongames-v0", {}),
+        ("gordongames-v1", {"hold_outs": {3}}),
+        ("gordongames-v1", {"zipf_exponent": 1, "n_held_outs": 2}),
+        ("gordongames-v2", {"targ_range": (1,4)}),
+        ("gordongames-v3", {"rand_pdb": False}),
+        ("gordongames-v4", {"spacing_limit": 2}),
+        ("gordongames-v6", {"player_on_pile": False}),
+        ("gordongames-v7", {}),
+        ("gordongames-v8", {"rand_pdb": False, "sym_distr": True}),
+    ]
+    for env_name, config in configs:
+        print("Testing Env:", env_name, config)
+        env_kwargs = {**kwargs, **config}
+        env = gym.make(env_name, **env_kwargs).unwrapped
+        env.seed(int(time.time()))
+        buffered = gym.make(env_name, n_layouts=128, **env_kwargs).unwrapped
+        buffered.seed(int(time.time())+1)
+        stats = get_layout_stats(env, n_resets)
+        buff_stats = get_layout_stats(buffered, n_resets)
+        assert buffered.controller.layouts is not None
+        for k in stats.keys():
+            tv = np.abs(stats[k]-buff_stats[k]).sum()/2
+            assert tv < tv_thresh, (k, tv)
+
+        # reseeding replaces the buffered layouts
+        buffered.seed(1)
+        obs1, _ = buffered.reset()
+        buffered.reset()
+        buffered.seed(1)
+        obs2, _ = buffered.reset()
+        assert np.array_equal(obs1, obs2)
+
+        # argued quantities and held out episodes do not use the buffer
+        buffered.reset(n_targs=2)
+        assert buffered.controller.layout is None
+        assert buffered.controller.n_targs == 2
@@ -0,0 +1,78 @@
+from gordongames.envs.ggames.controllers import ClusterMatchController, ReverseClusterMatchController
+from gordongames.envs.ggames.registry import GameObject
+from gordongames.envs.ggames.utils import max_key, get_max_row, get_max_row_bits, get_bitboard, count_aligned_bits, get_aligned_items
+from gordongames.envs.ggames.constants import *
+import numpy as np
+
+def place_items(controller, coords):
+    """
+    Removes all items from the register and places new items at the
+    argued coords in the argued order.
+    """
+    register = controller.register
+    register.delete_items()
+    for coord in coords:
+        register.make_object(ITEM, coord)
+
+if __name__=="__main__":
+    # max_key returns the key of the largest value, and the smallest
+    # key in case of equal values, independent of the dict order
+    assert max_key(dict()) is None
+    assert max_key({3: 0}) is None
+    assert max_key({1: 3, 2: 1}) == 1
+    assert max_key({2: 1, 1: 3}) == 1
+    assert max_key({4: 2, 1: 2, 3: 1}) == 1
+    assert max_key({5: 1, 2: 4, 7: 4}) == 2
+
+    # the bitboard max row matches the object max row
+    rand = np.random.default_rng(0)
+    n_rows, n_cols = 9, 7
+    for trial in range(300):
+        n_objs = rand.integers(0, 12)
+        coords = set()
+        while len(coords) < n_objs:
+            coords.add(tuple(rand.integers(0, (n_rows,n_cols))))
+        objs = [GameObject(ITEM, COLORS[ITEM], coord=c) for c in coords]
+        min_row = int(rand.integers(0, 3))
+        bits = get_bitboard(objs, n_cols)
+        max_row, count = get_max_row(objs, min_row=min_row, ret_count=True)
+        assert (max_row, count) == get_max_row_bits(bits, n_cols, min_row)
+
+        targs = [
+            GameObject(TARG, COLORS[TARG], coord=(n_rows-1, c))
+            for c in rand.choice(n_cols, rand.integers(1,n_cols),False)
+        ]
+        n_aligned = count_aligned_bits(
+            bits, get_bitboard(targs, n_cols), n_cols, min_row=min_row
+        )
+        assert n_aligned == len(get_aligned_items(
+            set(objs), set(targs), min_row=min_row
+        ))
+
+    # The cluster rewards use the row with the most items no matter in
+    # which order the items were placed. Previously the row that the
+    # item set happened to yield last was used.
+    kwargs = {"grid_size": (9,9), "targ_range": (3,3), "harsh": True}
+    controller = ClusterMatchController(**kwargs)
+    controller.reset(n_targs=3)
+    majority = [(2,1), (2,3), (2,5)]
+    for coords in [majority + [(4,0)], [(4,0)] + majority]:
+        place_items(controller, coords)
+        assert controller.calculate_reward(harsh=True) == -1
+        assert controller.calculate_reward(harsh=False) == (3-1)/3 - 1/3
+    place_items(controller, [(4,0)] + majority[:2])
+    assert controller.calculate_reward(harsh=True) == 0
+    place_items(controller, majority)
+    assert controller.calculate_reward(harsh=True) == 1
+
+    controller = ReverseClusterMatchController(**kwargs)
+    controller.reset(n_targs=3)
+    targ_cols = sorted(t.coord[1] for t in controller.register.targs)
+    row = [(2, c) for c in targ_cols]
+    for coords in [row[:2] + [(4, targ_cols[2])],
+                   [(4, targ_cols[2])] + row[:2]]:
+        place_items(controller, coords)
+        assert controller.calculate_reward(harsh=True) == 1
+    place_items(controller, row)
+    assert controller.calculate_reward(harsh=True) == 0
+    print("All tests passed")
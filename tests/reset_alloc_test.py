@@ -0,0 +1,82 @@
+import gordongames
+import gym
+import numpy as np
+import tracemalloc
+import time
+
+"""
+Checks that env.reset reuses the grid buffer and the game objects and
+that, once warmed up, resetting does not allocate anything other than
+the returned observation.
+"""
+
+def play(env, rand, n_steps=30):
+    """
+    Steps the env with random actions to leave items and signals
+    behind for the next reset.
+    """
+    for i in range(n_steps):
+        _, _, done, _ = env.step(int(rand.integers(0,6)))
+        if done: break
+
+def get_obj_ids(register):
+    """
+    Returns the ids of all registered, pooled and freed objects.
+    """
+    ids = {id(o) for o in register.obj_register}
+    ids |= {id(o) for o in register._targ_pool}
+    for free in register._free_objs.values():
+        ids |= {id(o) for o in free}
+    return ids
+
+if __name__=="__main__":
+    n_resets = 100
+    alloc_thresh = 4096 # bytes
+    kwargs = {
+        "targ_range": (1,10),
+        "grid_size": (31,31),
+        "pixel_density": 5,
+    }
+    env_names = [
+        "gordongames-v0",
+        "gordongames-v1",
+        "gordongames-v4",
+        "gordongames-v7",
+        "gordongames-v8",
+        "gordongames-v9",
+        "gordongames-v11",
+        "gordongames-v12",
+    ]
+    rand = np.random.default_rng(int(time.time()))
+    gordon_files = [tracemalloc.Filter(True, "*gordongames*")]
+    for env_name in env_names:
+        print("Testing Env:", env_name)
+        env = gym.make(env_name, **kwargs).unwrapped
+        register = env.controller.register
+        grid_buffer = env.controller.grid._grid
+        obs_size = grid_buffer.nbytes
+        # warm up so that every object and set has reached its size
+        for trial in range(50):
+            env.reset()
+            play(env, rand)
+        play(env, rand)
+        obj_ids = get_obj_ids(register)
+
+        tracemalloc.start()
+        # the env holds on to the last observation
+        env.reset()
+        before = tracemalloc.take_snapshot().filter_traces(gordon_files)
+        for trial in range(n_resets):
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+            obs, _ = env.reset()
+            _, peak = tracemalloc.get_traced_memory()
+            # only the returned observation is allocated
+            assert peak-start < obs_size + alloc_thresh, peak-start
+            assert env.controller.grid._grid is grid_buffer
+            assert get_obj_ids(register) == obj_ids
+        del obs
+        after = tracemalloc.take_snapshot().filter_traces(gordon_files)
+        tracemalloc.stop()
+        growth = sum(s.size_diff for s in after.compare_to(before,"lineno"))
+        assert growth < alloc_thresh, growth
@@ -0,0 +1,115 @@
+import gordongames
+import gym
+from gordongames.oracles import GordonOracle, RandOracle
+import numpy as np
+import multiprocessing as mp
+
+"""
+Checks that every random draw of the envs comes from the SeedSequence
+tree of GordonGame.seed.
+"""
+
+def run_episodes(env, n_episodes, policy):
+    """
+    Collects the reset observations of n_episodes episodes.
+
+    Args:
+        env: GordonGame
+        n_episodes: int
+        policy: callable(env) -> action
+    Returns:
+        observations: list of ndarrays
+    """
+    observations = []
+    for ep in range(n_episodes):
+        obs, _ = env.reset()
+        observations.append(obs)
+        done = False
+        while not done:
+            _, _, done, _ = env.step(policy(env))
+    return observations
+
+def worker_obs(args):
+    """
+    Seeds a new env with the argued SeedSequence in a worker process.
+    """
+    env_name, kwargs, seed_seq = args
+    env = gym.make(env_name, **kwargs).unwrapped
+    env.seed(seed_seq)
+    return env.reset()[0]
+
+if __name__=="__main__":
+    n_episodes = 5
+    kwargs = {
+        "targ_range": (1,5),
+        "grid_size": (12,12),
+        "pixel_density": 2,
+        "rand_pdb": False,
+        "sym_distr": True,
+        "rand_timing": True,
+        "max_steps": 60,
+    }
+    env_names = [
+        "gordongames-v0",
+        "gordongames-v1",
+        "gordongames-v4",
+        "gordongames-v7",
+        "gordongames-v8",
+        "gordongames-v9",
+    ]
+    for env_name in env_names:
+        print("Testing Env:", env_name)
+        env = gym.make(env_name, **kwargs).unwrapped
+        env2 = gym.make(env_name, **kwargs).unwrapped
+        # the previous episode does not leak into a seeded episode
+        run_episodes(env2, 3, lambda e: 0)
+
+        # using the oracle does not change the episodes
+        oracle = GordonOracle(env_name)
+        env.seed(7)
+        env2.seed(7)
+        rand = np.random.default_rng(0)
+        obs = run_episodes(env, n_episodes, oracle)
+        obs2 = run_episodes(env2, n_episodes, lambda e: rand.integers(6))
+        for o1, o2 in zip(obs, obs2):
+            assert np.array_equal(o1, o2)
+
+        # integer seeds match seeding with the root SeedSequence
+        env.seed(np.random.SeedSequence(7))
+        assert np.array_equal(env.reset()[0], obs[0])
+        assert env.seed(7) == [7]
+
+        # spawned children are independent of the parent and of each
+        # other and reproduce in other processes
+        env.seed(7)
+        children = env.spawn(2)
+        child_obs = []
+        for child in children:
+            env2.seed(child)
+            child_obs.append(env2.reset()[0])
+        with mp.get_context("spawn").Pool(2) as pool:
+            args = [(env_name, kwargs, child) for child in children]
+            for o1, o2 in zip(child_obs, pool.map(worker_obs, args)):
+                assert np.array_equal(o1, o2)
+        seqs = [env.rand.integers(2**62, size=8)]
+        for child in children:
+            env2.seed(child)
+            seqs.append(env2.rand.integers(2**62, size=8))
+        assert len({tuple(s) for s in seqs}) == len(seqs)
+        assert len(env.spawn(2)[0].spawn_key) == 1
+        assert env.spawn(1)[0].spawn_key != children[0].spawn_key
+
+    # the random oracle draws from its own generator
+    env = gym.make("gordongames-v1", **kwargs).unwrapped
+    env.seed(0)
+    np.random.seed(0)
+    global_state = np.random.get_state()[1].copy()
+    actions = []
+    for seed in [env.spawn(1)[0], 3, 3]:
+        oracle = RandOracle(seed=seed)
+        actions.append([oracle(env) for _ in range(50)])
+        assert all(0 <= a < 5 for a in actions[-1])
+    assert actions[1] == actions[2] and actions[0] != actions[1]
+    assert np.array_equal(np.random.get_state()[1], global_state)
+    oracle = RandOracle(seed=env.oracle_rand)
+    assert oracle.rand is env.oracle_rand
@@ -0,0 +1,100 @@
+import gordongames
+import gym
+import numpy as np
+import time
+
+def rollout(env, actions):
+    """
+    Steps the env through the actions and collects the results.
+    """
+    results = []
+    for actn in actions:
+        obs, rew, done, info = env.step(actn)
+        results.append((obs, rew, done, info))
+        if done: break
+    return results
+
+if __name__=="__main__":
+    n_trials = 20
+    n_steps = 30
+    kwargs = {
+        "targ_range": (1,6),
+        "grid_size": (12,12),
+        "pixel_density": 2,
+        "rand_pdb": True,
+        "rand_timing": True,
+        "timing_p": 0.6,
+    }
+    env_names = [
+        "gordongames-v0",
+        "gordongames-v1",
+        "gordongames-v3",
+        "gordongames-v4",
+        "gordongames-v5",
+        "gordongames-v6",
+        "gordongames-v7",
+        "gordongames-v8",
+        "gordongames-v9",
+        "gordongames-v10",
+    ]
+    rand = np.random.default_rng(int(time.time()))
+    for env_name in env_names:
+        print("Testing Env:", env_name)
+        env = gym.make(env_name, **kwargs).unwrapped
+        for trial in range(n_trials):
+            env.reset()
+            actions = rand.integers(0, 6, size=int(rand.integers(0,20)))
+            rollout(env, actions)
+            state = env.get_state()
+            obs = env.controller.grid.grid
+            actions = rand.integers(0, 6, size=n_steps)
+
+            np.random.seed(trial)
+            branch1 = rollout(env, actions)
+
+            # continue the episode so that the restore is not trivial
+            rollout(env, rand.integers(0, 6, size=n_steps))
+            assert np.array_equal(env.set_state(state), obs)
+
+            np.random.seed(trial)
+            branch2 = rollout(env, actions)
+            assert len(branch1) == len(branch2)
+            for (o1,r1,d1,i1), (o2,r2,d2,i2) in zip(branch1, branch2):
+                assert np.array_equal(o1, o2)
+                assert r1 == r2 and d1 == d2
+                for k in i1.keys():
+                    assert np.array_equal(i1[k], i2[k]), k
+
+        # the layout buffer is restored, so episodes that begin after
+        # the restore are the same. The small buffer is refilled
+        # between the snapshot and the restore.
+        env = gym.make(env_name, n_layouts=3, **kwargs).unwrapped
+        env.seed(0)
+        for trial in range(n_trials):
+            env.reset()
+            rollout(env, rand.integers(0, 6, size=3))
+            state = env.get_state()
+            first_actions = rand.integers(0, 6, size=3)
+            actions = rand.integers(0, 6, size=n_steps)
+            branches = []
+            for branch in range(2):
+                if branch > 0: env.set_state(state)
+                np.random.seed(trial)
+                rollout(env, first_actions)
+                episodes = []
+                for episode in range(4):
+                    np.random.seed(trial)
+                    obs, _ = env.reset()
+                    episodes.append((obs.copy(), rollout(env, actions)))
+                branches.append(episodes)
+            for (o1, b1), (o2, b2) in zip(*branches):
+                assert np.array_equal(o1, o2)
+                assert len(b1) == len(b2)
+                for (o1,r1,d1,_), (o2,r2,d2,_) in zip(b1, b2):
+                    assert np.array_equal(o1, o2)
+                    assert r1 == r2 and d1 == d2
+
+        start = time.time()
+        for i in range(1000):
+            env.set_state(env.get_state())
+        print("Snapshot/restore time:", (time.time()-start)/1000)
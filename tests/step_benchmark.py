@@ -0,0 +1,72 @@
+import gordongames
+import gym
+import numpy as np
+import hashlib
+import time
+
+"""
+Times env.step for every registered gordongames env id using seeded
+random actions. Along with the timing, a digest of every observation,
+reward, done and info is printed so that the outputs of two versions
+of the step pipeline can be compared for equality.
+"""
+
+def benchmark(env_name, kwargs, n_episodes=30):
+    """
+    Args:
+        env_name: str
+        kwargs: dict
+            the env kwargs
+        n_episodes: int
+    Returns:
+        step_time: float
+            the average duration of a step in seconds
+        n_steps: int
+        digest: str
+    """
+    env = gym.make(env_name, **kwargs).unwrapped
+    env.seed(0)
+    np.random.seed(0)
+    rand = np.random.default_rng(0)
+    digest = hashlib.blake2b(digest_size=8)
+    n_steps = 0
+    duration = 0
+    for ep in range(n_episodes):
+        env.reset()
+        done = False
+        while not done:
+            actn = int(rand.integers(0,6))
+            start = time.perf_counter()
+            obs, rew, done, info = env.step(actn)
+            duration += time.perf_counter()-start
+            n_steps += 1
+            digest.update(obs.tobytes())
+            digest.update(repr((
+                rew, done, sorted((k,str(v)) for k,v in info.items())
+            )).encode())
+    return duration/n_steps, n_steps, digest.hexdigest()
+
+if __name__=="__main__":
+    kwargs = {
+        "targ_range": (1,6),
+        "grid_size": (12,12),
+        "pixel_density": 2,
+        "rand_timing": True,
+        "timing_p": 0.6,
+        "max_steps": 200,
+    }
+    env_names = sorted([
+        k for k in gym.envs.registry.keys() if "gordongames" in k
+    ], key=lambda k: int(k.split("-v")[-1]))
+    for env_name in env_names:
+        try:
+            step_time, n_steps, digest = benchmark(env_name, kwargs)
+        except Exception as e:
+            print(env_name, "skipped:", type(e).__name__, e)
+            continue
+        print(
+            env_name,
+            "%.1f us/step"%(step_time*1e6),
+            n_steps, "steps",
+            digest
+        )
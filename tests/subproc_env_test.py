@@ -0,0 +1,89 @@
+import gordongames
+from gordongames.envs import VectorGordonGame, SubprocVectorGordonGame
+import numpy as np
+
+"""
+Checks that SubprocVectorGordonGame produces the same trajectories and
+info records as a VectorGordonGame with the same seed, using both the
+fork and spawn start methods.
+"""
+
+if __name__=="__main__":
+    n_envs = 5
+    n_steps = 300
+    kwargs = {
+        "targ_range": (1,5),
+        "grid_size": (12,12),
+        "pixel_density": 2,
+        "rand_timing": True,
+        "max_steps": 40,
+    }
+    env_names = ["gordongames-v1", "gordongames-v4", "gordongames-v8"]
+    for start_method in ["fork", "spawn"]:
+        for env_name in env_names:
+            print("Testing Env:", env_name, start_method)
+            vec = VectorGordonGame(env_name, n_envs, seed=3, **kwargs)
+            sub = SubprocVectorGordonGame(
+                env_name,
+                n_envs,
+                num_workers=2,
+                seed=3,
+                start_method=start_method,
+                **kwargs
+            )
+            assert sub.observation_space.shape == vec.observation_space.shape
+            obs, infos = sub.reset()
+            assert np.array_equal(obs, vec.reset()[0])
+            assert np.all(infos["n_targs"] == 0)
+
+            rand = np.random.default_rng(0)
+            n_dones = 0
+            for step in range(n_steps):
+                actions = rand.integers(0, 6, size=n_envs)
+                obs, rews, dones, infos = sub.step(actions)
+                vobs, vrews, vdones, vinfos = vec.step(actions)
+                assert np.array_equal(obs, vobs), step
+                assert np.array_equal(rews, vrews)
+                assert np.array_equal(dones, vdones)
+                assert np.array_equal(infos, vinfos)
+                if dones.any():
+                    assert np.array_equal(
+                        sub.final_obs[dones], vec.final_obs[dones]
+                    )
+                n_dones += dones.sum()
+            assert n_dones > 0
+
+            # reseeding reproduces the first episodes
+            first = sub.reset(seed=3)[0].copy()
+            sub.step(np.zeros(n_envs, dtype=int))
+            assert np.array_equal(first, sub.reset(seed=3)[0])
+            sub.close()
+            vec.close()
+
+        # without auto reset finished games are reset by hand
+        sub = SubprocVectorGordonGame(
+            "gordongames-v1",
+            n_envs,
+            num_workers=3,
+            seed=3,
+            auto_reset=False,
+            start_method=start_method,
+            **kwargs
+        )
+        sub.reset()
+        for step in range(kwargs["max_steps"]):
+            obs, rews, dones, infos = sub.step(np.zeros(n_envs, dtype=int))
+        assert np.all(dones)
+        before = obs[4].copy()
+        sub.reset_at(4)
+        assert not sub.dones[4]
+        assert not np.array_equal(before, sub.obs[4])
+
+        # worker errors are raised in the parent. there is no layout
+        # library to reset from
+        try:
+            sub.reset(layout_index=0)
+            raise AssertionError("expected a RuntimeError")
+        except RuntimeError as e:
+            assert "Traceback" in str(e)
+        sub.close()
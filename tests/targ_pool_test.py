@@ -0,0 +1,57 @@
+from gordongames.envs.ggames.constants import TARG
+import gordongames
+import gym
+import numpy as np
+import time
+
+if __name__=="__main__":
+    kwargs = {
+        "targ_range": (1,6),
+        "grid_size": (12,12),
+        "pixel_density": 2,
+        "rand_pdb": True,
+    }
+    env_names = [
+        "gordongames-v0",
+        "gordongames-v1",
+        "gordongames-v4",
+        "gordongames-v7",
+        "gordongames-v8",
+        "gordongames-v9",
+        "gordongames-v11",
+        "gordongames-v12",
+    ]
+    rand = np.random.default_rng(int(time.time()))
+    for env_name in env_names:
+        print("Testing Env:", env_name)
+        env = gym.make(env_name, **kwargs).unwrapped
+        register = env.controller.register
+        pool = list(register._targ_pool)
+        pool_ids = {id(targ) for targ in pool}
+        if env_name != "gordongames-v9":
+            assert len(pool) == kwargs["targ_range"][1]
+        for trial in range(50):
+            env.reset()
+            targs = register._targs
+            # targets are drawn from the pool and no targets are made
+            assert register._targ_pool == pool
+            assert {id(t) for t in targs} <= pool_ids
+            assert len(targs) == env.controller.n_targs
+            # inactive targets are not registered
+            registered = {o for o in register.obj_register if o.type==TARG}
+            assert registered == targs
+            for coord, objs in register.coord_register.items():
+                for obj in objs:
+                    if obj.type == TARG: assert obj in targs
+                    assert obj.coord == coord
+            done = False
+            while not done:
+                _, _, done, _ = env.step(int(rand.integers(0,6)))
+
+        # reset without n_targs leaves no targets, as the register
+        # deleted all of its targets on reset
+        register.reset(n_targs=3)
+        assert register.n_targs == 3
+        register.reset()
+        assert register.n_targs == 0 and len(register.targs) == 0
+        assert not any(o.type == TARG for o in register.obj_register)
@@ -0,0 +1,125 @@
+import gordongames
+import gym
+from gordongames.oracles import GordonOracle
+from gordongames.envs.tensor_envs import make_tensor_game
+from gordongames.envs.ggames.info import make_info_records
+import numpy as np
+import contextlib
+import io
+
+"""
+Differential test of the tensor engine. Every tensor game is mirrored
+by an object based env that is started from the same layout and
+stepped with the same actions. The observations, rewards, dones and
+info records must be identical on every step.
+"""
+
+def sync_env(env, game, i):
+    """
+    Resets the env from the current layout and timing schedule of
+    tensor game i.
+    """
+    controller = env.controller
+    controller.next_layout = game.get_layouts([i])[0]
+    obs, _ = env.reset()
+    controller.timing_schedule = game.schedules[i].copy()
+    if hasattr(controller, "flashed_targs"):
+        # invis_targs are popped from the end
+        targs = {targ.coord: targ for targ in controller.register.targs}
+        coords = game.get_flash_coords(i)[::-1]
+        controller.invis_targs = [targs[coord] for coord in coords]
+    return obs
+
+if __name__=="__main__":
+    n_envs = 8
+    n_steps = 1500
+    configs = [
+        {"harsh": True, "center_signal": True},
+        {"harsh": False, "center_signal": False},
+        {"harsh": True, "rand_pdb": False, "max_steps": 30},
+        {"rand_timing": True, "timing_p": 0.5},
+    ]
+    env_names = [
+        "gordongames-v0",
+        "gordongames-v1",
+        "gordongames-v4",
+        "gordongames-v8",
+        "gordongames-v10",
+        "gordongames-v11",
+        "gordongames-v12",
+    ]
+    for env_name in env_names:
+        for config in configs:
+            print("Testing Env:", env_name, config)
+            kwargs = {
+                "targ_range": (1,4),
+                "grid_size": (7,9),
+                "pixel_density": 2,
+                **config
+            }
+            game = make_tensor_game(env_name, n_envs, seed=1, **kwargs)
+            envs = [
+                gym.make(env_name, **kwargs).unwrapped\
+                    for _ in range(n_envs)
+            ]
+            oracles = [GordonOracle(env_name) for _ in range(n_envs)]
+            records = make_info_records(n_envs)
+            obs, _ = game.reset()
+            for i,env in enumerate(envs):
+                env.seed(i)
+                env.enable_info_records(records, i)
+                assert np.array_equal(obs[i], sync_env(env, game, i))
+
+            rand = np.random.default_rng(0)
+            rews_seen = set()
+            n_dones = 0
+            for step in range(n_steps):
+                actions = rand.integers(0, 6, size=n_envs)
+                # the oracles print when the play area is full
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for i,env in enumerate(envs):
+                        if rand.random() < .7:
+                            actions[i] = oracles[i](env)
+                obs, rews, dones, infos = game.step(actions)
+                for i,env in enumerate(envs):
+                    o, rew, done, _ = env.step(int(actions[i]))
+                    assert rews[i] == rew, (step, i, rews[i], rew)
+                    assert dones[i] == done
+                    if done:
+                        n_dones += 1
+                        rews_seen.add(float(rew))
+                        assert np.array_equal(game.final_obs[i], o)
+                        o = sync_env(env, game, i)
+                    assert np.array_equal(obs[i], o), (step, i)
+                    assert infos[i] == records[i], (step, i, infos[i], records[i])
+                    if not done:
+                        reg = env.controller.register
+                        assert game.items[i].sum() == reg.n_items
+            print("episodes:", n_dones, "rewards:", sorted(rews_seen))
+            assert n_dones > n_envs
+            assert len(rews_seen) > 1
+
+    # reseeding reproduces the layouts
+    game = make_tensor_game(
+        "gordongames-v1", 16, seed=5, grid_size=(9,9), targ_range=(1,6)
+    )
+    first = game.reset()[0].copy()
+    game.step(np.zeros(16, dtype=int))
+    assert np.array_equal(first, game.reset(seed=5)[0])
+    assert len({o.tobytes() for o in first}) > 1
+    assert np.all(game.n_targs >= 1) and np.all(game.n_targs <= 6)
+
+    # only changed cells are redrawn, so the observations must match a
+    # full redraw at a density where objects leave a background border
+    game = make_tensor_game(
+        "gordongames-v4", 64, seed=2, grid_size=(9,9), targ_range=(1,6),
+        pixel_density=5, info_keys=(),
+    )
+    game.reset()
+    rand = np.random.default_rng(2)
+    for step in range(300):
+        game.step(rand.integers(0, 6, size=64))
+    obs = game.obs.copy()
+    game.drawn_codes[:] = -1
+    game.render()
+    assert np.array_equal(obs, game.obs)
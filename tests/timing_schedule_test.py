@@ -0,0 +1,60 @@
+from gordongames.envs.ggames.utils import sample_timing_schedule
+from gordongames.envs.ggames.constants import STAY
+import gordongames
+import gym
+import numpy as np
+import time
+
+if __name__=="__main__":
+    kwargs = {
+        "targ_range": (1,6),
+        "grid_size": (12,12),
+        "pixel_density": 2,
+        "rand_pdb": True,
+        "rand_timing": True,
+        "timing_p": 0.6,
+    }
+    env_names = [
+        "gordongames-v4",
+        "gordongames-v8",
+        "gordongames-v10",
+        "gordongames-v11",
+        "gordongames-v12",
+    ]
+
+    # the schedule has n_flashes displayed steps followed by a final
+    # step and skips with probability 1-timing_p
+    rand = np.random.default_rng(0)
+    skips = []
+    for n in range(8):
+        for trial in range(200):
+            sched = sample_timing_schedule(n, 0.6, rand=rand)
+            assert sched[0] == 0 and sched[-1] == 0
+            assert (sched[:-1]==0).sum() == n
+            skips.append(sched[1:-1])
+    skips = np.concatenate(skips)
+    assert abs(skips.mean() - 0.4) < 0.03, skips.mean()
+    assert np.array_equal(sample_timing_schedule(3, 1), np.zeros(4))
+
+    for env_name in env_names:
+        print("Testing Env:", env_name)
+        env = gym.make(env_name, **kwargs).unwrapped
+        env2 = gym.make(env_name, **kwargs).unwrapped
+        for trial in range(20):
+            # the global numpy generator does not affect the schedule
+            env.seed(trial)
+            env2.seed(trial)
+            np.random.seed(trial)
+            env.reset()
+            np.random.seed(trial+1)
+            env2.reset()
+            sched = env.controller.timing_schedule
+            assert np.array_equal(sched, env2.controller.timing_schedule)
+
+            # the animation follows the schedule
+            skipped = []
+            while env.controller.is_animating:
+                skipped.append(env.controller.skipped)
+                env.step(STAY)
+            assert len(skipped) == len(sched)
+            assert np.array_equal(skipped, sched)
@@ -0,0 +1,75 @@
+from gordongames.envs.ggames.grid import Grid, get_topology, get_middle_row
+from gordongames.envs.ggames.registry import Register
+from gordongames.envs.ggames.constants import *
+import numpy as np
+import time
+
+def slow_is_playable(grid, coord):
+    row, col = coord
+    if grid.is_divided:
+        return row >= 0 and row < grid.middle_row and grid.col_inbounds(col)
+    return grid.row_inbounds(row) and grid.col_inbounds(col)
+
+def slow_is_below_divider(grid, coord):
+    row, col = coord
+    if grid.is_divided:
+        row_inbounds = row > grid.middle_row and row < grid.shape[0]
+        return row_inbounds and grid.col_inbounds(col)
+    return grid.row_inbounds(row) and grid.col_inbounds(col)
+
+if __name__=="__main__":
+    configs = [
+        ((12,12), True, False),
+        ((11,13), True, False),
+        ((15,31), True, True),
+        ((7,5), False, False),
+    ]
+    for grid_size, divide, min_play_area in configs:
+        print("Testing:", grid_size, divide, min_play_area)
+        grid = Grid(grid_size, 1, divide=divide, min_play_area=min_play_area)
+        grid2 = Grid(grid_size, 3, divide=divide, min_play_area=min_play_area)
+        topo = grid.topology
+        assert topo is grid2.topology
+        assert topo is get_topology(grid_size, divide, min_play_area)
+        assert grid.middle_row == get_middle_row(grid_size, min_play_area)
+        n_rows, n_cols = grid_size
+        for row in range(-2, n_rows+2):
+            for col in range(-2, n_cols+2):
+                coord = (row,col)
+                inbounds = grid.row_inbounds(row) and grid.col_inbounds(col)
+                assert grid.is_inbounds(coord) == inbounds
+                assert grid.is_playable(coord) == slow_is_playable(grid, coord)
+                assert grid.is_below_divider(coord) ==\
+                        slow_is_below_divider(grid, coord)
+                if not inbounds: continue
+                idx = row*n_cols + col
+                assert topo.coords[idx] == coord
+                assert topo.playable[idx] == grid.is_playable(coord)
+                assert topo.targ_area[idx] == grid.is_below_divider(coord)
+                assert topo.inbounds[idx]
+        assert not topo.inbounds[-1]
+
+        # moves must match the legality rules of move_player
+        register = Register(grid, n_targs=1)
+        for idx, coord in enumerate(topo.coords):
+            for direction in DIRECTIONS:
+                new_coord = register.apply_direction(coord, direction)
+                if not grid.is_playable(new_coord): new_coord = coord
+                assert topo.coords[topo.neighbors[idx,direction]] == new_coord
+                assert topo.move(coord, direction) == new_coord
+        try:
+            topo.neighbors[0,0] = 1
+            assert False
+        except ValueError:
+            pass
+
+    grid = Grid((12,12), 1, divide=True)
+    grid.min_play_area = True
+    assert grid.middle_row == 4
+    assert grid.topology is get_topology((12,12), True, True)
+
+    register = Register(grid, n_targs=1)
+    start = time.time()
+    for i in range(100000):
+        register.move_player(i % 5)
+    print("Move time:", (time.time()-start)/100000)
@@ -0,0 +1,100 @@
+import gordongames
+import gym
+from gordongames.envs import VectorGordonGame, ThreadVectorGordonGame
+from gordongames.envs.ggames.info import make_info_records, write_info_record
+import numpy as np
+
+"""
+Checks that VectorGordonGame produces the same trajectories as stepping
+the same number of separately seeded envs one at a time, and that
+ThreadVectorGordonGame produces the same trajectories as
+VectorGordonGame.
+"""
+
+if __name__=="__main__":
+    n_envs = 5
+    n_steps = 600
+    kwargs = {
+        "targ_range": (1,5),
+        "grid_size": (12,12),
+        "pixel_density": 2,
+        "rand_timing": True,
+        "max_steps": 40,
+    }
+    env_names = [
+        "gordongames-v0",
+        "gordongames-v1",
+        "gordongames-v4",
+        "gordongames-v7",
+        "gordongames-v8",
+        "gordongames-v9",
+        "gordongames-v12",
+    ]
+    for env_name in env_names:
+        print("Testing Env:", env_name)
+        vec = VectorGordonGame(env_name, n_envs, seed=3, **kwargs)
+        envs = [
+            gym.make(env_name, **kwargs).unwrapped for _ in range(n_envs)
+        ]
+        for env,child in zip(envs, np.random.SeedSequence(3).spawn(n_envs)):
+            env.seed(child)
+        obs, infos = vec.reset()
+        assert obs.shape == (n_envs, *envs[0].observation_space.shape)
+        assert vec.observation_space.shape == obs.shape
+        assert np.all(infos["n_targs"] == 0)
+        for i,env in enumerate(envs):
+            assert np.array_equal(obs[i], env.reset()[0])
+
+        rand = np.random.default_rng(0)
+        records = make_info_records(n_envs)
+        n_dones = 0
+        for step in range(n_steps):
+            actions = rand.integers(0, 6, size=n_envs)
+            obs, rews, dones, infos = vec.step(actions)
+            for i,env in enumerate(envs):
+                o, rew, done, info = env.step(int(actions[i]))
+                write_info_record(records, i, info)
+                assert rews[i] == rew
+                assert dones[i] == done
+                if done:
+                    n_dones += 1
+                    assert np.array_equal(vec.final_obs[i], o)
+                    o = env.reset()[0]
+                assert np.array_equal(obs[i], o)
+            assert np.array_equal(infos, records)
+        assert n_dones > 0
+
+        # reseeding reproduces the first episodes
+        first = vec.reset(seed=3)[0].copy()
+        vec.step(np.zeros(n_envs, dtype=int))
+        assert np.array_equal(first, vec.reset(seed=3)[0])
+        assert len({o.tobytes() for o in first}) > 1
+
+        # without auto reset finished games are reset by hand
+        vec = VectorGordonGame(env_name, n_envs, seed=3, auto_reset=False,
+                               **kwargs)
+        vec.reset()
+        for step in range(kwargs["max_steps"]):
+            obs, rews, dones, infos = vec.step(np.zeros(n_envs, dtype=int))
+        assert np.all(dones)
+        vec.reset_at(2)
+        assert not vec.dones[2]
+        vec.close()
+
+    for env_name in ["gordongames-v1", "gordongames-v8"]:
+        print("Testing Threads:", env_name)
+        vec = VectorGordonGame(env_name, n_envs, seed=4, **kwargs)
+        threads = ThreadVectorGordonGame(
+            env_name, n_envs, num_threads=3, seed=4, **kwargs
+        )
+        assert np.array_equal(threads.reset()[0], vec.reset()[0])
+        rand = np.random.default_rng(1)
+        for step in range(n_steps):
+            actions = rand.integers(0, 6, size=n_envs)
+            outs = threads.step(actions)
+            vouts = vec.step(actions)
+            for out,vout in zip(outs, vouts):
+                assert np.array_equal(out, vout), step
+            assert np.array_equal(threads.final_obs, vec.final_obs)
+        threads.close()
+        vec.close()
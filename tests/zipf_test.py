@@ -0,0 +1,72 @@
+from gordongames.envs.ggames.utils import get_zipf_sampler, zipfian
+import gordongames
+import gym
+import numpy as np
+import time
+
+"""
+Compares the alias method zipf sampler against the exact zipfian
+probabilities, including held out target quantities.
+"""
+
+def exact_probs(low, high, order, hold_outs=set()):
+    """
+    Returns the renormalized zipfian probability of each value.
+    """
+    vals = [k for k in range(low, high+1) if k not in hold_outs]
+    probs = np.asarray([1/(k**order) for k in vals])
+    return dict(zip(vals, probs/probs.sum()))
+
+def check_counts(samples, probs, n):
+    """
+    Asserts that the sample frequencies are within 5 standard errors of
+    the argued probabilities and that no other values were sampled.
+    """
+    vals, counts = np.unique(samples, return_counts=True)
+    assert set(int(v) for v in vals) <= set(probs.keys())
+    counts = dict(zip([int(v) for v in vals], counts))
+    for k,p in probs.items():
+        err = 5*np.sqrt(p*(1-p)/n)
+        assert abs(counts.get(k,0)/n - p) <= err, (k, counts.get(k,0)/n, p)
+
+if __name__=="__main__":
+    n = 200000
+    rand = np.random.default_rng(int(time.time()))
+    configs = [
+        (1, 9, 1, set()),
+        (1, 9, 2.5, {2,3}),
+        (3, 20, 0.7, {5,19,20}),
+        (1, 5, 0, {1}),
+        (2, 2, 1, set()),
+    ]
+    for low, high, order, hold_outs in configs:
+        print("Testing:", low, high, order, hold_outs)
+        sampler = get_zipf_sampler(low, high, order, hold_outs)
+        assert sampler is get_zipf_sampler(low,high,order,set(hold_outs))
+        probs = exact_probs(low, high, order, hold_outs)
+        assert np.allclose(sampler.probs, list(probs.values()))
+
+        bulk = sampler.sample(n, rand=rand)
+        assert bulk.shape == (n,)
+        check_counts(bulk, probs, n)
+        singles = [sampler.sample(rand=rand) for i in range(n//4)]
+        assert all(type(s) == int for s in singles[:10])
+        check_counts(singles, probs, n//4)
+
+    # the module level function draws from the same distribution
+    samples = [zipfian(1, 9, 1.5, rand=rand) for i in range(n//4)]
+    check_counts(samples, exact_probs(1, 9, 1.5), n//4)
+
+    # held out quantities are never sampled by the env
+    env = gym.make(
+        "gordongames-v4",
+        targ_range=(1,8),
+        hold_outs={2,5},
+        zipf_exponent=1,
+        grid_size=(12,12),
+    ).unwrapped
+    n_targs = []
+    for i in range(2000):
+        env.reset()
+        n_targs.append(env.controller.n_targs)
+    check_counts(n_targs, exact_probs(1, 8, 1, {2,5}), 2000)